@@ -10,7 +10,12 @@ import numpy as np
 import time
 import sys
 import select
-from gpiozero import DigitalOutputDevice, PWMOutputDevice
+from product.motor_driver import BUZZER_PIN, MotorController
+from product.camera import CaptureProfile, open_camera
+
+# 카메라 (product/camera.py 공용 인터페이스, "synthetic" / "replay"로 하드웨어 없이 실행 가능)
+CAMERA_BACKEND = "picamera2"
+CAMERA_PROFILE = CaptureProfile(lane_size=(640, 480), main_size=(640, 480), rotate_180=False, settle=2.0)
 import shared_state
 
 
@@ -18,20 +23,9 @@ import shared_state
 # 모터 / 부저 설정
 # ============================================================
 
-PWMA = PWMOutputDevice(18)
-AIN1 = DigitalOutputDevice(22)
-AIN2 = DigitalOutputDevice(27)
-
-PWMB = PWMOutputDevice(23)
-BIN1 = DigitalOutputDevice(25)
-BIN2 = DigitalOutputDevice(24)
-
-# 부저 
-try:
-    BUZZER = DigitalOutputDevice(12)
-except Exception:
-    BUZZER = None
-
+# 모터 / 부저 (product/motor_driver.py 공용 차동 구동 API, 핀은 첫 명령 때 초기화)
+MOTOR_BACKEND = "gpiozero"
+motors = MotorController(MOTOR_BACKEND, buzzer_pin=BUZZER_PIN)
 
 # 기본/감속 속도 프로파일
 SPEED_FORWARD_DEFAULT = 0.75
@@ -48,35 +42,19 @@ SPEED_TURN    = SPEED_TURN_DEFAULT
 # ============================================================
 
 def motor_forward():
-    AIN1.value = 0; AIN2.value = 1
-    PWMA.value = SPEED_FORWARD
-    BIN1.value = 0; BIN2.value = 1
-    PWMB.value = SPEED_FORWARD
+    motors.forward(SPEED_FORWARD)
 
 def motor_left(intensity=1.0):
     """좌회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 0.25 * intensity
-    right_ratio = 1.0 * intensity
-    AIN1.value = 0; AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio
-    BIN1.value = 0; BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio
+    motors.left(intensity, SPEED_TURN)
 
 def motor_right(intensity=1.0):
     """우회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 1.0 * intensity
-    right_ratio = 0.25 * intensity
-    AIN1.value = 0; AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio
-    BIN1.value = 0; BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio
+    motors.right(intensity, SPEED_TURN)
 
 def motor_stop():
-    # 두 모터 모두 정지 (방향 일치)
-    AIN1.value = 0; AIN2.value = 0  # 왼쪽 모터 완전 정지
-    PWMA.value = 0.0
-    BIN1.value = 0; BIN2.value = 0  # 오른쪽 모터 완전 정지
-    PWMB.value = 0.0
+    # 두 모터 모두 정지 (방향 핀 모두 0)
+    motors.stop()
 
 def set_slow_mode():
     global SPEED_FORWARD, SPEED_TURN
@@ -89,10 +67,10 @@ def restore_speed():
     SPEED_TURN    = SPEED_TURN_DEFAULT
 
 def beep(sec=1.0):
-    if BUZZER:
-        BUZZER.value = 1
+    if motors.has_buzzer:
+        motors.set_buzzer(True)
         time.sleep(sec)
-        BUZZER.value = 0
+        motors.set_buzzer(False)
     else:
         print("🔊 (buzzer simulated)")
         time.sleep(sec)
@@ -201,23 +179,10 @@ def try_branch_by_trigger():
 
 def init_camera():
     try:
-        from picamera2 import Picamera2
         print("[INFO] Initializing camera...")
-        picam2 = Picamera2()
-        config = picam2.create_preview_configuration(main={"format": "RGB888", "size": (640, 480)})
-        picam2.configure(config)
-        picam2.start()
-        time.sleep(2)
+        camera = open_camera(CAMERA_BACKEND, CAMERA_PROFILE, order="rgb")
         print("[✓] Camera ready")
-
-        class CameraWrapper:
-            def read(self):
-                frame = picam2.capture_array()
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                return True, frame
-            def release(self):
-                picam2.stop()
-        return CameraWrapper()
+        return camera
 
     except Exception as e:
         print(f"[ERROR] Camera failed: {e}")
@@ -7,16 +7,12 @@ import time
 import sys
 import tty
 import termios
-from gpiozero import DigitalOutputDevice, PWMOutputDevice
+from product.motor_driver import MotorController
 
-# 모터 핀 설정 (gpiozero)
-PWMA = PWMOutputDevice(18)
-AIN1 = DigitalOutputDevice(22)
-AIN2 = DigitalOutputDevice(27)
-
-PWMB = PWMOutputDevice(23)
-BIN1 = DigitalOutputDevice(25)
-BIN2 = DigitalOutputDevice(24)
+# 모터 (product/motor_driver.py 공용 차동 구동 API, 핀은 첫 명령 때 초기화)
+# "mock"으로 바꾸면 하드웨어 없이 실행 (핀 쓰기만 집계)
+MOTOR_BACKEND = "gpiozero"
+motors = MotorController(MOTOR_BACKEND)
 
 # 속도 설정 (향상된 기본값)
 SPEED = 0.75  # 기본 속도: 0.75 (이전 0.5에서 50% 증가)
@@ -26,48 +22,23 @@ SPEED_STEP = 0.1
 
 def motor_forward(speed):
     """전진 - 빠른 반응"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = speed
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = speed
+    motors.forward(speed)
 
 def motor_backward(speed):
     """후진 - 빠른 반응"""
-    AIN1.value = 1
-    AIN2.value = 0
-    PWMA.value = speed
-    BIN1.value = 1
-    BIN2.value = 0
-    PWMB.value = speed
+    motors.backward(speed)
 
 def motor_left(speed):
     """좌회전 - 빠른 반응"""
-    AIN1.value = 1
-    AIN2.value = 0
-    PWMA.value = 0.0
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = speed
+    motors.left(1.0, speed, inner=0.0)
 
 def motor_right(speed):
     """우회전 - 빠른 반응"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = speed
-    BIN1.value = 1
-    BIN2.value = 0
-    PWMB.value = 0.0
+    motors.right(1.0, speed, inner=0.0)
 
 def motor_stop():
     """즉시 정지"""
-    AIN1.value = 0
-    AIN2.value = 0
-    PWMA.value = 0.0
-    BIN1.value = 0
-    BIN2.value = 0.0
-    PWMB.value = 0.0
+    motors.stop()
 
 def get_key():
     """터미널에서 키 입력 받기 (SSH 환경용)"""
@@ -181,8 +152,7 @@ def main():
 
     finally:
         motor_stop()
-        PWMA.value = 0.0
-        PWMB.value = 0.0
+        motors.cleanup()
         print("\n[✓] Motors stopped, cleanup complete")
 
 if __name__ == '__main__':
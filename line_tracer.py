@@ -5,18 +5,20 @@ Line Tracer - 좌우 균형 청록색 라인 추적
 import cv2
 import numpy as np
 import time
-from gpiozero import DigitalOutputDevice, PWMOutputDevice
+from product.motor_driver import MotorController
+from product.camera import CaptureProfile, open_camera
+
+# 카메라 (product/camera.py 공용 인터페이스, "synthetic" / "replay"로 하드웨어 없이 실행 가능)
+CAMERA_BACKEND = "picamera2"
+CAMERA_PROFILE = CaptureProfile(lane_size=(320, 240), main_size=(320, 240), rotate_180=False, settle=2.0)
 
 # ============================================================
 # 모터 설정
 # ============================================================
-PWMA = PWMOutputDevice(18)
-AIN1 = DigitalOutputDevice(22)
-AIN2 = DigitalOutputDevice(27)
-
-PWMB = PWMOutputDevice(23)
-BIN1 = DigitalOutputDevice(25)
-BIN2 = DigitalOutputDevice(24)
+# 모터 (product/motor_driver.py 공용 차동 구동 API, 핀은 첫 명령 때 초기화)
+# "mock"으로 바꾸면 하드웨어 없이 실행 (핀 쓰기만 집계)
+MOTOR_BACKEND = "gpiozero"
+motors = MotorController(MOTOR_BACKEND)
 
 # 속도 설정
 SPEED_FORWARD = 0.40
@@ -27,39 +29,19 @@ SPEED_TURN = 0.35
 # ============================================================
 def motor_forward():
     """전진"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_FORWARD
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_FORWARD
+    motors.forward(SPEED_FORWARD)
 
 def motor_left():
     """좌회전 (왼쪽 정지, 오른쪽 전진)"""
-    AIN1.value = 1
-    AIN2.value = 0
-    PWMA.value = 0.0
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_TURN
+    motors.left(1.0, SPEED_TURN, inner=0.0)
 
 def motor_right():
     """우회전 (왼쪽 전진, 오른쪽 정지)"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_TURN
-    BIN1.value = 1
-    BIN2.value = 0
-    PWMB.value = 0.0
+    motors.right(1.0, SPEED_TURN, inner=0.0)
 
 def motor_stop():
     """정지"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = 0.0
-    BIN1.value = 1
-    BIN2.value = 0
-    PWMB.value = 0.0
+    motors.stop()
 
 # ============================================================
 # 카메라 초기화
@@ -67,29 +49,12 @@ def motor_stop():
 def init_camera():
     """카메라 초기화"""
     try:
-        from picamera2 import Picamera2
         print("[INFO] Initializing camera...")
 
-        picam2 = Picamera2()
-        config = picam2.create_preview_configuration(
-            main={"format": "RGB888", "size": (320, 240)}
-        )
-        picam2.configure(config)
-        picam2.start()
-        time.sleep(2)
+        camera = open_camera(CAMERA_BACKEND, CAMERA_PROFILE, order="rgb")
 
         print("[✓] Camera ready")
-
-        class CameraWrapper:
-            def read(self):
-                frame = picam2.capture_array()
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                return True, frame
-
-            def release(self):
-                picam2.stop()
-
-        return CameraWrapper()
+        return camera
 
     except Exception as e:
         print(f"[ERROR] Camera failed: {e}")
@@ -268,8 +233,7 @@ def main():
         print("=" * 70)
 
         motor_stop()
-        PWMA.value = 0.0
-        PWMB.value = 0.0
+        motors.cleanup()
         camera.release()
         print("[✓] Cleanup complete")
 
@@ -8,18 +8,20 @@ import time
 import random
 import sys
 import select
-from gpiozero import DigitalOutputDevice, PWMOutputDevice
+from product.motor_driver import MotorController
+from product.camera import CaptureProfile, open_camera
+
+# 카메라 (product/camera.py 공용 인터페이스, "synthetic" / "replay"로 하드웨어 없이 실행 가능)
+CAMERA_BACKEND = "picamera2"
+CAMERA_PROFILE = CaptureProfile(lane_size=(640, 480), main_size=(640, 480), rotate_180=False, settle=2.0)
 
 # ============================================================
 # 모터 설정
 # ============================================================
-PWMA = PWMOutputDevice(18)
-AIN1 = DigitalOutputDevice(22)
-AIN2 = DigitalOutputDevice(27)
-
-PWMB = PWMOutputDevice(23)
-BIN1 = DigitalOutputDevice(25)
-BIN2 = DigitalOutputDevice(24)
+# 모터 (product/motor_driver.py 공용 차동 구동 API, 핀은 첫 명령 때 초기화)
+# "mock"으로 바꾸면 하드웨어 없이 실행 (핀 쓰기만 집계)
+MOTOR_BACKEND = "gpiozero"
+motors = MotorController(MOTOR_BACKEND)
 
 # 속도 설정
 SPEED_FORWARD = 0.75  # 직진 속도 (빠름)
@@ -30,44 +32,19 @@ SPEED_TURN = 0.55     # 회전 속도 (코너링 안정성)
 # ============================================================
 def motor_forward():
     """전진"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_FORWARD
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_FORWARD
+    motors.forward(SPEED_FORWARD)
 
 def motor_left(intensity=1.0):
     """좌회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 0.25 * intensity
-    right_ratio = 1.0 * intensity
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio  # 왼쪽 속도 조절
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio  # 오른쪽 속도 조절
+    motors.left(intensity, SPEED_TURN)
 
 def motor_right(intensity=1.0):
     """우회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 1.0 * intensity
-    right_ratio = 0.25 * intensity
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio  # 왼쪽 속도 조절
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio  # 오른쪽 속도 조절
+    motors.right(intensity, SPEED_TURN)
 
 def motor_stop():
     """정지"""
-    # 두 모터 모두 완전 정지 (방향 일치)
-    AIN1.value = 0
-    AIN2.value = 0  # 왼쪽 모터 완전 정지
-    PWMA.value = 0.0
-    BIN1.value = 0
-    BIN2.value = 0  # 오른쪽 모터 완전 정지
-    PWMB.value = 0.0
+    motors.stop()
 
 def get_user_input():
     """사용자 입력 확인 (non-blocking)"""
@@ -85,30 +62,13 @@ def get_user_input():
 def init_camera():
     """카메라 초기화"""
     try:
-        from picamera2 import Picamera2
         print("[INFO] Initializing camera...")
 
-        picam2 = Picamera2()
-        # 해상도 증가 (320x240 → 640x480)
-        config = picam2.create_preview_configuration(
-            main={"format": "RGB888", "size": (640, 480)}
-        )
-        picam2.configure(config)
-        picam2.start()
-        time.sleep(2)
+        # 해상도 증가 (320x240 → 640x480), R·B 교환 프레임은 기존과 동일
+        camera = open_camera(CAMERA_BACKEND, CAMERA_PROFILE, order="rgb")
 
         print("[✓] Camera ready")
-
-        class CameraWrapper:
-            def read(self):
-                frame = picam2.capture_array()
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                return True, frame
-
-            def release(self):
-                picam2.stop()
-
-        return CameraWrapper()
+        return camera
 
     except Exception as e:
         print(f"[ERROR] Camera failed: {e}")
@@ -479,22 +439,13 @@ def main():
                                 motor_forward()
                                 action = "FORWARD"
                             else:
-                                # 2프레임 제자리 우회전 (왼쪽 전진, 오른쪽 후진)
-                                AIN1.value = 0
-                                AIN2.value = 1
-                                PWMA.value = min(SPEED_TURN * 1.5, 1.0)  # 왼쪽 전진 150%
-                                BIN1.value = 1  # 오른쪽 후진
-                                BIN2.value = 0
-                                PWMB.value = min(SPEED_TURN * 1.5, 1.0)  # 오른쪽 후진 150%
+                                # 2프레임 제자리 우회전 (왼쪽 전진, 오른쪽 후진, 150%)
+                                spin = min(SPEED_TURN * 1.5, 1.0)
+                                motors.wheels(spin, -spin, "SPIN_RIGHT")
                                 action = "RIGHT"
                         else:
-                            # 부드러운 우회전 (조금씩 직진하며 회전)
-                            AIN1.value = 0
-                            AIN2.value = 1
-                            PWMA.value = SPEED_TURN  # 왼쪽 100%
-                            BIN1.value = 0
-                            BIN2.value = 1
-                            PWMB.value = SPEED_TURN * 0.4  # 오른쪽 40%
+                            # 부드러운 우회전 (조금씩 직진하며 회전, 왼쪽 100% / 오른쪽 40%)
+                            motors.right(1.0, SPEED_TURN, inner=0.4)
                             action = "RIGHT"
                     else:
                         # 오른쪽 라인 있음: 비례 우회전
@@ -516,22 +467,13 @@ def main():
                                 motor_forward()
                                 action = "FORWARD"
                             else:
-                                # 2프레임 제자리 좌회전 (왼쪽 후진, 오른쪽 전진)
-                                AIN1.value = 1  # 왼쪽 후진
-                                AIN2.value = 0
-                                PWMA.value = min(SPEED_TURN * 1.5, 1.0)  # 왼쪽 후진 150%
-                                BIN1.value = 0
-                                BIN2.value = 1
-                                PWMB.value = min(SPEED_TURN * 1.5, 1.0)  # 오른쪽 전진 150%
+                                # 2프레임 제자리 좌회전 (왼쪽 후진, 오른쪽 전진, 150%)
+                                spin = min(SPEED_TURN * 1.5, 1.0)
+                                motors.wheels(-spin, spin, "SPIN_LEFT")
                                 action = "LEFT"
                         else:
-                            # 부드러운 좌회전 (조금씩 직진하며 회전)
-                            AIN1.value = 0
-                            AIN2.value = 1
-                            PWMA.value = SPEED_TURN * 0.4  # 왼쪽 40%
-                            BIN1.value = 0
-                            BIN2.value = 1
-                            PWMB.value = SPEED_TURN  # 오른쪽 100%
+                            # 부드러운 좌회전 (조금씩 직진하며 회전, 왼쪽 40% / 오른쪽 100%)
+                            motors.left(1.0, SPEED_TURN, inner=0.4)
                             action = "LEFT"
                     else:
                         # 왼쪽 라인 있음: 비례 좌회전
@@ -631,8 +573,7 @@ def main():
         print("=" * 70)
 
         motor_stop()
-        PWMA.value = 0.0
-        PWMB.value = 0.0
+        motors.cleanup()
         camera.release()
         print("[✓] Cleanup complete")
 
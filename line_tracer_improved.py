@@ -7,18 +7,21 @@ import numpy as np
 import time
 import sys
 import select
-from gpiozero import DigitalOutputDevice, PWMOutputDevice
+from product.motor_driver import MotorController
+from product.camera import CaptureProfile, open_camera
+
+# 카메라 (product/camera.py 공용 인터페이스, "synthetic" / "replay"로 하드웨어 없이 실행 가능)
+CAMERA_BACKEND = "picamera2"
+CAMERA_PROFILE = CaptureProfile(lane_size=(640, 480), main_size=(640, 480), rotate_180=False, settle=2.0)
+FALLBACK_PROFILE = CaptureProfile(lane_size=(480, 360), main_size=(480, 360), rotate_180=False, settle=2.0)
 
 # ============================================================
 # 모터 설정
 # ============================================================
-PWMA = PWMOutputDevice(18)
-AIN1 = DigitalOutputDevice(22)
-AIN2 = DigitalOutputDevice(27)
-
-PWMB = PWMOutputDevice(23)
-BIN1 = DigitalOutputDevice(25)
-BIN2 = DigitalOutputDevice(24)
+# 모터 (product/motor_driver.py 공용 차동 구동 API, 핀은 첫 명령 때 초기화)
+# "mock"으로 바꾸면 하드웨어 없이 실행 (핀 쓰기만 집계)
+MOTOR_BACKEND = "gpiozero"
+motors = MotorController(MOTOR_BACKEND)
 
 # 속도 설정
 SPEED_FORWARD = 0.75  # 직진 속도 (빠름)
@@ -30,61 +33,27 @@ SPEED_SPIN = 0.70     # 제자리 회전 속도 (빠름)
 # ============================================================
 def motor_forward():
     """전진"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_FORWARD
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_FORWARD
+    motors.forward(SPEED_FORWARD)
 
 def motor_left(intensity=1.0):
     """좌회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 0.25 * intensity
-    right_ratio = 1.0 * intensity
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio  # 왼쪽 속도 조절
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio  # 오른쪽 속도 조절
+    motors.left(intensity, SPEED_TURN)
 
 def motor_right(intensity=1.0):
     """우회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 1.0 * intensity
-    right_ratio = 0.25 * intensity
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio  # 왼쪽 속도 조절
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio  # 오른쪽 속도 조절
+    motors.right(intensity, SPEED_TURN)
 
 def motor_spin_right():
     """제자리 우회전 (왼쪽 후진, 오른쪽 전진) - 라인 찾기용"""
-    AIN1.value = 1  # 왼쪽 후진
-    AIN2.value = 0
-    PWMA.value = SPEED_SPIN
-    BIN1.value = 0  # 오른쪽 전진
-    BIN2.value = 1
-    PWMB.value = SPEED_SPIN
+    motors.wheels(-SPEED_SPIN, SPEED_SPIN, "SPIN_RIGHT")
 
 def motor_spin_left():
     """제자리 좌회전 (왼쪽 전진, 오른쪽 후진) - 라인 찾기용"""
-    AIN1.value = 0  # 왼쪽 전진
-    AIN2.value = 1
-    PWMA.value = SPEED_SPIN
-    BIN1.value = 1  # 오른쪽 후진
-    BIN2.value = 0
-    PWMB.value = SPEED_SPIN
+    motors.wheels(SPEED_SPIN, -SPEED_SPIN, "SPIN_LEFT")
 
 def motor_stop():
     """정지 - 완전한 브레이크 모드"""
-    AIN1.value = 0
-    AIN2.value = 0  # 왼쪽 모터 브레이크
-    PWMA.value = 0.0
-    BIN1.value = 0
-    BIN2.value = 0  # 오른쪽 모터 브레이크
-    PWMB.value = 0.0
+    motors.stop()
 
 def get_user_input():
     """사용자 입력 확인 (non-blocking)"""
@@ -102,53 +71,22 @@ def get_user_input():
 def init_camera():
     """카메라 초기화 - 해상도 증가 버전"""
     try:
-        from picamera2 import Picamera2
         print("[INFO] Initializing camera...")
 
-        picam2 = Picamera2()
         # 해상도 증가: 320x240 -> 640x480 (필요시 480x360으로 조정 가능)
-        config = picam2.create_preview_configuration(
-            main={"format": "RGB888", "size": (640, 480)}
-        )
-        picam2.configure(config)
-        picam2.start()
-        time.sleep(2)
+        camera = open_camera(CAMERA_BACKEND, CAMERA_PROFILE, order="rgb")
 
         print("[✓] Camera ready (640x480)")
-
-        class CameraWrapper:
-            def read(self):
-                frame = picam2.capture_array()
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                return True, frame
-
-            def release(self):
-                picam2.stop()
-
-        return CameraWrapper()
+        return camera
 
     except Exception as e:
         print(f"[ERROR] Camera failed: {e}")
         print("[INFO] Falling back to 480x360...")
         try:
             # 대체 해상도로 재시도
-            picam2 = Picamera2()
-            config = picam2.create_preview_configuration(
-                main={"format": "RGB888", "size": (480, 360)}
-            )
-            picam2.configure(config)
-            picam2.start()
-            time.sleep(2)
+            camera = open_camera(CAMERA_BACKEND, FALLBACK_PROFILE, order="rgb")
             print("[✓] Camera ready (480x360)")
-
-            class CameraWrapper:
-                def read(self):
-                    frame = picam2.capture_array()
-                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                    return True, frame
-                def release(self):
-                    picam2.stop()
-            return CameraWrapper()
+            return camera
         except:
             return None
 
@@ -521,8 +459,7 @@ def main():
 
         # 모터 완전 정지
         motor_stop()
-        PWMA.value = 0.0
-        PWMB.value = 0.0
+        motors.cleanup()
         camera.release()
         print("[✓] Cleanup complete")
 
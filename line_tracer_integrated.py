@@ -8,7 +8,12 @@ import time
 import sys
 import select
 import subprocess
-from gpiozero import DigitalOutputDevice, PWMOutputDevice
+from product.motor_driver import BUZZER_PIN, MotorController
+from product.camera import CaptureProfile, open_camera
+
+# 카메라 (product/camera.py 공용 인터페이스, "synthetic" / "replay"로 하드웨어 없이 실행 가능)
+CAMERA_BACKEND = "picamera2"
+CAMERA_PROFILE = CaptureProfile(lane_size=(640, 480), main_size=(640, 480), rotate_180=False, settle=2.0)
 
 # shared_state import 시도
 try:
@@ -21,20 +26,10 @@ except ImportError:
 # ============================================================
 # 모터 / 부저 설정
 # ============================================================
-PWMA = PWMOutputDevice(18)
-AIN1 = DigitalOutputDevice(22)
-AIN2 = DigitalOutputDevice(27)
-
-PWMB = PWMOutputDevice(23)
-BIN1 = DigitalOutputDevice(25)
-BIN2 = DigitalOutputDevice(24)
-
-# 부저 설정
-try:
-    BUZZER = DigitalOutputDevice(12)
-except Exception:
-    BUZZER = None
-    print("[WARNING] Buzzer not available")
+# 모터 (product/motor_driver.py 공용 차동 구동 API, 핀은 첫 명령 때 초기화)
+# "mock"으로 바꾸면 하드웨어 없이 실행 (핀 쓰기만 집계)
+MOTOR_BACKEND = "gpiozero"
+motors = MotorController(MOTOR_BACKEND, buzzer_pin=BUZZER_PIN)
 
 # 속도 프로파일
 SPEED_FORWARD_DEFAULT = 0.75  # 기본 직진 속도
@@ -53,61 +48,27 @@ SPEED_SPIN = SPEED_SPIN_DEFAULT
 # ============================================================
 def motor_forward():
     """전진"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_FORWARD
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_FORWARD
+    motors.forward(SPEED_FORWARD)
 
 def motor_left(intensity=1.0):
     """좌회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 0.25 * intensity
-    right_ratio = 1.0 * intensity
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio
+    motors.left(intensity, SPEED_TURN)
 
 def motor_right(intensity=1.0):
     """우회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    left_ratio = 1.0 * intensity
-    right_ratio = 0.25 * intensity
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_TURN * left_ratio
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_TURN * right_ratio
+    motors.right(intensity, SPEED_TURN)
 
 def motor_spin_right():
     """제자리 우회전 (왼쪽 후진, 오른쪽 전진)"""
-    AIN1.value = 1  # 왼쪽 후진
-    AIN2.value = 0
-    PWMA.value = SPEED_SPIN
-    BIN1.value = 0  # 오른쪽 전진
-    BIN2.value = 1
-    PWMB.value = SPEED_SPIN
+    motors.wheels(-SPEED_SPIN, SPEED_SPIN, "SPIN_RIGHT")
 
 def motor_spin_left():
     """제자리 좌회전 (왼쪽 전진, 오른쪽 후진)"""
-    AIN1.value = 0  # 왼쪽 전진
-    AIN2.value = 1
-    PWMA.value = SPEED_SPIN
-    BIN1.value = 1  # 오른쪽 후진
-    BIN2.value = 0
-    PWMB.value = SPEED_SPIN
+    motors.wheels(SPEED_SPIN, -SPEED_SPIN, "SPIN_LEFT")
 
 def motor_stop():
     """정지 - 완전한 브레이크 모드"""
-    AIN1.value = 0
-    AIN2.value = 0  # 왼쪽 모터 브레이크
-    PWMA.value = 0.0
-    BIN1.value = 0
-    BIN2.value = 0  # 오른쪽 모터 브레이크
-    PWMB.value = 0.0
+    motors.stop()
 
 def set_slow_mode():
     """감속 모드 설정"""
@@ -125,10 +86,10 @@ def restore_speed():
 
 def beep(sec=1.0):
     """부저 울리기"""
-    if BUZZER:
-        BUZZER.value = 1
+    if motors.has_buzzer:
+        motors.set_buzzer(True)
         time.sleep(sec)
-        BUZZER.value = 0
+        motors.set_buzzer(False)
     else:
         print("🔊 (buzzer simulated)")
         time.sleep(sec)
@@ -355,7 +316,6 @@ def init_camera():
 
     for attempt in range(max_retries):
         try:
-            from picamera2 import Picamera2
             print(f"[INFO] Initializing camera... (Attempt {attempt + 1}/{max_retries})")
 
             # 카메라가 사용 중일 수 있으므로 잠시 대기
@@ -368,26 +328,11 @@ def init_camera():
                 subprocess.run(['pkill', '-f', 'libcamera'], capture_output=True)
                 time.sleep(0.5)
 
-            picam2 = Picamera2()
-            config = picam2.create_preview_configuration(
-                main={"format": "RGB888", "size": (640, 480)}
-            )
-            picam2.configure(config)
-            picam2.start()
-            time.sleep(2)
+            # 기존과 같은 640x480 / R·B 교환 프레임 (180° 회전은 루프에서 cv2.flip)
+            camera = open_camera(CAMERA_BACKEND, CAMERA_PROFILE, order="rgb")
 
             print("[✓] Camera ready (640x480)")
-
-            class CameraWrapper:
-                def read(self):
-                    frame = picam2.capture_array()
-                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                    return True, frame
-
-                def release(self):
-                    picam2.stop()
-
-            return CameraWrapper()
+            return camera
 
         except Exception as e:
             print(f"[ERROR] Camera failed: {e}")
@@ -966,8 +911,7 @@ def main():
 
         # 모터 완전 정지
         motor_stop()
-        PWMA.value = 0.0
-        PWMB.value = 0.0
+        motors.cleanup()
         camera.release()
         print("[✓] Cleanup complete")
 
@@ -0,0 +1,961 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+------------
+성능 측정 스크립트 (하드웨어 없이 실행 가능한 항목 위주)
+
+사용법:
+    python benchmark.py state [--seconds 5]
+    python benchmark.py classifier [--frames 캡처폴더] [--limit 200] [--backend auto]
+    python benchmark.py backends [--frames 캡처폴더] [--threads 1 2 3 4]
+    python benchmark.py lanemask [--frames 녹화폴더] [--limit 300] [--lut] [--count 300] [--size 640 480]
+    python benchmark.py steering [--speeds 0.35 0.5 0.75 0.9] [--laps 2] [--latency 2]
+    python benchmark.py profile [--frames 녹화폴더] [--count 900] [--intersection-every 2]
+    python benchmark.py birdseye [--count 300] [--resolution 0.01] [--speeds 0.5 0.9]
+    python benchmark.py motors [--speed 0.75] [--hz 50] [--slew 10]
+    python benchmark.py detector [--seconds 10] [--hz 50] [--synthetic] [--python-ms 25]
+"""
+
+import argparse
+import glob
+import os
+import threading
+import time
+
+import shared_state
+from perf_stats import LatencyStats
+
+
+# ============================================================
+# shared_state 경합 측정 (전역 Lock vs 토픽 발행)
+# ============================================================
+def _legacy_state_run(seconds, io_ms, io_every):
+    """기존 방식: 감지 스레드가 전역 lock 안에서 상태 갱신 + 로그/JPEG 저장"""
+    lock = threading.Lock()
+    state = {name: False for name in shared_state.KNOWN_OBJECTS}
+    frames = {name: 0 for name in shared_state.KNOWN_OBJECTS}
+    hold = LatencyStats("lock 점유 (detector)")
+    wait = LatencyStats("대기 (lane 50Hz)")
+    stop = threading.Event()
+
+    def detector():
+        n = 0
+        while not stop.is_set():
+            n += 1
+            with lock:
+                start = time.perf_counter()
+                for name in state:
+                    hit = (n + len(name)) % 3 == 0
+                    state[name] = hit
+                    frames[name] = frames[name] + 1 if hit else 0
+                if n % io_every == 0:
+                    time.sleep(io_ms / 1000.0)  # 배너 출력 + PIL 저장 구간
+                hold.add((time.perf_counter() - start) * 1000.0)
+            time.sleep(0.2)
+
+    def lane():
+        while not stop.is_set():
+            start = time.perf_counter()
+            with lock:
+                _ = state.copy()
+                _ = frames.copy()
+            wait.add((time.perf_counter() - start) * 1000.0)
+            time.sleep(0.02)
+
+    return _run_pair(detector, lane, stop, seconds), hold, wait
+
+
+def _topic_state_run(seconds, io_ms, io_every):
+    """변경 방식: 불변 스냅샷 발행 후 lock 없이 로그/JPEG 저장"""
+    topic = shared_state.Topic("detections", shared_state.EMPTY_DETECTIONS)
+    hold = LatencyStats("발행 (detector)")
+    wait = LatencyStats("대기 (lane 50Hz)")
+    stop = threading.Event()
+
+    def detector():
+        n = 0
+        while not stop.is_set():
+            n += 1
+            prev = topic.get()
+            start = time.perf_counter()
+            state = {}
+            frames = {}
+            for name in shared_state.KNOWN_OBJECTS:
+                hit = (n + len(name)) % 3 == 0
+                state[name] = hit
+                frames[name] = prev.detection_frames[name] + 1 if hit else 0
+            topic.publish(prev._replace(object_state=shared_state.freeze(state),
+                                        detection_frames=shared_state.freeze(frames)))
+            hold.add((time.perf_counter() - start) * 1000.0)
+            if n % io_every == 0:
+                time.sleep(io_ms / 1000.0)
+            time.sleep(0.2)
+
+    def lane():
+        while not stop.is_set():
+            start = time.perf_counter()
+            snapshot = topic.get()
+            _ = snapshot.object_state
+            _ = snapshot.detection_frames
+            wait.add((time.perf_counter() - start) * 1000.0)
+            time.sleep(0.02)
+
+    return _run_pair(detector, lane, stop, seconds), hold, wait
+
+
+def _run_pair(detector, lane, stop, seconds):
+    threads = [threading.Thread(target=detector, daemon=True),
+               threading.Thread(target=lane, daemon=True)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return seconds
+
+
+def bench_state(args):
+    print("=" * 60)
+    print(" shared_state 경합 측정 (전역 Lock → 토픽 스냅샷)")
+    print(f" 시간 {args.seconds}s | 감지 5Hz | I/O {args.io_ms}ms (매 {args.io_every}회)")
+    print("=" * 60)
+    for label, run in (("기존 (전역 Lock)", _legacy_state_run),
+                       ("변경 (토픽 발행)", _topic_state_run)):
+        _, hold, wait = run(args.seconds, args.io_ms, args.io_every)
+        print(f"\n[{label}]")
+        print("  " + hold.summary())
+        print("  " + wait.summary())
+
+
+# ============================================================
+# 녹화 프레임 로드
+# ============================================================
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_frames(folder, limit=None, rgb=True):
+    """폴더의 이미지를 정렬 순서대로 읽어 리스트로 반환 (기본 RGB)"""
+    import cv2
+
+    paths = sorted(p for p in glob.glob(os.path.join(folder, "*"))
+                   if p.lower().endswith(IMAGE_EXTS))
+    if limit:
+        paths = paths[:limit]
+    frames = []
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        frames.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB) if rgb else img)
+    return frames
+
+
+def detector_roi(frame):
+    """전체 프레임(640 폭 이상)이면 감지 ROI(오른쪽 절반)만, 캡처 이미지면 그대로"""
+    width = frame.shape[1]
+    return frame[:, width // 2:] if width >= 640 else frame
+
+
+# ============================================================
+# 2단계 분류: 박스별 호출 vs 배치 호출
+# ============================================================
+def bench_classifier(args):
+    import object_detector as od
+    from inference_backend import load_model
+
+    folder = args.frames or od.CAPTURE_FOLDER
+    frames = load_frames(folder, args.limit)
+    if not frames:
+        print(f"[❌] 프레임이 없습니다: {folder}")
+        return
+    if not os.path.exists(od.CLASSIFIER_PATH):
+        print(f"[❌] 분류 모델이 없습니다: {od.CLASSIFIER_PATH}")
+        return
+
+    detector = load_model(od.DETECTOR_PATH, "detect", backend=args.backend)
+    classifier = load_model(od.CLASSIFIER_PATH, "classify", backend=args.backend)
+
+    # 모델 준비 (첫 호출 비용 제외)
+    roi = detector_roi(frames[0])
+    detector.detect(roi)
+    od.classify_boxes(classifier, roi, [(0, 0, 32, 32)], batch=True)
+
+    per_box = LatencyStats("박스별 호출")
+    batched = LatencyStats("배치 호출")
+    multi = 0
+    mismatched = 0
+    for frame in frames:
+        roi = detector_roi(frame)
+        boxes_xyxy, _, _ = detector.detect(roi)
+        if len(boxes_xyxy) == 0:
+            continue
+        multi += len(boxes_xyxy) > 1
+
+        with per_box.time():
+            a_ids, _ = od.classify_boxes(classifier, roi, boxes_xyxy, batch=False)
+        with batched.time():
+            b_ids, _ = od.classify_boxes(classifier, roi, boxes_xyxy, batch=True)
+        mismatched += int((a_ids != b_ids).sum())
+
+    print("=" * 60)
+    print(f" 2단계 분류 지연 (프레임 {len(frames)}장, 박스 있는 프레임 {per_box.count}장, "
+          f"다중 박스 {multi}장)")
+    print("=" * 60)
+    for stats in (per_box, batched):
+        print("  " + stats.summary())
+        stats.print_histogram()
+    print(f"  분류 결과 불일치: {mismatched}건")
+
+
+# ============================================================
+# 추론 백엔드 비교 (ms/frame, 메모리)
+# ============================================================
+def _rss_mb():
+    """(현재 RSS, 최대 RSS) MB - /proc/self/status 기준"""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                key, value = line.split(":")
+                values[key] = int(value.split()[0]) / 1024.0
+    return values.get("VmRSS", 0.0), values.get("VmHWM", 0.0)
+
+
+def _measure_backend(backend, threads, folder, limit, queue):
+    """자식 프로세스에서 백엔드 하나를 측정 (메모리 측정이 서로 섞이지 않도록)"""
+    import object_detector as od
+    from inference_backend import load_model
+
+    frames = load_frames(folder, limit)
+    rss_start, _ = _rss_mb()
+    start = time.perf_counter()
+    detector = load_model(od.DETECTOR_PATH, "detect", backend=backend, threads=threads)
+    classifier = None
+    if os.path.exists(od.CLASSIFIER_PATH):
+        classifier = load_model(od.CLASSIFIER_PATH, "classify", backend=backend, threads=threads)
+    load_s = time.perf_counter() - start
+    rss_loaded, _ = _rss_mb()
+
+    stats = LatencyStats(f"{detector.name} (스레드 {threads})")
+    first_ms = None
+    for frame in frames:
+        roi = detector_roi(frame)
+        t0 = time.perf_counter()
+        xyxy, _, _ = detector.detect(roi)
+        if classifier is not None and len(xyxy):
+            od.classify_boxes(classifier, roi, xyxy, batch=True)
+        ms = (time.perf_counter() - t0) * 1000.0
+        if first_ms is None:
+            first_ms = ms  # 첫 프레임은 별도 표시
+        else:
+            stats.add(ms)
+    _, rss_peak = _rss_mb()
+    queue.put((stats.summary(), first_ms or 0.0, load_s,
+               rss_loaded - rss_start, rss_peak))
+
+
+def bench_backends(args):
+    import multiprocessing as mp
+    import object_detector as od
+
+    folder = args.frames or od.CAPTURE_FOLDER
+    if not load_frames(folder, 1):
+        print(f"[❌] 프레임이 없습니다: {folder}")
+        return
+
+    runs = [("torch", 0)] + [("onnx", t) for t in args.threads]
+    print("=" * 70)
+    print(f" 추론 백엔드 비교 (프레임 {folder}, 최대 {args.limit}장)")
+    print("=" * 70)
+    for backend, threads in runs:
+        queue = mp.Queue()
+        proc = mp.Process(target=_measure_backend,
+                          args=(backend, threads or 1, folder, args.limit, queue))
+        proc.start()
+        proc.join()
+        if queue.empty():
+            print(f"  [{backend}] 측정 실패 (exit={proc.exitcode})")
+            continue
+        summary, first_ms, load_s, rss_model, rss_peak = queue.get()
+        print(f"  {summary}")
+        print(f"      └─ 로드 {load_s:.1f}s | 첫 프레임 {first_ms:.0f}ms | "
+              f"모델 메모리 +{rss_model:.0f}MB | 최대 RSS {rss_peak:.0f}MB")
+
+
+# ============================================================
+# 차선 마스크: 박스별 inRange/erode/dilate vs 통합 엔진
+# ============================================================
+LANE_LOWER = (65, 20, 20)     # lane_follow_loop의 lower_cyan
+LANE_UPPER = (115, 255, 255)  # lane_follow_loop의 upper_cyan
+
+
+def lane_boxes(width, height):
+    """lane_follow_loop와 같은 좌하단 / 우하단 / 전방 중앙 박스"""
+    box_w, box_h = int(width * 0.25), int(height * 0.25)
+    center_w, center_h = int(width * 0.6), int(height * 0.15)
+    center_x1, center_y1 = (width - center_w) // 2, int(height * 0.3)
+    return ((0, height - box_h, box_w, height),
+            (width - box_w, height - box_h, width, height),
+            (center_x1, center_y1, center_x1 + center_w, center_y1 + center_h))
+
+
+def _legacy_lane_counts(frame, boxes, lower, upper):
+    """변경 전 방식: 전체 프레임 HSV 변환 후 박스마다 inRange → erode → dilate"""
+    import cv2
+    import numpy as np
+
+    hsv_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+    counts = []
+    for x1, y1, x2, y2 in boxes:
+        mask = cv2.inRange(hsv_frame[y1:y2, x1:x2], lower, upper)
+        kernel = np.ones((3, 3), np.uint8)
+        mask = cv2.erode(mask, kernel, iterations=2)
+        mask = cv2.dilate(mask, kernel, iterations=3)
+        counts.append(cv2.countNonZero(mask))
+    return tuple(counts)
+
+
+def bench_lanemask(args):
+    import numpy as np
+    import object_detector as od
+    from lane_mask import LaneMaskEngine
+
+    folder = args.frames or od.CAPTURE_FOLDER
+    # 카메라 프레임과 같은 메모리 순서 (lane_follow_loop는 변환 없이 그대로 사용)
+    frames = load_frames(folder, args.limit, rgb=False)
+    source = folder
+    if not frames:
+        if args.frames:
+            print(f"[❌] 프레임이 없습니다: {folder}")
+            return
+        # 녹화 프레임이 없으면 가상 트랙 프레임 (교차로 포함)
+        frames, _, _ = _synthetic_frames(args.count, tuple(args.size), 2.0, args.seed)
+        source = "가상 트랙"
+
+    lower, upper = np.array(LANE_LOWER), np.array(LANE_UPPER)
+    engines = [("통합 엔진 (HSV)", LaneMaskEngine(lower, upper))]
+    if args.lut:
+        for bits in (8, 5):
+            start = time.perf_counter()
+            engine = LaneMaskEngine(lower, upper, segmentation="lut", lut_bits=bits)
+            print(f"  [INFO] {bits}비트 조회표 생성 {(time.perf_counter() - start) * 1000:.0f}ms "
+                  f"({engine.lut.table.nbytes / 1024:.0f}KB)")
+            engines.append((f"통합 엔진 (LUT {bits}비트)", engine))
+
+    legacy = LatencyStats("기존 (박스별 3회)")
+    stats = [LatencyStats(name) for name, _ in engines]
+    mismatched = [0] * len(engines)
+    for frame in frames:
+        boxes = lane_boxes(frame.shape[1], frame.shape[0])
+        with legacy.time():
+            expected = _legacy_lane_counts(frame, boxes, lower, upper)
+        for k, (_, engine) in enumerate(engines):
+            with stats[k].time():
+                counts = engine.count(frame, boxes)
+            mismatched[k] += counts != expected
+
+    print("=" * 60)
+    print(f" 차선 마스크 프레임당 지연 ({source} {len(frames)}장, {frames[0].shape[1]}x{frames[0].shape[0]})")
+    print("=" * 60)
+    print("  " + legacy.summary())
+    legacy.print_histogram()
+    for k, s in enumerate(stats):
+        print("  " + s.summary())
+        s.print_histogram()
+        print(f"  픽셀 수 불일치: {mismatched[k]}프레임")
+
+
+# ============================================================
+# 조향: 비율 균형(bang-bang) vs 중심선 PID (가상 트랙 폐루프 주행)
+# ============================================================
+SPEED_TURN = 0.55        # lane_tracer.SPEED_TURN_DEFAULT
+PIXEL_THRESHOLD = 800    # lane_tracer 라인 감지 임계값 (640x480 기준)
+
+
+def _drive_lap(mode, speed, lap_length, fps, size, seed, latency=2, curve=(0.12, 3.0), view="camera",
+               driver=None):
+    """가상 트랙 폐루프 주행 → 결과 딕셔너리
+
+    latency: 캡처 → 모터 반영까지 지연 (프레임 수, 노출 + 처리 + 구동 지연 근사)
+    view: "birdseye"면 PID 띠 중심을 지면 격자(BirdsEyeView)에서 측정
+    driver: 매 틱 명령을 drive(left, right, now)로 넘기고 실제 바퀴에는 driver.output 반영
+    """
+    from collections import deque
+    import numpy as np
+    from camera import CaptureProfile, SyntheticTrackCamera, pixel_scale
+    from lane_mask import LaneMaskEngine
+    from steering import MISSING_PIXELS, BalanceSteering, CentroidSteering, turn_wheels
+    from birdseye import BirdsEyeView, GROUND_DILATE_ITERATIONS, GROUND_ERODE_ITERATIONS
+
+    profile = CaptureProfile(lane_size=size, main_size=size, rotate_180=False, settle=0.0)
+    camera = SyntheticTrackCamera(profile, fps=None, intersection_every=0, noise=2, seed=seed,
+                                  curve_amplitude=curve[0], curve_length=curve[1])
+    engine = LaneMaskEngine(np.array(LANE_LOWER), np.array(LANE_UPPER))
+    width, height = size
+    threshold = PIXEL_THRESHOLD * pixel_scale(profile)
+    balance = BalanceSteering(missing_pixels=int(MISSING_PIXELS * pixel_scale(profile)))
+    centroid = CentroidSteering()
+    birdseye = None
+    if view == "birdseye" and mode != "balance":
+        birdseye = BirdsEyeView(camera.ground_to_image, size)
+        engine = LaneMaskEngine(np.array(LANE_LOWER), np.array(LANE_UPPER),
+                                erode=GROUND_ERODE_ITERATIONS, dilate=GROUND_DILATE_ITERATIONS)
+        width, height = birdseye.size
+    boxes = lane_boxes(width, height)[:2] if mode == "balance" else centroid.boxes(width, height)
+
+    dt = 1.0 / fps
+    t = 0.0
+    timeout = 3.0 * lap_length / (speed * camera.WHEEL_SPEED)  # 직진 주행 시간의 3배
+    errors = []
+    yaw_sign = reversals = 0
+    result = "완주"
+    pending = deque([(0.0, 0.0)] * latency)  # 아직 모터에 반영되지 않은 명령
+    camera.drive(0.0, 0.0, 0.0)  # 폐루프 시작
+    while camera.distance < lap_length:
+        _, lane, _ = camera.read_pair()
+        if birdseye is not None:
+            lane = birdseye.warp(lane)
+        counts = engine.count(lane, boxes)
+        if mode == "balance":
+            if sum(counts) < threshold:
+                result = "라인 이탈"
+                break
+            action, intensity = balance.update(counts[0], counts[1], speed, t)
+            left, right = (speed, speed) if action == "FORWARD" else turn_wheels(action, intensity, SPEED_TURN)
+        else:
+            masks = [engine.region(i) for i in range(len(boxes))]
+            left, right, found = centroid.update(masks, width, speed, t)
+            if not found:
+                result = "라인 이탈"
+                break
+
+        # 좌우 회전 방향이 바뀐 횟수 (진동 지표)
+        sign = (left > right + 1e-3) - (right > left + 1e-3)
+        if sign and yaw_sign and sign != yaw_sign:
+            reversals += 1
+        yaw_sign = sign or yaw_sign
+
+        if driver is not None:
+            driver.drive(left, right, now=t)
+            left, right = driver.output
+        pending.append((left, right))
+        camera.drive(*pending.popleft(), dt)
+        t += dt
+        errors.append(camera.cross_track_error())
+        if abs(errors[-1]) > camera.LANE_HALF_WIDTH:
+            result = "차선 이탈"
+            break
+        if t > timeout:
+            result = "시간 초과"
+            break
+
+    errors = np.abs(np.array(errors or [0.0]))
+    return {
+        "result": result,
+        "time": t,
+        "distance": camera.distance,
+        "cte_rms": float(np.sqrt(np.mean(errors ** 2))),
+        "cte_max": float(errors.max()),
+        "reversals": reversals / t if t > 0 else 0.0,
+    }
+
+
+def bench_steering(args):
+    size = tuple(args.size)
+    lap_length = args.laps * args.lap_length
+    print("=" * 78)
+    print(f" 조향 컨트롤러 비교 (가상 트랙 {lap_length:.0f}m, 곡선 ±{args.curve_amplitude * 100:.0f}cm"
+          f"/{args.curve_length:.1f}m, {args.fps:.0f}fps, 지연 {args.latency}프레임)")
+    print("=" * 78)
+    print(f"  {'모드':8s} {'속도':>5s} | {'결과':8s} {'랩 타임':>8s} {'CTE RMS':>9s} "
+          f"{'CTE 최대':>9s} {'방향 전환':>10s}")
+    for mode in ("balance", "pid"):
+        for speed in args.speeds:
+            r = _drive_lap(mode, speed, lap_length, args.fps, size, args.seed, args.latency,
+                           (args.curve_amplitude, args.curve_length))
+            lap = f"{r['time']:.2f}s" if r["result"] == "완주" else f"{r['distance']:.1f}m"
+            print(f"  {mode:8s} {speed:5.2f} | {r['result']:8s} {lap:>8s} "
+                  f"{r['cte_rms'] * 100:7.1f}cm {r['cte_max'] * 100:7.1f}cm {r['reversals']:8.2f}/s")
+
+
+# ============================================================
+# 차선 프로파일: 스캔 띠 열 히스토그램 지연 / 교차로 감지 (픽셀 수 vs 가로 라인)
+# ============================================================
+CENTER_THRESHOLD = 5000  # lane_tracer 교차로 감지 임계값 (640x480 기준)
+
+
+def _synthetic_frames(count, size, every, seed):
+    """가상 트랙 개루프 프레임 + 프레임별 가장 가까운 교차로 라인까지 거리 (m)"""
+    from camera import CaptureProfile, SyntheticTrackCamera
+
+    profile = CaptureProfile(lane_size=size, main_size=size, rotate_180=False, settle=0.0)
+    camera = SyntheticTrackCamera(profile, fps=None, intersection_every=every, seed=seed)
+    frames, ahead = [], []
+    for _ in range(count):
+        _, lane, _ = camera.read_pair()
+        frames.append(lane.copy())
+        ahead.append((-camera.distance) % every)
+    return frames, ahead, camera.LOOKAHEAD
+
+
+def bench_profile(args):
+    import numpy as np
+    from camera import REFERENCE_SIZE
+    from lane_mask import LaneMaskEngine
+    from lane_profile import LaneProfile
+
+    ahead = None
+    if args.frames:
+        frames = load_frames(args.frames, args.limit, rgb=False)
+        if not frames:
+            print(f"[❌] 프레임이 없습니다: {args.frames}")
+            return
+    else:
+        frames, ahead, lookahead = _synthetic_frames(args.count, tuple(args.size),
+                                                     args.intersection_every, args.seed)
+    height, width = frames[0].shape[:2]
+    scale = (width * height) / float(REFERENCE_SIZE[0] * REFERENCE_SIZE[1])
+
+    lower, upper = np.array(LANE_LOWER), np.array(LANE_UPPER)
+    box_engine = LaneMaskEngine(lower, upper)
+    scan_engine = LaneMaskEngine(lower, upper)
+    lane_profile = LaneProfile()
+    boxes = lane_boxes(width, height)
+    scan_boxes = lane_profile.boxes(width, height)
+    box_time = LatencyStats("박스 3개 마스크")
+    mask_time = LatencyStats("스캔 띠 마스크")
+    profile_time = LatencyStats("열 히스토그램 프로파일")
+
+    pixels_hits, profile_hits = [], []
+    for frame in frames:
+        with box_time.time():
+            left, right, center = box_engine.count(frame, boxes)
+        pixels_hits.append(center > CENTER_THRESHOLD * scale and left + right < PIXEL_THRESHOLD * scale * 2)
+        with mask_time.time():
+            scan_engine.count(frame, scan_boxes)
+        with profile_time.time():
+            result = lane_profile.measure(
+                [scan_engine.region(i) for i in range(len(scan_boxes))], width)
+        profile_hits.append(result.intersection)
+
+    print("=" * 70)
+    print(f" 차선 프로파일 프레임당 지연 (프레임 {len(frames)}장, {width}x{height}, "
+          f"스캔 띠 {len(scan_boxes)}개)")
+    print("=" * 70)
+    for s in (box_time, mask_time, profile_time):
+        print("  " + s.summary())
+    profile_time.print_histogram()
+
+    print("-" * 70)
+    if ahead is None:
+        print(f"  교차로 판정 프레임: 픽셀 수 {sum(pixels_hits)} | 가로 라인 {sum(profile_hits)}")
+        return
+    # 가상 트랙: 교차로 라인이 화면 안(LOOKAHEAD 이내)에 있을 때만 정답
+    visible = [a < lookahead for a in ahead]
+    print(f"  교차로 라인이 보이는 프레임: {sum(visible)}/{len(frames)} "
+          f"(교차로 간격 {args.intersection_every:.1f}m)")
+    for name, hits in (("픽셀 수 (CENTER_THRESHOLD)", pixels_hits), ("가로 라인 (프로파일)", profile_hits)):
+        hit_ahead = [a for a, h, v in zip(ahead, hits, visible) if h and v]
+        false_hits = sum(h and not v for h, v in zip(hits, visible))
+        first = f"{max(hit_ahead):.2f}m 전" if hit_ahead else "-"
+        print(f"  {name:26s} 감지 {len(hit_ahead):4d}프레임 | 오감지 {false_hits:4d} | 최초 감지 {first}")
+
+
+# ============================================================
+# 역원근(bird's-eye) 변환: remap 지연 / 카메라 화면 vs 지면 격자 PID 주행
+# ============================================================
+def bench_birdseye(args):
+    import numpy as np
+    from birdseye import BirdsEyeView, GROUND_DILATE_ITERATIONS, GROUND_ERODE_ITERATIONS
+    from camera import CaptureProfile, SyntheticTrackCamera
+    from lane_mask import LaneMaskEngine
+    from lane_profile import LaneProfile
+
+    size = tuple(args.size)
+    frames, _, _ = _synthetic_frames(args.count, size, 2.0, args.seed)
+    camera = SyntheticTrackCamera(CaptureProfile(lane_size=size, main_size=size, rotate_180=False, settle=0.0))
+
+    start = time.perf_counter()
+    birdseye = BirdsEyeView(camera.ground_to_image, size, resolution=args.resolution)
+    build_ms = (time.perf_counter() - start) * 1000.0
+    pinhole = BirdsEyeView.pinhole(size, resolution=args.resolution)
+
+    lower, upper = np.array(LANE_LOWER), np.array(LANE_UPPER)
+    camera_engine = LaneMaskEngine(lower, upper)
+    ground_engine = LaneMaskEngine(lower, upper, erode=GROUND_ERODE_ITERATIONS,
+                                   dilate=GROUND_DILATE_ITERATIONS)
+    camera_profile, ground_profile = LaneProfile(), LaneProfile()
+    view_w, view_h = birdseye.size
+    warp_time = LatencyStats("remap")
+    camera_time = LatencyStats("카메라 화면 마스크 + 프로파일")
+    ground_time = LatencyStats("remap + 지면 격자 마스크 + 프로파일")
+    for frame in frames:
+        with camera_time.time():
+            camera_engine.count(frame, camera_profile.boxes(size[0], size[1]))
+            camera_profile.measure([camera_engine.region(i) for i in range(len(camera_profile.rows))],
+                                   size[0])
+        with ground_time.time():
+            with warp_time.time():
+                view = birdseye.warp(frame)
+            ground_engine.count(view, ground_profile.boxes(view_w, view_h))
+            ground_profile.measure([ground_engine.region(i) for i in range(len(ground_profile.rows))],
+                                   view_w)
+
+    print("=" * 78)
+    print(f" 역원근 변환 ({size[0]}x{size[1]} → {view_w}x{view_h}, {args.resolution * 100:.1f}cm/px, "
+          f"맵 생성 {build_ms:.1f}ms, 원본 행 {birdseye.source_rows[0]}~{birdseye.source_rows[1]})")
+    print(f" pinhole 기본 보정 화면 포함 비율: {pinhole.coverage:.0%}")
+    print("=" * 78)
+    for s in (warp_time, camera_time, ground_time):
+        print("  " + s.summary())
+
+    print("-" * 78)
+    print(f"  {'화면':8s} {'속도':>5s} | {'결과':8s} {'랩 타임':>8s} {'CTE RMS':>9s} {'CTE 최대':>9s}")
+    for view_name in ("camera", "birdseye"):
+        for speed in args.speeds:
+            r = _drive_lap("pid", speed, args.lap_length, 30.0, size, args.seed, view=view_name)
+            lap = f"{r['time']:.2f}s" if r["result"] == "완주" else f"{r['distance']:.1f}m"
+            print(f"  {view_name:8s} {speed:5.2f} | {r['result']:8s} {lap:>8s} "
+                  f"{r['cte_rms'] * 100:7.1f}cm {r['cte_max'] * 100:7.1f}cm")
+
+
+# ============================================================
+# 모터 핀 쓰기: 매 틱 6핀 전체 vs 바뀐 핀만 (MotorDriver, 가상 트랙 폐루프 주행)
+# ============================================================
+class _LegacyMotors:
+    """변경 전 motor_* 함수: 명령마다 방향 핀 4개 + PWM 2개를 모두 씀"""
+
+    def __init__(self, backend):
+        from motor_driver import LEFT_PINS, RIGHT_PINS
+        self._pins = [[backend.digital(p[0]), backend.digital(p[1]), backend.pwm(p[2])]
+                      for p in (LEFT_PINS, RIGHT_PINS)]
+        self.output = (0.0, 0.0)
+
+    def drive(self, left, right, now=None):
+        self.output = (left, right)
+        for (in1, in2, pwm), value in zip(self._pins, self.output):
+            in1.value = 1 if value < 0 else 0
+            in2.value = 0 if value < 0 else 1
+            pwm.value = min(1.0, abs(value))
+
+
+def bench_motors(args):
+    import math
+    from control_loop import RateLoop
+    from motor_driver import MockBackend, MotorController, MotorDriver
+
+    slew = args.slew if args.slew > 0 else None
+    print("=" * 78)
+    print(f" 모터 핀 쓰기 (가상 트랙 {args.lap_length:.0f}m, 제어 {args.hz:.0f}Hz, 속도 {args.speed}, "
+          f"slew {slew or '없음'}/s)")
+    print("=" * 78)
+    print(f"  {'조향':8s} {'드라이버':10s} | {'핀 쓰기/s':>9s} {'호출당':>7s} {'호출 µs':>8s} | "
+          f"{'결과':8s} {'CTE RMS':>8s}")
+    for mode in ("balance", "pid"):
+        for name in ("legacy", "driver"):
+            backend = MockBackend()
+            driver = _LegacyMotors(backend) if name == "legacy" else MotorDriver(backend, slew_rate=slew)
+            r = _drive_lap(mode, args.speed, args.lap_length, args.hz, (320, 240), args.seed,
+                           driver=driver)
+            ticks = max(1, int(round(r["time"] * args.hz)))
+            backend_writes = backend.writes
+            # drive() 호출 비용 (mock 핀 쓰기 포함 파이썬 시간, 25틱마다 바뀌는 명령)
+            call = LatencyStats("drive")
+            for i in range(2000):
+                value = 0.3 + 0.2 * ((i // 25) % 2)
+                with call.time():
+                    driver.drive(value, value, now=i / args.hz)
+            print(f"  {mode:8s} {name:10s} | {backend_writes / r['time']:9.0f} "
+                  f"{backend_writes / ticks:7.2f} {call.mean_ms * 1000:8.1f} | "
+                  f"{r['result']:8s} {r['cte_rms'] * 100:6.1f}cm")
+
+    # MotorController + 기록 mock 백엔드: set(v, omega) 처리량 / 고정 주기 루프의 명령 간격
+    controller = MotorController("mock", record=True, slew_rate=slew)
+    count = 20000
+    start = time.perf_counter()
+    for i in range(count):
+        controller.set(0.3, math.sin(i / args.hz))
+    throughput = count / (time.perf_counter() - start)
+
+    controller = MotorController("mock", record=True, slew_rate=slew)
+    loop = RateLoop(args.hz)
+    end = time.perf_counter() + args.loop_seconds
+    i = 0
+    while time.perf_counter() < end:
+        loop.wait()
+        controller.set(0.3, math.sin(i / args.hz))
+        controller.update()
+        i += 1
+    interval = LatencyStats("명령 간격")
+    stamps = [entry[0] for entry in controller.log]
+    for prev, cur in zip(stamps, stamps[1:]):
+        interval.add((cur - prev) * 1000.0)
+    writes = controller.backend.log
+    print("-" * 78)
+    print(f"  MotorController.set(v, omega) 처리량 (mock): {throughput:,.0f}회/s")
+    print(f"  {args.hz:.0f}Hz 루프 {args.loop_seconds:.0f}초: 명령 {len(stamps)}회, 핀 쓰기 {len(writes)}회 "
+          f"({len(writes) / args.loop_seconds:.0f}/s), 마감 초과 {loop.missed}")
+    print("  " + interval.summary())
+
+
+# ============================================================
+# 객체 탐지 실행 방식: 스레드 vs 워커 프로세스 (제어 루프 지터)
+# ============================================================
+def _synthetic_detect_loop(python_ms, infer_ms, rate_hz):
+    """모델 없이 object_detect_loop의 프레임 요청 / 발행 순서만 흉내 내는 감지 루프
+
+    python_ms: GIL을 잡는 파이썬 전/후처리, infer_ms: GIL을 놓는 추론 (NumPy 행렬곱)
+    """
+    import numpy as np
+    from startup import timeline
+
+    weights = np.random.default_rng(0).random((256, 256), dtype=np.float32)
+    shared_state.detector_active = True
+    timeline.ready("detector")
+    last_seq = 0
+    while True:
+        seq, frame = shared_state.frame_ring.read_latest()
+        if frame is None or seq == last_seq:
+            time.sleep(0.01)
+            continue
+        last_seq = seq
+        shared_state.frame_due.publish(float("inf"))
+
+        roi = np.ascontiguousarray(frame[:, frame.shape[1] // 2:])
+        end = time.perf_counter() + infer_ms / 1000.0
+        while time.perf_counter() < end:
+            weights @ weights
+        end = time.perf_counter() + python_ms / 1000.0
+        total = 0
+        while time.perf_counter() < end:
+            total += int(roi[total % roi.shape[0], 0, 0])
+
+        shared_state.detections.publish(shared_state.EMPTY_DETECTIONS)
+        shared_state.frame_due.publish(time.time() + 1.0 / rate_hz)
+
+
+def _measure_detector_mode(mode, seconds, hz, target, queue):
+    """자식 프로세스에서 실행 방식 하나를 측정 (감지 스레드 / 워커가 측정 사이에 남지 않도록)"""
+    import numpy as np
+    from camera import LANE_PROFILE, SyntheticTrackCamera
+    from capture_thread import CaptureThread
+    from control_loop import RateLoop
+    from lane_mask import LaneMaskEngine
+    from lane_profile import LaneProfile
+    from startup import timeline
+
+    timeline.expect("detector")
+    detector = None
+    if mode == "process":
+        from detector_process import DetectorProcess
+        detector = DetectorProcess(LANE_PROFILE.main_size, target=target).start()
+    else:
+        if target is None:
+            from object_detector import object_detect_loop as target
+        threading.Thread(target=target, name="detector", daemon=True).start()
+    ready = timeline.wait("detector", timeout=120.0)
+
+    # lane_follow_loop와 같은 구성: 캡처 스레드가 frame_due 이후 main 프레임을 링에 기록
+    capture = CaptureThread(
+        SyntheticTrackCamera(LANE_PROFILE, fps=30.0),
+        want_main=lambda: time.time() >= shared_state.frame_due.get(),
+        on_main=shared_state.frame_ring.write,
+    ).start()
+    capture.read(timeout=5.0)
+    lower, upper = np.array(LANE_LOWER), np.array(LANE_UPPER)
+    mask_engine = LaneMaskEngine(lower, upper)
+    profile_engine = LaneMaskEngine(lower, upper)
+    lane_profile = LaneProfile()
+
+    interval = LatencyStats("틱 간격")
+    wake = LatencyStats("기상 지연")     # 마감 시각 → 실제로 깨어난 시각
+    loop = RateLoop(hz)
+    first_seq, _ = shared_state.detections.read()
+    last = None
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        deadline = loop.wait()
+        now = time.perf_counter()
+        wake.add((now - deadline) * 1000.0)
+        if last is not None:
+            interval.add((now - last) * 1000.0)
+        last = now
+
+        _, _, frame = capture.read(wait=False)
+        height, width = frame.shape[:2]
+        mask_engine.count(frame, lane_boxes(width, height))
+        boxes = lane_profile.boxes(width, height)
+        profile_engine.count(frame, boxes)
+        lane_profile.measure([profile_engine.region(i) for i in range(len(boxes))], width)
+    detections = shared_state.detections.read()[0] - first_seq
+
+    capture.release()
+    restarts = 0
+    if detector is not None:
+        detector.stop()
+        restarts = detector.restarts
+    queue.put((ready, interval.summary(), wake.summary(), interval.percentile(99), wake.percentile(99),
+               loop.missed, loop.ticks, loop.work.mean_ms, detections / seconds, restarts))
+
+
+def bench_detector(args):
+    import functools
+    import multiprocessing as mp
+    import object_detector as od
+
+    synthetic = args.synthetic or not os.path.exists(od.DETECTOR_PATH)
+    target = None
+    if synthetic:
+        # 워커 프로세스로 넘기므로 pickle 가능한 모듈 수준 함수
+        target = functools.partial(_synthetic_detect_loop, args.python_ms, args.infer_ms, args.rate)
+        source = (f"가상 감지기 (파이썬 {args.python_ms:.0f}ms + 추론 {args.infer_ms:.0f}ms, "
+                  f"최대 {args.rate:.0f}Hz)")
+    else:
+        source = f"object_detect_loop ({os.path.basename(od.DETECTOR_PATH)})"
+
+    print("=" * 78)
+    print(f" 객체 탐지 스레드 vs 워커 프로세스: {args.hz:.0f}Hz 제어 루프 지터 ({args.seconds:.0f}초)")
+    print(f" 감지기: {source}")
+    print("=" * 78)
+    rows = []
+    for mode in ("thread", "process"):
+        queue = mp.Queue()
+        proc = mp.Process(target=_measure_detector_mode,
+                          args=(mode, args.seconds, args.hz, target, queue))
+        proc.start()
+        proc.join()
+        if queue.empty():
+            print(f"  [{mode}] 측정 실패 (exit={proc.exitcode})")
+            continue
+        (ready, interval, wake, interval_p99, wake_p99,
+         missed, ticks, work_ms, det_hz, restarts) = queue.get()
+        rows.append((mode, interval_p99, wake_p99, missed, ticks, work_ms, det_hz))
+        print(f"  [{mode}]" + ("" if ready else " (감지기 준비 실패 - 감지 없이 측정)"))
+        print(f"    {interval}")
+        print(f"    {wake}")
+        print(f"    마감 초과 {missed}/{ticks} | 제어 처리 평균 {work_ms:.2f}ms | "
+              f"감지 발행 {det_hz:.1f}Hz | 재시작 {restarts}")
+
+    print("-" * 78)
+    print(f"  {'방식':8s} | {'틱 간격 p99':>11s} {'기상 지연 p99':>13s} {'마감 초과':>9s} "
+          f"{'처리 ms':>8s} {'감지 Hz':>8s}")
+    for mode, interval_p99, wake_p99, missed, ticks, work_ms, det_hz in rows:
+        print(f"  {mode:8s} | {interval_p99:9.2f}ms {wake_p99:11.2f}ms {missed:9d} "
+              f"{work_ms:8.2f} {det_hz:8.1f}")
+
+
+# ============================================================
+# 메인
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description='자율주행 파이프라인 성능 측정')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('state', help='shared_state lock 점유 / 대기 시간 비교')
+    p.add_argument('--seconds', type=float, default=5.0, help='측정 시간 (default: 5)')
+    p.add_argument('--io-ms', type=float, default=40.0,
+                   help='lock 안에서 수행되던 로그/JPEG 저장 시간 (default: 40)')
+    p.add_argument('--io-every', type=int, default=5,
+                   help='I/O가 발생하는 감지 주기 (default: 5)')
+    p.set_defaults(func=bench_state)
+
+    p = sub.add_parser('classifier', help='2단계 분류 박스별 vs 배치 지연 비교')
+    p.add_argument('--frames', type=str, default=None,
+                   help='녹화 프레임 폴더 (default: object_detector.CAPTURE_FOLDER)')
+    p.add_argument('--limit', type=int, default=200, help='최대 프레임 수 (default: 200)')
+    p.add_argument('--backend', type=str, default='auto', choices=['auto', 'onnx', 'torch'],
+                   help='추론 백엔드 (default: auto)')
+    p.set_defaults(func=bench_classifier)
+
+    p = sub.add_parser('backends', help='PyTorch vs ONNX Runtime ms/frame, 메모리 비교')
+    p.add_argument('--frames', type=str, default=None,
+                   help='녹화 프레임 폴더 (default: object_detector.CAPTURE_FOLDER)')
+    p.add_argument('--limit', type=int, default=100, help='최대 프레임 수 (default: 100)')
+    p.add_argument('--threads', type=int, nargs='+', default=[1, 2, 3, 4],
+                   help='ONNX Runtime intra-op 스레드 수 목록 (default: 1 2 3 4)')
+    p.set_defaults(func=bench_backends)
+
+    p = sub.add_parser('lanemask', help='차선 마스크 박스별 처리 vs 통합 엔진 지연 비교')
+    p.add_argument('--frames', type=str, default=None,
+                   help='녹화 프레임 폴더 (default: object_detector.CAPTURE_FOLDER, 비어 있으면 가상 트랙)')
+    p.add_argument('--limit', type=int, default=300, help='최대 프레임 수 (default: 300)')
+    p.add_argument('--lut', action='store_true',
+                   help='HSV 조회표 모드(8비트 / 5비트)도 함께 측정')
+    p.add_argument('--count', type=int, default=300,
+                   help='녹화 프레임이 없을 때 가상 트랙 프레임 수 (default: 300)')
+    p.add_argument('--size', type=int, nargs=2, default=[640, 480],
+                   help='가상 트랙 해상도 (default: 640 480)')
+    p.add_argument('--seed', type=int, default=0, help='노이즈 시드 (default: 0)')
+    p.set_defaults(func=bench_lanemask)
+
+    p = sub.add_parser('steering', help='비율 균형 vs 중심선 PID 조향 랩 타임 / 횡방향 오차 비교')
+    p.add_argument('--speeds', type=float, nargs='+', default=[0.35, 0.5, 0.75, 0.9],
+                   help='기본 전진 속도 목록 (default: 0.35 0.5 0.75 0.9)')
+    p.add_argument('--laps', type=int, default=2, help='랩 수 (default: 2)')
+    p.add_argument('--lap-length', type=float, default=9.0,
+                   help='랩 길이 m (default: 9 = 곡선 3주기)')
+    p.add_argument('--fps', type=float, default=30.0, help='제어 주기 / 카메라 fps (default: 30)')
+    p.add_argument('--size', type=int, nargs=2, default=[320, 240],
+                   help='lane 스트림 해상도 (default: 320 240)')
+    p.add_argument('--latency', type=int, default=2,
+                   help='캡처 → 모터 반영 지연 프레임 수 (default: 2)')
+    p.add_argument('--curve-amplitude', type=float, default=0.12,
+                   help='곡선 좌우 진폭 m (default: 0.12)')
+    p.add_argument('--curve-length', type=float, default=3.0,
+                   help='곡선 주기 m (default: 3.0)')
+    p.add_argument('--seed', type=int, default=0, help='노이즈 시드 (default: 0)')
+    p.set_defaults(func=bench_steering)
+
+    p = sub.add_parser('profile', help='스캔 띠 차선 프로파일 지연 / 교차로 감지 비교')
+    p.add_argument('--frames', type=str, default=None,
+                   help='녹화 프레임 폴더 (default: 가상 트랙 프레임 생성)')
+    p.add_argument('--limit', type=int, default=300, help='녹화 프레임 최대 수 (default: 300)')
+    p.add_argument('--count', type=int, default=900, help='가상 트랙 프레임 수 (default: 900)')
+    p.add_argument('--size', type=int, nargs=2, default=[320, 240],
+                   help='가상 트랙 해상도 (default: 320 240)')
+    p.add_argument('--intersection-every', type=float, default=2.0,
+                   help='가상 트랙 교차로 간격 m (default: 2)')
+    p.add_argument('--seed', type=int, default=0, help='노이즈 시드 (default: 0)')
+    p.set_defaults(func=bench_profile)
+
+    p = sub.add_parser('birdseye', help='역원근 변환 지연 / 카메라 화면 vs 지면 격자 PID 주행 비교')
+    p.add_argument('--count', type=int, default=300, help='가상 트랙 프레임 수 (default: 300)')
+    p.add_argument('--size', type=int, nargs=2, default=[320, 240],
+                   help='lane 스트림 해상도 (default: 320 240)')
+    p.add_argument('--resolution', type=float, default=0.01, help='지면 격자 m/px (default: 0.01)')
+    p.add_argument('--speeds', type=float, nargs='+', default=[0.5, 0.9],
+                   help='PID 주행 속도 목록 (default: 0.5 0.9)')
+    p.add_argument('--lap-length', type=float, default=9.0, help='주행 거리 m (default: 9)')
+    p.add_argument('--seed', type=int, default=0, help='노이즈 시드 (default: 0)')
+    p.set_defaults(func=bench_birdseye)
+
+    p = sub.add_parser('motors', help='모터 핀 쓰기 횟수 / 초: 매 틱 전체 vs 바뀐 핀만')
+    p.add_argument('--speed', type=float, default=0.75, help='기본 전진 속도 (default: 0.75)')
+    p.add_argument('--hz', type=float, default=50.0, help='제어 주기 (default: 50)')
+    p.add_argument('--slew', type=float, default=10.0,
+                   help='PWM 변화량 제한 /s, 0이면 제한 없음 (default: 10)')
+    p.add_argument('--lap-length', type=float, default=9.0, help='주행 거리 m (default: 9)')
+    p.add_argument('--loop-seconds', type=float, default=2.0,
+                   help='고정 주기 루프 명령 간격 측정 시간 (default: 2)')
+    p.add_argument('--seed', type=int, default=0, help='노이즈 시드 (default: 0)')
+    p.set_defaults(func=bench_motors)
+
+    p = sub.add_parser('detector', help='객체 탐지 스레드 vs 워커 프로세스 제어 루프 지터 비교')
+    p.add_argument('--seconds', type=float, default=10.0, help='방식별 측정 시간 (default: 10)')
+    p.add_argument('--hz', type=float, default=50.0, help='제어 주기 (default: 50)')
+    p.add_argument('--synthetic', action='store_true',
+                   help='모델이 있어도 가상 감지기로 측정 (모델이 없으면 항상 가상 감지기)')
+    p.add_argument('--python-ms', type=float, default=25.0,
+                   help='가상 감지기의 GIL을 잡는 전/후처리 시간 (default: 25)')
+    p.add_argument('--infer-ms', type=float, default=60.0,
+                   help='가상 감지기의 GIL을 놓는 추론 시간 (default: 60)')
+    p.add_argument('--rate', type=float, default=10.0, help='가상 감지기 최대 감지 주기 Hz (default: 10)')
+    p.set_defaults(func=bench_detector)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
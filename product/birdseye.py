@@ -0,0 +1,124 @@
+"""
+birdseye.py
+-----------
+역원근(bird's-eye) 변환: 카메라 프레임 → 지면 좌표 격자
+
+원근 화면의 박스 픽셀 수는 같은 라인이라도 거리에 따라 달라진다.
+여기서는 지면 위 관심 영역(좌우 GROUND_X_RANGE, 전방 GROUND_D_RANGE)을
+GROUND_RESOLUTION(m/px) 격자로 잡고, 격자 점마다 카메라 화면 좌표를 한 번만 계산해
+cv2.remap 고정소수점 맵(CV_16SC2)으로 만들어 둔다.
+매 프레임은 이 작은 격자(기본 90x80)만 remap하므로 변환 비용은 출력 픽셀 수에 비례한다.
+
+* 열: 왼쪽 → 오른쪽 (x, 차량 기준 오른쪽 +), 행: 위 = 먼 곳 (d, 차량 앞 거리)
+* 보정은 두 가지
+  - pinhole(): 카메라 높이 / 하향 각도 / 수평 화각 (기본값 CAMERA_*)
+  - from_points(): 화면에서 찍은 지면 위 4점 ↔ 실제 좌표 (m) 호모그래피
+* 하드웨어 없이 확인할 때는 SyntheticTrackCamera.ground_to_image를 그대로 넘기면 된다
+"""
+
+import cv2
+import numpy as np
+
+# ======================================
+# 지면 격자 (차량 기준, m)
+# ======================================
+GROUND_X_RANGE = (-0.45, 0.45)   # 좌우 범위 (차선 폭 0.6m + 여유)
+GROUND_D_RANGE = (0.15, 0.95)    # 전방 거리 범위 (범퍼 바로 앞은 화면에 안 잡힘)
+GROUND_RESOLUTION = 0.01         # m/px (라인 폭 3cm ≈ 3px)
+
+# 격자 해상도에 맞춘 노이즈 제거 (LaneMaskEngine 기본 2/3회는 3px 라인을 지워버림)
+GROUND_ERODE_ITERATIONS = 1
+GROUND_DILATE_ITERATIONS = 1
+
+# ======================================
+# 기본 카메라 장착값 (pinhole 보정, 차체에서 다시 측정할 것)
+# ======================================
+CAMERA_HEIGHT = 0.12     # 지면 ~ 렌즈 높이 (m)
+CAMERA_PITCH = 30.0      # 수평 대비 하향 각도 (도)
+CAMERA_HFOV = 62.2       # 수평 화각 (도, Pi Camera v2)
+CAMERA_OFFSET = 0.0      # 렌즈 ~ 차량 기준점 전방 거리 (m)
+
+
+class BirdsEyeView:
+    """project(x, d) → (u, v) 화면 좌표 함수로 remap 맵을 한 번 만들고 warp()로 변환"""
+
+    def __init__(self, project, image_size, x_range=GROUND_X_RANGE, d_range=GROUND_D_RANGE,
+                 resolution=GROUND_RESOLUTION):
+        self.image_size = tuple(image_size)
+        self.x_range = x_range
+        self.d_range = d_range
+        self.resolution = resolution
+        cols = int(round((x_range[1] - x_range[0]) / resolution))
+        rows = int(round((d_range[1] - d_range[0]) / resolution))
+        self.size = (cols, rows)
+
+        # 격자 픽셀 중심의 지면 좌표
+        xs = x_range[0] + (np.arange(cols) + 0.5) * resolution
+        ds = d_range[1] - (np.arange(rows) + 0.5) * resolution
+        grid_x, grid_d = np.meshgrid(xs, ds)
+        u, v = project(grid_x, grid_d)
+        u = np.asarray(u, np.float32)
+        v = np.asarray(v, np.float32)
+
+        # 화면 밖 격자 점은 remap 경계값(0 = 검정, 차선 아님)
+        w, h = self.image_size
+        self.valid = (u >= 0) & (u <= w - 1) & (v >= 0) & (v <= h - 1)
+        self.coverage = float(self.valid.mean())
+        u[~self.valid] = -1
+        v[~self.valid] = -1
+        self.map1, self.map2 = cv2.convertMaps(u, v, cv2.CV_16SC2)
+        # 변환에 쓰이는 원본 행 범위 (차선 영역)
+        self.source_rows = (int(v[self.valid].min()), int(v[self.valid].max()) + 1) \
+            if self.valid.any() else (0, 0)
+        self._out = np.empty((rows, cols, 3), np.uint8)
+
+    # ------------------------------------------------------------
+    # 보정
+    # ------------------------------------------------------------
+    @classmethod
+    def pinhole(cls, image_size, height=CAMERA_HEIGHT, pitch=CAMERA_PITCH, hfov=CAMERA_HFOV,
+                offset=CAMERA_OFFSET, **kwargs):
+        """카메라 높이(m) / 하향 각도(도) / 수평 화각(도)으로 보정"""
+        w, h = image_size
+        focal = (w / 2.0) / np.tan(np.radians(hfov) / 2.0)
+        sin_p, cos_p = np.sin(np.radians(pitch)), np.cos(np.radians(pitch))
+
+        def project(x, d):
+            d = d - offset
+            forward = d * cos_p + height * sin_p   # 광축 방향 거리
+            down = height * cos_p - d * sin_p      # 광축 아래쪽 거리
+            return w / 2.0 + focal * x / forward, h / 2.0 + focal * down / forward
+
+        return cls(project, image_size, **kwargs)
+
+    @classmethod
+    def from_points(cls, image_size, image_points, ground_points, **kwargs):
+        """화면 좌표 4점 [(u, v)] ↔ 지면 좌표 4점 [(x, d)] (m) 호모그래피로 보정"""
+        matrix = cv2.getPerspectiveTransform(np.float32(ground_points), np.float32(image_points))
+
+        def project(x, d):
+            pts = np.stack([x, d], axis=-1).reshape(-1, 1, 2).astype(np.float32)
+            uv = cv2.perspectiveTransform(pts, matrix).reshape(x.shape + (2,))
+            return uv[..., 0], uv[..., 1]
+
+        return cls(project, image_size, **kwargs)
+
+    # ------------------------------------------------------------
+    # 변환
+    # ------------------------------------------------------------
+    def warp(self, frame):
+        """카메라 프레임 → 지면 격자 이미지 (내부 버퍼 재사용, 다음 warp 전까지 유효)"""
+        if frame.shape[1::-1] != self.image_size:
+            raise ValueError(f"보정 해상도 {self.image_size}와 프레임 {frame.shape[1::-1]}가 다릅니다")
+        return cv2.remap(frame, self.map1, self.map2, cv2.INTER_LINEAR, dst=self._out,
+                         borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+    @property
+    def half_width(self):
+        """격자 중심 ~ 좌우 끝 거리 (m), 화면 중심 대비 -1.0~1.0 오차를 m로 바꿀 때 사용"""
+        return (self.x_range[1] - self.x_range[0]) / 2.0
+
+    def to_ground(self, col, row):
+        """격자 픽셀 좌표 → 지면 좌표 (x, d) (m)"""
+        return (self.x_range[0] + (col + 0.5) * self.resolution,
+                self.d_range[1] - (row + 0.5) * self.resolution)
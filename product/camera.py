@@ -0,0 +1,458 @@
+"""
+camera.py
+---------
+카메라 캡처 프로파일 / 백엔드 (하드웨어 없이도 같은 인터페이스로 실행)
+
+차선 주행은 하단 모서리 박스와 중앙 띠만 사용하므로 저해상도 스트림으로 충분하다.
+* lane : 저해상도 스트림 (Picamera2 lores, 기본 320x240) - 매 프레임 사용
+* main : 감지용 고해상도 스트림 (기본 640x480) - 감지 스레드가 요청한 프레임만 복사
+* 180° 회전은 센서 transform(hflip + vflip)으로 처리 (CPU cv2.flip 제거)
+* 노출 안정화(profile.settle)는 settled_at 시각으로만 기록하고 wait_settled()에서 대기
+  (open_camera(wait_settle=False)면 그동안 다른 초기화를 진행할 수 있음)
+
+백엔드
+* picamera2 : 라즈베리파이 카메라 (lores + main)
+* v4l2      : USB 웹캠 등 /dev/videoN (cv2.VideoCapture)
+* replay    : 녹화 영상 파일 또는 이미지 폴더 재생
+* synthetic : 곡선 / 교차로가 있는 가상 트랙 생성
+* fake      : 고정 장면 (직선 트랙)
+
+모든 백엔드는 같은 색 순서를 반환한다.
+* order="bgr" (기본) : Picamera2 "RGB888"의 메모리 순서 = BGR = cv2.imread / V4L2와 동일
+* order="rgb"        : R/B를 바꾼 순서 (기존 루트 트레이서의 RGB2BGR 변환과 같은 결과)
+프레임은 백엔드 내부 버퍼를 재사용하므로 다음 read 전까지만 유효하다.
+
+    camera = open_camera("picamera2")   # "synthetic", "replay", path="rec/" ...
+    camera = open_camera("picamera2", wait_settle=False)   # ... 다른 초기화 ... camera.wait_settled()
+    ok, lane, main = camera.read_pair(with_main=True)
+"""
+
+import glob
+import os
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+CaptureProfile = namedtuple("CaptureProfile", [
+    "lane_size",    # (w, h) 차선 주행용 스트림
+    "main_size",    # (w, h) 감지용 스트림
+    "rotate_180",   # 센서 transform으로 180° 회전
+    "settle",       # 시작 후 노출 안정화 대기 (초)
+])
+
+LANE_PROFILE = CaptureProfile(lane_size=(320, 240), main_size=(640, 480), rotate_180=True, settle=2.0)
+
+# Picamera2: 노출 안정화 중 메타데이터 AeLocked를 확인할 최소 프레임 수 (그 전에는 잠금 무시)
+SETTLE_MIN_FRAMES = 3
+
+# 차선 임계값(PIXEL_THRESHOLD 등)이 맞춰져 있는 기준 해상도
+REFERENCE_SIZE = (640, 480)
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def pixel_scale(profile):
+    """기준 해상도 대비 lane 스트림 픽셀 수 비율 (픽셀 수 임계값 보정용)"""
+    w, h = profile.lane_size
+    return (w * h) / float(REFERENCE_SIZE[0] * REFERENCE_SIZE[1])
+
+
+class Camera:
+    """공통 부분: 출력 버퍼 / 색 순서 / lane 축소"""
+
+    name = "camera"
+
+    def __init__(self, profile=LANE_PROFILE, order="bgr"):
+        if order not in ("bgr", "rgb"):
+            raise ValueError(f"알 수 없는 색 순서: {order}")
+        self.profile = profile
+        self.order = order
+        self.frames = 0
+        self.settled_at = 0.0  # 노출 안정화 완료 예정 시각 (time.time 기준)
+        lw, lh = profile.lane_size
+        mw, mh = profile.main_size
+        self._lane = np.empty((lh, lw, 3), np.uint8)
+        self._main = np.empty((mh, mw, 3), np.uint8)
+
+    def _emit(self, main_src, with_main, flip=False):
+        """BGR main 해상도 원본 → (lane 버퍼, main 버퍼 또는 None)
+
+        flip=True면 센서 transform이 없는 백엔드용 CPU 180° 회전
+        """
+        if flip:
+            cv2.flip(main_src, -1, dst=self._main)
+            main_src = self._main
+        if self.order == "rgb":
+            cv2.cvtColor(main_src, cv2.COLOR_BGR2RGB, dst=self._main)
+            main_src = self._main
+        if self._lane.shape == main_src.shape:
+            np.copyto(self._lane, main_src)
+        else:
+            cv2.resize(main_src, self.profile.lane_size, dst=self._lane, interpolation=cv2.INTER_AREA)
+        if not with_main:
+            return self._lane, None
+        if main_src is not self._main:
+            np.copyto(self._main, main_src)
+        return self._lane, self._main
+
+    def read_pair(self, with_main=False):
+        """(ok, lane 프레임, main 프레임 또는 None)"""
+        raise NotImplementedError
+
+    def wait_settled(self):
+        """노출 안정화 시각까지 대기 → 실제 대기 시간 (초)"""
+        wait = self.settled_at - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        return max(0.0, wait)
+
+    def read(self):
+        ok, lane, _ = self.read_pair()
+        return ok, lane
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# ============================================================
+# Picamera2 백엔드
+# ============================================================
+class Picamera2Camera(Camera):
+    """lores(YUV420) → lane, main(RGB888) → 감지용 (한 번의 요청에서 둘 다 획득)
+
+    lane / main 크기가 같으면 main 스트림 하나만 사용한다.
+    """
+
+    name = "picamera2"
+
+    def __init__(self, profile=LANE_PROFILE, order="bgr"):
+        from picamera2 import MappedArray, Picamera2
+        from libcamera import Transform
+
+        super().__init__(profile, order)
+        self.picam2 = Picamera2()
+        self._mapped = MappedArray  # 요청 버퍼를 복사 없이 view로 (make_array는 매번 새 배열 할당)
+        transform = Transform(hflip=1, vflip=1) if profile.rotate_180 else Transform()
+        self._use_lores = profile.lane_size != profile.main_size
+        streams = {"main": {"format": "RGB888", "size": profile.main_size}}
+        if self._use_lores:
+            # lores는 라즈베리파이 4에서 YUV420만 지원 → BGR로 직접 변환
+            streams["lores"] = {"format": "YUV420", "size": profile.lane_size}
+        config = self.picam2.create_preview_configuration(transform=transform, **streams)
+        self.picam2.configure(config)
+        self.picam2.start()
+        self.settled_at = time.time() + profile.settle
+
+    def wait_settled(self):
+        """AE가 수렴(AeLocked)하면 settle 시간 전이라도 종료"""
+        start = time.time()
+        frames = 0
+        while time.time() < self.settled_at:
+            metadata = self.picam2.capture_metadata()
+            frames += 1
+            if frames >= SETTLE_MIN_FRAMES and metadata.get("AeLocked"):
+                self.settled_at = time.time()
+                break
+        return time.time() - start
+
+    def read_pair(self, with_main=False):
+        request = self.picam2.capture_request()
+        try:
+            # 요청 버퍼 view에서 미리 할당한 _lane / _main으로 바로 복사 (release 전에)
+            if not self._use_lores:
+                with self._mapped(request, "main") as m:
+                    lane, main = self._emit(m.array, with_main)
+            else:
+                code = cv2.COLOR_YUV2RGB_I420 if self.order == "rgb" else cv2.COLOR_YUV2BGR_I420
+                with self._mapped(request, "lores") as m:
+                    cv2.cvtColor(m.array, code, dst=self._lane)
+                lane, main = self._lane, None
+                if with_main:
+                    with self._mapped(request, "main") as m:
+                        if self.order == "rgb":
+                            cv2.cvtColor(m.array, cv2.COLOR_BGR2RGB, dst=self._main)
+                        else:
+                            np.copyto(self._main, m.array)
+                    main = self._main
+        finally:
+            request.release()
+        self.frames += 1
+        return True, lane, main
+
+    def release(self):
+        self.picam2.stop()
+        self.picam2.close()
+
+
+# ============================================================
+# V4L2 백엔드 (USB 웹캠 / 노트북 카메라)
+# ============================================================
+class V4L2Camera(Camera):
+    """cv2.VideoCapture(CAP_V4L2) - BGR 프레임, 180° 회전은 CPU에서"""
+
+    name = "v4l2"
+
+    def __init__(self, profile=LANE_PROFILE, order="bgr", device=0):
+        super().__init__(profile, order)
+        self.cap = cv2.VideoCapture(device, cv2.CAP_V4L2)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"V4L2 장치를 열 수 없습니다: {device}")
+        w, h = profile.main_size
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 오래된 프레임이 쌓이지 않도록
+        self._raw = None
+        self.settled_at = time.time() + profile.settle
+
+    def read_pair(self, with_main=False):
+        ok, self._raw = self.cap.read(self._raw)
+        if not ok:
+            return False, None, None
+        raw = self._raw
+        if raw.shape[1::-1] != self.profile.main_size:
+            raw = cv2.resize(raw, self.profile.main_size)
+        lane, main = self._emit(raw, with_main, flip=self.profile.rotate_180)
+        self.frames += 1
+        return True, lane, main
+
+    def release(self):
+        self.cap.release()
+
+
+# ============================================================
+# 재생 백엔드 (녹화 영상 / 이미지 폴더)
+# ============================================================
+class ReplayCamera(Camera):
+    """녹화 파일 재생 - 이미 회전된 카메라 순서(BGR) 프레임으로 가정
+
+    fps=None이면 대기 없이 최대 속도로, loop=True면 끝에서 처음으로 되감기
+    """
+
+    name = "replay"
+
+    def __init__(self, profile=LANE_PROFILE, order="bgr", path=None, fps=None, loop=False):
+        super().__init__(profile, order)
+        if path is None:
+            raise ValueError("replay 백엔드에는 path가 필요합니다")
+        self.path = path
+        self.loop = loop
+        self.period = 1.0 / fps if fps else 0.0
+        self._last = 0.0
+        self._raw = None
+        self._index = 0
+        if os.path.isdir(path):
+            self._paths = sorted(p for p in glob.glob(os.path.join(path, "*"))
+                                 if p.lower().endswith(IMAGE_EXTS))
+            if not self._paths:
+                raise RuntimeError(f"이미지가 없습니다: {path}")
+            self.cap = None
+        else:
+            self._paths = None
+            self.cap = cv2.VideoCapture(path)
+            if not self.cap.isOpened():
+                raise RuntimeError(f"영상을 열 수 없습니다: {path}")
+
+    def _next_raw(self):
+        if self.cap is not None:
+            ok, self._raw = self.cap.read(self._raw)
+            if not ok and self.loop:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, self._raw = self.cap.read(self._raw)
+            return self._raw if ok else None
+        if self._index >= len(self._paths):
+            if not self.loop:
+                return None
+            self._index = 0
+        image = cv2.imread(self._paths[self._index])
+        self._index += 1
+        return image
+
+    def read_pair(self, with_main=False):
+        raw = self._next_raw()
+        if raw is None:
+            return False, None, None
+        if raw.shape[1::-1] != self.profile.main_size:
+            raw = cv2.resize(raw, self.profile.main_size)
+        if self.period:
+            wait = self._last + self.period - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self._last = time.time()
+        lane, main = self._emit(raw, with_main)
+        self.frames += 1
+        return True, lane, main
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+# ============================================================
+# 가상 트랙 백엔드
+# ============================================================
+class SyntheticTrackCamera(Camera):
+    """카메라 시점의 2차선 트랙을 그려서 반환 (원근은 행별 배율로 근사)
+
+    * 차선 중심이 주행 거리에 따라 사인 곡선으로 좌우로 휘어짐
+    * intersection_every(m)마다 가로 라인(교차로)이 다가옴
+    * 매 프레임 speed(m/s) / fps 만큼 전진 (fps=None이면 대기 없이 생성)
+    * drive(left, right, dt)를 호출하면 그때부터 폐루프: 바퀴 출력으로 차량 위치 / 방향을
+      적분하고 차선 중심 대비 횡방향 오차(cross_track_error)를 추적
+    """
+
+    name = "synthetic"
+
+    LINE_COLOR = (0, 255, 255)   # 노란 라인 (BGR) - lane_tracer HSV 범위에 해당
+    FLOOR_COLOR = (70, 70, 70)
+    LOOKAHEAD = 1.2              # 화면 상단까지 거리 (m)
+    LANE_HALF_WIDTH = 0.3       # 차선 중심 ~ 라인 거리 (m)
+    LINE_WIDTH = 0.03            # 라인 폭 (m)
+    WHEEL_SPEED = 0.5            # 바퀴 출력 1.0일 때 속도 (m/s)
+    WHEEL_BASE = 0.15            # 좌우 바퀴 간격 (m)
+    MOTOR_TAU = 0.1              # 바퀴 속도 응답 시정수 (초, 1차 지연)
+
+    def __init__(self, profile=LANE_PROFILE, order="bgr", fps=30.0, speed=0.3,
+                 curve_amplitude=0.12, curve_length=3.0, intersection_every=4.0,
+                 noise=4, seed=0):
+        super().__init__(profile, order)
+        self.fps = fps
+        self.speed = speed
+        self.curve_amplitude = curve_amplitude
+        self.curve_length = curve_length
+        self.intersection_every = intersection_every
+        self.noise = noise
+        self.distance = 0.0
+        self.lateral = None          # 폐루프 차량 횡방향 위치 (m), None이면 항상 차선 중심
+        self.heading = 0.0           # 폐루프 차량 방향 (rad, 오른쪽 +)
+        self._wheels = [0.0, 0.0]    # 실제 바퀴 출력 (명령에 MOTOR_TAU로 수렴)
+        self._last = 0.0
+        self._rng = np.random.default_rng(seed)
+
+        w, h = profile.main_size
+        self._canvas = np.empty((h, w, 3), np.uint8)
+        self._noise = np.empty((h, w, 3), np.int16) if noise else None
+        self._rows = np.arange(h, dtype=np.float64)
+        # 화면 행(y) → 전방 거리(m) (아래가 가까움, 위로 갈수록 간격이 넓어짐)
+        self._row_dist = self.LOOKAHEAD * ((h - self._rows) / h) ** 2
+        # 거리별 화면 배율 (px/m, 가까울수록 크게)
+        self._row_scale = w * 1.6 / (1.0 + 3.0 * self._row_dist)
+
+    def center_offset(self, distance):
+        """주행 거리 distance(m)에서 차선 중심의 좌우 위치 (m)"""
+        return self.curve_amplitude * np.sin(2 * np.pi * distance / self.curve_length)
+
+    def drive(self, left, right, dt):
+        """좌/우 바퀴 출력(-1.0~1.0)으로 dt초 동안 차량 이동 (차동 구동 모델)"""
+        if self.lateral is None:
+            # 차선 중심에서 차선 방향을 보고 출발
+            self.lateral = self.center_offset(self.distance)
+            slope = (self.center_offset(self.distance + 1e-3) - self.lateral) / 1e-3
+            self.heading = float(np.arctan(slope))
+        wheels = self._wheels
+        alpha = dt / (self.MOTOR_TAU + dt)
+        wheels[0] += alpha * (left - wheels[0])
+        wheels[1] += alpha * (right - wheels[1])
+        v = (wheels[0] + wheels[1]) / 2.0 * self.WHEEL_SPEED
+        self.heading += (wheels[0] - wheels[1]) * self.WHEEL_SPEED / self.WHEEL_BASE * dt
+        self.distance += v * np.cos(self.heading) * dt
+        self.lateral += v * np.sin(self.heading) * dt
+
+    def ground_to_image(self, x, d):
+        """차량 기준 지면 좌표 (x: 오른쪽 +, d: 전방, m) → lane 프레임 좌표 (u, v)
+
+        _render와 같은 원근 근사 (BirdsEyeView 보정용)
+        """
+        mw, mh = self.profile.main_size
+        lw, lh = self.profile.lane_size
+        u = mw / 2 + x * (mw * 1.6 / (1.0 + 3.0 * d))
+        v = mh - mh * np.sqrt(np.maximum(d, 0.0) / self.LOOKAHEAD)
+        # main 해상도 → lane 해상도 (픽셀 중심 기준)
+        return (u + 0.5) * lw / mw - 0.5, (v + 0.5) * lh / mh - 0.5
+
+    def cross_track_error(self):
+        """차선 중심 대비 차량 횡방향 오차 (m, 오른쪽 +)"""
+        if self.lateral is None:
+            return 0.0
+        return self.lateral - self.center_offset(self.distance)
+
+    def _render(self):
+        w = self.profile.main_size[0]
+        canvas = self._canvas
+        canvas[:] = self.FLOOR_COLOR
+        if self.lateral is None:
+            center = self.center_offset(self.distance + self._row_dist) - self.center_offset(self.distance)
+        else:
+            center = (self.center_offset(self.distance + self._row_dist) - self.lateral
+                      - np.tan(self.heading) * self._row_dist)
+        half = np.maximum(1.0, self.LINE_WIDTH * self._row_scale / 2)
+        for side in (-1, 1):
+            xs = w / 2 + (center + side * self.LANE_HALF_WIDTH) * self._row_scale
+            pts = np.concatenate([
+                np.stack([xs - half, self._rows], axis=1),
+                np.stack([xs + half, self._rows], axis=1)[::-1],
+            ]).astype(np.int32)
+            cv2.fillPoly(canvas, [pts], self.LINE_COLOR)
+        if self.intersection_every:
+            # 교차로 가로 라인: 전방 거리가 라인 위치와 겹치는 행을 칠함
+            ahead = (-self.distance) % self.intersection_every
+            rows = np.flatnonzero(np.abs(self._row_dist - ahead) < self.LINE_WIDTH)
+            if len(rows):
+                canvas[rows.min():rows.max() + 1] = self.LINE_COLOR
+        if self._noise is not None:
+            self._noise[:] = self._rng.integers(-self.noise, self.noise + 1, self._noise.shape)
+            self._noise += canvas
+            np.clip(self._noise, 0, 255, out=self._noise)
+            canvas[:] = self._noise
+        return canvas
+
+    def read_pair(self, with_main=False):
+        if self.fps:
+            wait = self._last + 1.0 / self.fps - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self._last = time.time()
+        if self.lateral is None:
+            self.distance += self.speed / (self.fps or 30.0)
+        lane, main = self._emit(self._render(), with_main)
+        self.frames += 1
+        return True, lane, main
+
+
+class FakeCamera(SyntheticTrackCamera):
+    """고정 장면 (직선 트랙, 교차로 / 노이즈 없음)"""
+
+    name = "fake"
+
+    def __init__(self, profile=LANE_PROFILE, order="bgr", fps=30.0):
+        super().__init__(profile, order, fps=fps, speed=0.0, curve_amplitude=0.0,
+                         intersection_every=0, noise=0)
+
+
+BACKENDS = {
+    "picamera2": Picamera2Camera,
+    "v4l2": V4L2Camera,
+    "replay": ReplayCamera,
+    "synthetic": SyntheticTrackCamera,
+    "fake": FakeCamera,
+}
+
+
+def open_camera(backend="picamera2", profile=LANE_PROFILE, wait_settle=True, **kwargs):
+    """backend 이름으로 카메라 생성 (kwargs는 백엔드별 옵션: device, path, fps ...)
+
+    wait_settle=False면 노출 안정화를 기다리지 않고 바로 반환 (camera.wait_settled()로 나중에 대기)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 카메라 백엔드: {backend} (가능: {', '.join(BACKENDS)})")
+    camera = BACKENDS[backend](profile, **kwargs)
+    if wait_settle:
+        camera.wait_settled()
+    return camera
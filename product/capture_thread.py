@@ -0,0 +1,174 @@
+"""
+capture_thread.py
+-----------------
+카메라 선행 캡처 스레드 (제어 루프가 camera.read()에서 기다리지 않도록)
+
+* 전용 스레드가 camera.read_pair()를 계속 호출하고
+  최신 lane 프레임을 캡처 시각(perf_counter)과 함께 슬롯에 기록
+* 슬롯 3개 (쓰는 중 / 최신 완성본 / 제어 루프가 처리 중) 교대 사용,
+  쓰기 스레드는 제어 루프가 보고 있는 슬롯을 덮어쓰지 않는다
+* 제어 루프는 항상 가장 최근 프레임을 받고, 처리 속도를 못 따라간 프레임은 버려진다
+* 감지 스레드가 요청한 경우(want_main) main 스트림도 함께 받아 on_main 콜백으로 전달
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from perf_stats import LatencyStats
+
+
+class CaptureThread:
+    """camera를 백그라운드에서 읽어 최신 프레임만 유지"""
+
+    def __init__(self, camera, want_main=None, on_main=None, slots=3):
+        if slots < 3:
+            raise ValueError("CaptureThread는 최소 3개 슬롯이 필요합니다")
+        self.camera = camera
+        self.want_main = want_main    # () -> bool, main 스트림 필요 여부
+        self.on_main = on_main        # (main_frame) -> None, 캡처 스레드에서 호출
+        self._num_slots = slots
+        self._buffers = None
+        self._slot_ts = [0.0] * slots
+        self._slot_seq = [0] * slots
+
+        self._cond = threading.Condition()   # 슬롯 인덱스 교환 / 새 프레임 알림
+        self._latest = -1
+        self._reading = -1
+        self._seq = 0
+        self._last_read_seq = 0
+        self._running = False
+        self.ended = False               # 카메라가 더 이상 프레임을 주지 않음
+        self.error = None
+
+        # 통계
+        self.captured = 0
+        self.consumed = 0
+        self.dropped = 0                 # 제어 루프가 받기 전에 새 프레임으로 대체된 수
+        self.main_errors = 0
+        self.capture_interval = LatencyStats("캡처 간격")
+        self.frame_age = LatencyStats("프레임 대기")   # 캡처 완료 → 제어 루프 수신
+
+        self._thread = None
+
+    # ------------------------------------------------------------
+    # 시작 / 종료
+    # ------------------------------------------------------------
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def release(self):
+        """스레드 종료 후 카메라 해제"""
+        self.stop()
+        self.camera.release()
+
+    # ------------------------------------------------------------
+    # 캡처 스레드
+    # ------------------------------------------------------------
+    def _run(self):
+        last_ts = None
+        while self._running:
+            try:
+                with_main = bool(self.want_main and self.want_main())
+                ok, lane, main = self.camera.read_pair(with_main=with_main)
+            except Exception as e:
+                ok, self.error = False, e
+            ts = time.perf_counter()
+            if not ok:
+                break
+
+            if last_ts is not None:
+                self.capture_interval.add((ts - last_ts) * 1000.0)
+            last_ts = ts
+
+            self._publish(lane, ts)
+
+            if main is not None and self.on_main is not None:
+                try:
+                    self.on_main(main)
+                except Exception as e:
+                    self.main_errors += 1
+                    self.error = e
+
+        with self._cond:
+            self.ended = True
+            self._cond.notify_all()
+
+    def _publish(self, lane, ts):
+        with self._cond:
+            if self._buffers is None or self._buffers[0].shape != lane.shape:
+                self._buffers = [np.empty_like(lane) for _ in range(self._num_slots)]
+                self._latest = -1
+                self._reading = -1
+            slot = next(s for s in range(self._num_slots)
+                        if s != self._latest and s != self._reading)
+
+        # 픽셀 복사는 lock 밖에서 (이 슬롯은 리더가 잡을 수 없음)
+        np.copyto(self._buffers[slot], lane)
+
+        with self._cond:
+            if self._latest >= 0 and self._slot_seq[self._latest] > self._last_read_seq:
+                self.dropped += 1
+            self._seq += 1
+            self._slot_seq[slot] = self._seq
+            self._slot_ts[slot] = ts
+            self._latest = slot
+            self.captured += 1
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------
+    # 제어 루프
+    # ------------------------------------------------------------
+    def read(self, wait=True, timeout=1.0):
+        """(seq, 캡처 시각(perf_counter), lane 프레임)
+
+        이미 처리한 프레임보다 새 프레임이 있으면 바로 반환하고,
+        wait=True면 새 프레임이 올 때까지만 기다린다 (wait=False면 마지막 프레임 재사용).
+        카메라가 끝났거나 timeout 동안 프레임이 없으면 (0, 0.0, None).
+        반환된 프레임은 다음 read() 호출 전까지 덮어쓰이지 않는다.
+        """
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while wait and self._running and not self.ended \
+                    and (self._latest < 0 or self._slot_seq[self._latest] == self._last_read_seq):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            fresh = self._latest >= 0 and self._slot_seq[self._latest] != self._last_read_seq
+            if self._latest < 0 or (wait and not fresh):
+                return 0, 0.0, None
+            slot = self._latest
+            seq = self._slot_seq[slot]
+            ts = self._slot_ts[slot]
+            self._reading = slot
+            if fresh:
+                # 재사용한 프레임은 제외 (캡처 → 첫 수신 지연만 기록)
+                self.consumed += 1
+                self.frame_age.add((time.perf_counter() - ts) * 1000.0)
+            self._last_read_seq = seq
+            buf = self._buffers[slot]
+
+        return seq, ts, buf
+
+    def stats(self):
+        with self._cond:
+            return {
+                "captured": self.captured,
+                "consumed": self.consumed,
+                "dropped": self.dropped,
+                "fps": 1000.0 / self.capture_interval.mean_ms if self.capture_interval.count else 0.0,
+                "age_ms": self.frame_age.mean_ms,
+                "main_errors": self.main_errors,
+            }
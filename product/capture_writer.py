@@ -0,0 +1,142 @@
+"""
+capture_writer.py
+-----------------
+감지 이미지 비동기 저장기 (JPEG 인코딩 + 파일 쓰기를 감지 루프 밖에서 처리)
+
+* submit()은 정책 확인 + 큐 삽입만 하고 즉시 반환
+* 큐가 가득 차면 가장 오래된 요청을 버림 (back-pressure)
+* 저장 정책은 객체별 최대 캡처 수 딕셔너리 ("default" 키로 기본값)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from perf_stats import LatencyStats
+
+
+class CaptureWriter:
+    """백그라운드 스레드 풀 기반 JPEG 저장기"""
+
+    def __init__(self, folder, policy=None, max_queue=8, workers=1, quality=95):
+        self.folder = folder
+        self.policy = dict(policy or {"default": 1})
+        self.quality = quality
+        self.max_queue = max_queue
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._counts = {}           # 객체별 캡처 수 (큐에 들어간 시점 기준)
+
+        # 통계
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0            # 큐 포화로 버린 수
+        self.failed = 0
+        self.write_latency = LatencyStats("JPEG 저장")
+        self.queue_latency = LatencyStats("큐 대기")
+
+        os.makedirs(folder, exist_ok=True)
+        self._workers = []
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"capture-writer-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+
+    # ------------------------------------------------------------
+    # 정책
+    # ------------------------------------------------------------
+    def limit_for(self, label):
+        return self.policy.get(label, self.policy.get("default", 0))
+
+    def wants(self, label):
+        """이 객체를 더 캡처해야 하는지"""
+        return self._counts.get(label, 0) < self.limit_for(label)
+
+    def counts(self):
+        return dict(self._counts)
+
+    # ------------------------------------------------------------
+    # 감지 루프에서 호출
+    # ------------------------------------------------------------
+    def submit(self, label, image, meta=None):
+        """이미지 저장 요청 (정책 초과 시 False)
+
+        image는 호출자가 재사용하는 버퍼일 수 있으므로 여기서 복사한다.
+        """
+        if not self.wants(label):
+            return False
+
+        num = self._counts.get(label, 0) + 1
+        self._counts[label] = num
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{label}_{stamp}_{num}.jpg"
+        job = (label, image.copy(), dict(meta or {}), filename, time.perf_counter())
+
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                old_label = self._queue.popleft()[0]
+                self._counts[old_label] -= 1  # 버린 캡처는 다시 기회를 줌
+                self.dropped += 1
+            self._queue.append(job)
+            self.submitted += 1
+            self._cond.notify()
+        return True
+
+    # ------------------------------------------------------------
+    # 워커
+    # ------------------------------------------------------------
+    def _worker(self):
+        from PIL import Image
+
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                label, image, meta, filename, queued_at = self._queue.popleft()
+
+            start = time.perf_counter()
+            self.queue_latency.add((start - queued_at) * 1000.0)
+            filepath = os.path.join(self.folder, filename)
+            try:
+                # 이미지 저장 (PIL 사용 - RGB 네이티브 저장)
+                Image.fromarray(image).save(filepath, quality=self.quality)
+                self.written += 1
+                conf = meta.get("confidence")
+                conf_str = f" | 신뢰도 {conf:.0%}" if conf is not None else ""
+                print(f"  📷 [이미지 캡처] {filename}{conf_str}")
+            except Exception as e:
+                self.failed += 1
+                print(f"  ❌ 이미지 캡처 실패: {e}")
+            self.write_latency.add((time.perf_counter() - start) * 1000.0)
+
+    # ------------------------------------------------------------
+    # 상태 / 종료
+    # ------------------------------------------------------------
+    def queue_depth(self):
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self):
+        return {
+            "queue": self.queue_depth(),
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "write_ms": self.write_latency.mean_ms,
+            "write_max_ms": self.write_latency.max_ms,
+        }
+
+    def close(self, timeout=2.0):
+        """남은 요청을 저장한 뒤 워커 종료"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for t in self._workers:
+            t.join(timeout)
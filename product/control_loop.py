@@ -0,0 +1,94 @@
+"""
+control_loop.py
+---------------
+고정 주기 제어 루프 스케줄러 + 비블로킹 시간 단계 시퀀스
+
+* RateLoop     : 목표 Hz의 마감 시각(deadline)까지 남은 시간만 대기
+                 (처리 시간만큼 대기를 줄이고, 마감을 넘기면 missed로 집계 후 재정렬)
+* TimedSequence: (동작 함수, 유지 시간) 단계 목록을 매 틱 진행
+                 (time.sleep 없이 회전 / 정지 동작을 수행해 인식이 계속 돌도록)
+"""
+
+import time
+
+from perf_stats import LatencyStats
+
+CONTROL_HZ = 50.0  # 기본 제어 주기 (기존 루프의 약 50Hz)
+
+
+class RateLoop:
+    """while True: loop.wait(); ... 형태로 사용하는 고정 주기 스케줄러"""
+
+    def __init__(self, hz=CONTROL_HZ):
+        self.period = 1.0 / hz
+        self._deadline = None
+        self._tick_start = 0.0
+
+        # 통계
+        self.ticks = 0
+        self.missed = 0                      # 처리 시간이 주기를 넘긴 틱 수
+        self.work = LatencyStats("제어 처리")  # 틱 시작 → 다음 wait() 호출까지
+
+    @property
+    def hz(self):
+        return 1.0 / self.period
+
+    def wait(self):
+        """다음 마감 시각까지 대기 후 틱 시작 시각(perf_counter) 반환"""
+        now = time.perf_counter()
+        if self._deadline is None:
+            self._deadline = now
+        else:
+            self.work.add((now - self._tick_start) * 1000.0)
+            if now > self._deadline:
+                # 마감 초과: 밀린 틱을 몰아서 실행하지 않고 현재 시각 기준으로 재정렬
+                self.missed += 1
+                self._deadline = now
+            else:
+                time.sleep(self._deadline - now)
+        self._tick_start = self._deadline
+        self._deadline += self.period
+        self.ticks += 1
+        return self._tick_start
+
+    def stats(self):
+        return {
+            "hz": self.hz,
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "work_ms": self.work.mean_ms,
+            "work_max_ms": self.work.max_ms,
+            "load": self.work.mean_ms / (self.period * 1000.0),
+        }
+
+
+class TimedSequence:
+    """[(동작 함수, 유지 시간 초), ...]를 순서대로 실행 (단계 시작 시 함수 1회 호출)"""
+
+    def __init__(self, name, steps):
+        self.name = name
+        self.steps = list(steps)
+        self.duration = sum(d for _, d in self.steps)
+        self._index = -1
+        self._step_end = 0.0
+
+    @property
+    def done(self):
+        return self._index >= len(self.steps)
+
+    def start(self, now):
+        self._index = -1
+        self._step_end = now
+        return self.tick(now)
+
+    def tick(self, now):
+        """현재 시각까지 끝난 단계를 넘기고 새 단계의 동작 실행, 진행 중이면 True"""
+        while not self.done and now >= self._step_end:
+            self._index += 1
+            if self.done:
+                break
+            action, seconds = self.steps[self._index]
+            if action is not None:
+                action()
+            self._step_end += seconds
+        return not self.done
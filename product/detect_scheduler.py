@@ -0,0 +1,89 @@
+"""
+detect_scheduler.py
+-------------------
+객체 탐지 주기 스케줄러 (고정 0.2초 sleep / 3프레임마다 전달 대체)
+
+실측 추론 시간과 차량 상태로 다음 탐지까지의 간격을 정한다.
+* 접근 중인 표지판 추적 중 (면적이 NEAR_AREA에 가까워짐) → 최대 속도 (간격 0)
+* 최근에 무언가 감지됨                                   → 최대 속도
+* 교차로 대기 / 정지                                      → 고정 간격 (표지판 대기)
+* 빈 도로                                                 → 주행 속도에 반비례 (느릴수록 드물게)
+"""
+
+import time
+
+# ======================================
+# 스케줄러 파라미터
+# ======================================
+APPROACH_RATIO = 0.25        # 면적이 NEAR_AREA의 25% 이상이면 '접근 중'
+TRACK_HOLD = 1.0             # 마지막 감지 후 이 시간(초) 동안은 최대 속도 유지
+INTERSECTION_INTERVAL = 0.2  # 교차로 대기 중 탐지 간격
+EMPTY_ROAD_INTERVAL = 0.3    # 기본 속도(SPEED_FORWARD_DEFAULT)에서 빈 도로 탐지 간격
+MAX_INTERVAL = 0.6           # 최대 탐지 간격 (정지 / 저속)
+CPU_SHARE = 0.8              # 빈 도로에서 탐지 스레드가 쓸 수 있는 최대 시간 비율
+EMA_ALPHA = 0.2              # 추론 시간 지수 이동 평균 계수
+
+
+class DetectionScheduler:
+    """다음 탐지 시점을 결정하고 결정 내역을 지표로 남김"""
+
+    MODES = ("approach", "tracking", "intersection", "empty_road", "stopped")
+
+    def __init__(self, near_area, reference_speed):
+        self.near_area = near_area
+        self.reference_speed = reference_speed
+        self.inference_ms = 0.0     # 추론 시간 EMA
+        self.last_seen = 0.0        # 마지막 유효 감지 시각
+        self.mode = "empty_road"
+        self.interval = 0.0
+        self.decisions = {mode: 0 for mode in self.MODES}
+        self._started = time.time()
+        self._runs = 0
+
+    def observe(self, inference_ms, max_area, now):
+        """한 번의 탐지 결과 반영 (max_area: 이번 프레임 유효 객체 최대 면적)
+
+        inference_ms가 None이면 추론을 생략한 프레임 (추론 시간 평균에서 제외)
+        """
+        if inference_ms is None:
+            pass
+        elif self.inference_ms == 0.0:
+            self.inference_ms = inference_ms
+        else:
+            self.inference_ms += EMA_ALPHA * (inference_ms - self.inference_ms)
+        if max_area > 0:
+            self.last_seen = now
+        self._runs += 1
+
+    def next_interval(self, lane_status, max_area, now):
+        """다음 탐지까지 대기 시간(초)"""
+        if max_area >= self.near_area * APPROACH_RATIO:
+            mode, interval = "approach", 0.0
+        elif now - self.last_seen < TRACK_HOLD:
+            mode, interval = "tracking", 0.0
+        elif lane_status.intersection_mode:
+            mode, interval = "intersection", INTERSECTION_INTERVAL
+        elif lane_status.vehicle_stopped or lane_status.speed <= 0:
+            mode, interval = "stopped", MAX_INTERVAL
+        else:
+            # 같은 주행 거리마다 한 번 탐지하도록 속도에 반비례
+            interval = EMPTY_ROAD_INTERVAL * self.reference_speed / lane_status.speed
+            # 추론이 오래 걸리면 CPU 점유율 상한을 넘지 않도록 늘림
+            busy_s = self.inference_ms / 1000.0
+            interval = max(interval, busy_s * (1.0 - CPU_SHARE) / CPU_SHARE)
+            mode, interval = "empty_road", min(interval, MAX_INTERVAL)
+
+        self.mode = mode
+        self.interval = interval
+        self.decisions[mode] += 1
+        return interval
+
+    def metrics(self):
+        elapsed = max(time.time() - self._started, 1e-6)
+        return {
+            "mode": self.mode,
+            "interval_ms": self.interval * 1000.0,
+            "inference_ms": self.inference_ms,
+            "rate_hz": self._runs / elapsed,
+            "decisions": dict(self.decisions),
+        }
@@ -0,0 +1,334 @@
+"""
+detector_process.py
+-------------------
+object_detect_loop를 별도 프로세스(워커)에서 실행
+
+한 프로세스 안의 스레드로 돌리면 YOLO 전/후처리와 차선 루프의 NumPy / OpenCV 작업이
+GIL과 코어를 두고 경쟁한다. DetectorProcess는 같은 object_detect_loop를 spawn 워커에서
+실행하고 shared_state 토픽만 프로세스 경계 너머로 이어 준다 (감지 코드는 그대로).
+
+* 프레임   : SharedFrameRing (multiprocessing.shared_memory) - 캡처 스레드가 기록, 워커가 read_latest
+* 워커 → 부모 (파이프): frame_due / scheduler / triggers / detections (압축 레코드)
+* 부모 → 워커 (파이프): lane / actions (바뀐 경우만, LINK_POLL 주기)
+* 시작 신호 : 워커의 timeline.ready("detector") → 부모 timeline / detector_active (단계 기록 포함)
+* 종료      : stop() → 워커 루프에 KeyboardInterrupt (정상 정리) → 시간 초과 시 terminate / kill
+* 재시작    : 워커가 비정상 종료하면 감지 결과와 링의 최신 프레임을 비우고 DETECTOR_RESTART_DELAY부터 2배씩 늘려 재시작
+              (DETECTOR_RESTART_LIMIT회 초과 시 감지 없이 주행 유지)
+
+    detector = DetectorProcess(LANE_PROFILE.main_size).start()   # lane 스레드 시작 전
+    ...
+    detector.stop()
+"""
+
+import multiprocessing
+import signal
+import threading
+import time
+
+import numpy as np
+
+import shared_state
+from frame_buffer import SharedFrameRing
+from startup import timeline
+
+# ======================================
+# 워커 관리 설정
+# ======================================
+DETECTOR_RESTART_LIMIT = 3     # 연속 비정상 종료 시 재시작 횟수
+DETECTOR_RESTART_DELAY = 1.0   # 첫 재시작 전 대기 (초, 재시작마다 2배)
+DETECTOR_STABLE_TIME = 30.0    # 이 시간 이상 돌다가 죽으면 재시작 횟수를 다시 셈
+STOP_TIMEOUT = 3.0             # 정상 종료 대기 (초) 후 terminate
+LINK_POLL = 0.02               # 부모 링크 스레드 주기 (초) - 입력 토픽 변경 확인
+
+# 감지 스냅샷 객체별 필드 (KNOWN_OBJECTS 순서, 레코드당 7 x 25 bytes)
+OBJECT_DTYPE = np.dtype([
+    ("state", "?"),
+    ("area", "<i4"),
+    ("last_seen", "<f8"),
+    ("confidence", "<f4"),
+    ("frames", "<i4"),
+    ("counts", "<i4"),
+])
+
+
+# ============================================================
+# 감지 스냅샷 ↔ 압축 레코드
+# ============================================================
+def encode_snapshot(snapshot):
+    """DetectionSnapshot → (timestamp, 객체별 bytes, 객체 index, 면적, 신호등 면적, 신호등 시각, 트랙)"""
+    objects = np.empty(len(shared_state.KNOWN_OBJECTS), OBJECT_DTYPE)
+    for i, name in enumerate(shared_state.KNOWN_OBJECTS):
+        objects[i] = (snapshot.object_state.get(name, False), snapshot.object_area.get(name, 0),
+                      snapshot.object_last_seen.get(name, 0.0), snapshot.confidence.get(name, 0.0),
+                      snapshot.detection_frames.get(name, 0), snapshot.detection_counts.get(name, 0))
+    detected = shared_state.KNOWN_OBJECTS.index(snapshot.object_detected) \
+        if snapshot.object_detected in shared_state.KNOWN_OBJECTS else -1
+    return (snapshot.timestamp, objects.tobytes(), detected, snapshot.object_distance,
+            snapshot.traffic_light_area, snapshot.traffic_light_last_ts,
+            tuple(tuple(track) for track in snapshot.tracks))
+
+
+def decode_snapshot(record):
+    timestamp, raw, detected, distance, traffic_area, traffic_ts, tracks = record
+    objects = np.frombuffer(raw, OBJECT_DTYPE)
+    names = shared_state.KNOWN_OBJECTS
+
+    def column(field, cast):
+        return shared_state.freeze({name: cast(objects[field][i]) for i, name in enumerate(names)})
+
+    return shared_state.DetectionSnapshot(
+        timestamp=timestamp,
+        object_state=column("state", bool),
+        object_area=column("area", int),
+        object_last_seen=column("last_seen", float),
+        confidence=column("confidence", float),
+        detection_frames=column("frames", int),
+        detection_counts=column("counts", int),
+        object_detected=names[detected] if detected >= 0 else None,
+        object_distance=distance,
+        traffic_light_area=traffic_area,
+        traffic_light_last_ts=traffic_ts,
+        tracks=tuple(shared_state.TrackInfo(*track) for track in tracks),
+    )
+
+
+def _plain(mapping):
+    return dict(mapping)
+
+
+# 토픽 이름 → (보낼 때 변환, 받을 때 변환)
+OUTPUT_TOPICS = {
+    "frame_due": (None, None),
+    "scheduler": (_plain, shared_state.freeze),
+    "triggers": (None, None),
+    "detections": (encode_snapshot, decode_snapshot),
+}
+INPUT_TOPICS = {
+    "lane": (None, None),
+    "actions": (_plain, shared_state.freeze),
+}
+
+
+def _convert(func, value):
+    return value if func is None else func(value)
+
+
+# ============================================================
+# 워커 프로세스
+# ============================================================
+class _ForwardTopic(shared_state.Topic):
+    """워커 쪽 출력 토픽: 로컬 발행 + 부모로 전달"""
+
+    def __init__(self, topic, send, encode):
+        super().__init__(topic.name, topic.get())
+        self._send = send
+        self._encode = encode
+
+    def publish(self, value):
+        seq = super().publish(value)
+        self._send(("topic", self.name, _convert(self._encode, value)))
+        return seq
+
+
+def _worker_receive(conn, stop):
+    """부모 → 워커: 입력 토픽 반영, stop이면 감지 루프에 KeyboardInterrupt"""
+    import _thread
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            message = ("stop",)  # 부모가 사라짐
+        if message[0] == "stop":
+            stop.set()
+            _thread.interrupt_main()
+            return
+        if message[0] == "topic":
+            _, name, payload = message
+            getattr(shared_state, name).publish(_convert(INPUT_TOPICS[name][1], payload))
+
+
+def _worker_main(conn, ring, target, t0):
+    """spawn 워커 진입점 - shared_state를 프로세스 간 연결로 바꾼 뒤 감지 루프 실행"""
+    stop = threading.Event()
+
+    def on_sigint(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+
+    # 터미널 Ctrl+C는 무시 (종료 순서는 부모가 stop()으로 결정)
+    signal.signal(signal.SIGINT, on_sigint)
+    threading.current_thread().name = "detector-proc"
+    timeline.t0 = t0  # perf_counter는 프로세스 간 같은 단조 시계 (Linux)
+
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    shared_state.frame_ring = ring
+    for name, (encode, _) in OUTPUT_TOPICS.items():
+        setattr(shared_state, name, _ForwardTopic(getattr(shared_state, name), send, encode))
+    timeline.ready = lambda name, ok=True: send(("ready", name, ok, list(timeline.phases)))
+    threading.Thread(target=_worker_receive, args=(conn, stop), name="detector-link",
+                     daemon=True).start()
+
+    try:
+        if target is None:
+            with timeline.phase("감지 모듈 import"):
+                from object_detector import object_detect_loop as target
+        target()
+    except KeyboardInterrupt:
+        if not stop.is_set():
+            raise
+    finally:
+        ring.close()
+
+
+# ============================================================
+# 부모 쪽 관리
+# ============================================================
+class DetectorProcess:
+    """감지 워커 프로세스 시작 / 토픽 연결 / 비정상 종료 시 재시작 / 정리
+
+    frame_size는 감지용 main 스트림 (w, h). target=None이면 워커에서
+    object_detector.object_detect_loop를 import해 실행한다 (다른 함수는 pickle 가능해야 함).
+    """
+
+    def __init__(self, frame_size, target=None, restart_limit=DETECTOR_RESTART_LIMIT,
+                 restart_delay=DETECTOR_RESTART_DELAY):
+        self._ctx = multiprocessing.get_context("spawn")  # 스레드가 도는 프로세스에서 fork하지 않음
+        w, h = frame_size
+        self.ring = SharedFrameRing((h, w, 3), lock=self._ctx.Lock())
+        self.target = target
+        self.restart_limit = restart_limit
+        self.restart_delay = restart_delay
+        self.restarts = 0          # 누적 재시작 횟수
+        self.process = None
+        self._conn = None
+        self._crashes = 0          # 연속 비정상 종료 횟수
+        self._started_at = 0.0
+        self._sent = {}            # 입력 토픽 이름 → 마지막으로 보낸 seq
+        self._send_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        shared_state.frame_ring = self.ring  # 캡처 스레드가 공유 링에 기록 (CaptureThread 생성 전에)
+        self._spawn()
+        self._thread = threading.Thread(target=self._link, name="detector-link", daemon=True)
+        self._thread.start()
+        return self
+
+    def _spawn(self):
+        parent, child = self._ctx.Pipe()
+        self.process = self._ctx.Process(target=_worker_main, name="detector", daemon=True,
+                                         args=(child, self.ring, self.target, timeline.t0))
+        self.process.start()
+        child.close()
+        self._conn = parent
+        self._sent = {}
+        self._started_at = time.time()
+
+    # ------------------------------------------------------------
+    # 링크 스레드
+    # ------------------------------------------------------------
+    def _send(self, message):
+        with self._send_lock:
+            self._conn.send(message)
+
+    def _link(self):
+        while not self._stopping.is_set():
+            try:
+                if self._conn.poll(LINK_POLL):
+                    while self._conn.poll():
+                        self._handle(self._conn.recv())
+                self._forward_inputs()
+            except (EOFError, OSError):
+                if self._stopping.is_set() or not self._on_exit():
+                    return
+
+    def _handle(self, message):
+        kind = message[0]
+        if kind == "topic":
+            _, name, payload = message
+            getattr(shared_state, name).publish(_convert(OUTPUT_TOPICS[name][1], payload))
+        elif kind == "ready":
+            _, name, ok, phases = message
+            timeline.extend(phases)
+            shared_state.detector_active = ok
+            timeline.ready(name, ok)
+
+    def _forward_inputs(self):
+        for name, (encode, _) in INPUT_TOPICS.items():
+            seq, value = getattr(shared_state, name).read()
+            if self._sent.get(name) != seq:
+                self._send(("topic", name, _convert(encode, value)))
+                self._sent[name] = seq
+
+    def _on_exit(self):
+        """워커 종료 처리 → 재시작했으면 True"""
+        self.process.join()
+        code = self.process.exitcode
+        self._conn.close()
+        if code == 0:
+            print("  [감지 워커] 종료 (감지 비활성)")
+            return False
+
+        # 비정상 종료: 오래된 감지 결과로 동작하지 않도록 비우고 프레임 요청 중단
+        shared_state.detector_active = False
+        shared_state.detections.publish(shared_state.EMPTY_DETECTIONS)
+        shared_state.frame_due.publish(float("inf"))
+        if time.time() - self._started_at >= DETECTOR_STABLE_TIME:
+            self._crashes = 0
+        if self._crashes >= self.restart_limit:
+            print(f"  [감지 워커] 비정상 종료 (코드 {code}) - 재시작 {self.restart_limit}회 초과, "
+                  f"감지 없이 주행")
+            timeline.ready("detector", ok=False)
+            return False
+
+        delay = self.restart_delay * (2 ** self._crashes)
+        self._crashes += 1
+        self.restarts += 1
+        print(f"  [감지 워커] 비정상 종료 (코드 {code}) - {delay:.1f}초 후 재시작 "
+              f"({self._crashes}/{self.restart_limit})")
+        if self._stopping.wait(delay):
+            return False
+        # 죽은 워커가 잡고 있던 슬롯 반납 + 크래시 / 대기 전 프레임 폐기 → 새 프레임부터 추론
+        self.ring.invalidate()
+        shared_state.frame_due.publish(0.0)
+        self._spawn()
+        return True
+
+    # ------------------------------------------------------------
+    # 종료
+    # ------------------------------------------------------------
+    def stop(self, timeout=STOP_TIMEOUT):
+        self._stopping.set()
+        if self.process is not None and self.process.is_alive():
+            try:
+                self._send(("stop",))
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout)
+            if self.process.is_alive():
+                print("  [감지 워커] 종료 시간 초과 - terminate")
+                self.process.terminate()
+                self.process.join(1.0)
+                if self.process.is_alive():
+                    self.process.kill()
+                    self.process.join()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        if self._conn is not None:
+            self._conn.close()
+        shared_state.detector_active = False
+        self.ring.close(unlink=True)
+
+    def stats(self):
+        return {
+            "alive": self.process is not None and self.process.is_alive(),
+            "pid": self.process.pid if self.process is not None else None,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,245 @@
+"""
+frame_buffer.py
+---------------
+lane_tracer → object_detector 프레임 전달용 고정 슬롯 링 버퍼
+
+* 슬롯은 첫 write 시 한 번만 할당 (이후 프레임마다 할당 없음)
+* 쓰기 스레드는 비어 있는 슬롯에 제자리 복사 (np.copyto / cv2.flip dst=)
+* 읽기 스레드는 가장 최근에 완성된 슬롯의 읽기 전용 view를 받음
+* 내부 Lock은 슬롯 인덱스 교환에만 사용하고, 픽셀 복사 중에는 잡지 않음
+"""
+
+import threading
+import numpy as np
+
+
+class FrameRing:
+    """시퀀스 번호가 붙은 고정 슬롯 프레임 링
+
+    슬롯 3개면 (읽는 중 / 최신 완성본 / 쓰는 중) 이 서로 겹치지 않으므로
+    쓰기 스레드가 읽기 스레드가 보고 있는 슬롯을 덮어쓰는 일이 없다.
+    """
+
+    def __init__(self, slots=3):
+        if slots < 3:
+            raise ValueError("FrameRing은 최소 3개 슬롯이 필요합니다")
+        self._num_slots = slots
+        self._buffers = None
+        self._views = None
+        self._slot_seq = [0] * slots
+
+        self._lock = threading.Lock()   # 인덱스 교환 전용
+        self._latest = -1               # 가장 최근 완성 슬롯
+        self._reading = -1              # 리더가 보유 중인 슬롯
+        self._writing = -1              # 라이터가 채우는 중인 슬롯
+        self._seq = 0
+        self._latest_read = False       # 최신 슬롯이 한 번이라도 읽혔는지
+        self._last_read_seq = 0
+
+        # 통계 (감지 스레드가 캡처를 얼마나 못 따라가는지 확인용)
+        self.frames_written = 0
+        self.frames_read = 0
+        self.dropped = 0    # 한 번도 읽히지 않고 새 프레임으로 대체된 수
+        self.reused = 0     # 리더가 같은 프레임을 다시 받은 수
+
+    # ------------------------------------------------------------
+    # 쓰기 (lane_tracer 스레드)
+    # ------------------------------------------------------------
+    def _allocate(self, shape, dtype):
+        self._buffers = [np.empty(shape, dtype) for _ in range(self._num_slots)]
+        views = []
+        for buf in self._buffers:
+            view = buf.view()
+            view.flags.writeable = False
+            views.append(view)
+        self._views = views
+
+    def _begin_write(self, shape, dtype):
+        with self._lock:
+            if self._buffers is None or self._buffers[0].shape != shape \
+                    or self._buffers[0].dtype != dtype:
+                # 해상도 변경 시에만 재할당 (리더가 잡고 있던 view는 기존 배열을 계속 참조)
+                self._allocate(shape, dtype)
+                self._latest = -1
+                self._reading = -1
+            for slot in range(self._num_slots):
+                if slot != self._latest and slot != self._reading:
+                    self._writing = slot
+                    return slot, self._buffers[slot]
+        raise RuntimeError("사용 가능한 프레임 슬롯이 없습니다")
+
+    def _commit_write(self, slot):
+        with self._lock:
+            if self._latest >= 0 and not self._latest_read:
+                self.dropped += 1
+            self._seq += 1
+            self._slot_seq[slot] = self._seq
+            self._latest = slot
+            self._writing = -1
+            self._latest_read = False
+            self.frames_written += 1
+            return self._seq
+
+    def write(self, frame):
+        """프레임을 빈 슬롯에 복사하고 시퀀스 번호를 반환"""
+        slot, buf = self._begin_write(frame.shape, frame.dtype)
+        np.copyto(buf, frame)
+        return self._commit_write(slot)
+
+    def write_with(self, shape, dtype, fill):
+        """fill(dst) 콜백으로 슬롯을 직접 채움 (예: cv2.flip(frame, -1, dst=dst))"""
+        slot, buf = self._begin_write(tuple(shape), np.dtype(dtype))
+        fill(buf)
+        return self._commit_write(slot)
+
+    # ------------------------------------------------------------
+    # 읽기 (object_detector 스레드)
+    # ------------------------------------------------------------
+    def read_latest(self):
+        """가장 최근 완성 프레임의 (seq, 읽기 전용 view) 반환
+
+        프레임이 아직 없으면 (0, None). 반환된 view는 다음 read_latest 호출
+        전까지 덮어쓰이지 않는다.
+        """
+        with self._lock:
+            if self._latest < 0:
+                return 0, None
+            slot = self._latest
+            seq = self._slot_seq[slot]
+            self._reading = slot
+            if seq == self._last_read_seq:
+                self.reused += 1
+            self._last_read_seq = seq
+            self._latest_read = True
+            self.frames_read += 1
+            return seq, self._views[slot]
+
+    def release(self):
+        """리더가 보유 중인 슬롯 반납 (선택 사항)"""
+        with self._lock:
+            self._reading = -1
+
+    def invalidate(self):
+        """최신 프레임 폐기 + 보유 슬롯 반납 - 다음 write 전까지 read_latest()는 (0, None)"""
+        with self._lock:
+            self._latest = -1
+            self._reading = -1
+
+    @property
+    def latest_seq(self):
+        return self._seq
+
+    def stats(self):
+        """통계 딕셔너리 (lag = 최신 seq - 리더가 마지막으로 읽은 seq)"""
+        with self._lock:
+            return {
+                "written": self.frames_written,
+                "read": self.frames_read,
+                "dropped": self.dropped,
+                "reused": self.reused,
+                "lag": self._seq - self._last_read_seq,
+            }
+
+
+# ============================================================
+# 프로세스 간 공유 링 (감지 워커 프로세스용)
+# ============================================================
+# 공유 메모리 헤더에 두는 FrameRing 상태 (int64, 뒤에 슬롯별 seq)
+_SHARED_FIELDS = ("_latest", "_reading", "_writing", "_seq", "_latest_read", "_last_read_seq",
+                  "frames_written", "frames_read", "dropped", "reused")
+_HEADER_ALIGN = 64
+
+
+def _shared_field(index):
+    def get(self):
+        return int(self._header[index])
+
+    def set(self, value):
+        self._header[index] = value
+
+    return property(get, set)
+
+
+class SharedFrameRing(FrameRing):
+    """multiprocessing.shared_memory 위의 FrameRing (슬롯 교환 규칙은 FrameRing과 같음)
+
+    * 해상도는 생성 시 고정 (슬롯을 미리 할당, 다른 크기의 프레임은 ValueError)
+    * 인덱스 / 통계는 공유 메모리 헤더에, 인덱스 교환은 multiprocessing Lock으로
+    * pickle하면 이름으로 다시 붙음 → Process 인자로 넘기면 워커에서 그대로 read_latest()
+    * 만든 프로세스가 close(unlink=True)로 정리
+    """
+
+    def __init__(self, shape, dtype=np.uint8, slots=3, lock=None):
+        if slots < 3:
+            raise ValueError("FrameRing은 최소 3개 슬롯이 필요합니다")
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        self._shape = tuple(shape)
+        self._dtype = np.dtype(dtype)
+        self._num_slots = slots
+        self._lock = lock if lock is not None else multiprocessing.Lock()
+        self._shm = shared_memory.SharedMemory(create=True, size=self._size())
+        self._owner = True
+        self._map()
+        self._header[:] = 0
+        self._latest = self._reading = self._writing = -1
+
+    def _size(self):
+        return self._header_bytes() + self._num_slots * self._frame_bytes()
+
+    def _header_bytes(self):
+        raw = (len(_SHARED_FIELDS) + self._num_slots) * 8
+        return (raw + _HEADER_ALIGN - 1) // _HEADER_ALIGN * _HEADER_ALIGN
+
+    def _frame_bytes(self):
+        return int(np.prod(self._shape)) * self._dtype.itemsize
+
+    def _map(self):
+        buf = self._shm.buf
+        self._header = np.ndarray((len(_SHARED_FIELDS) + self._num_slots,), np.int64, buffer=buf)
+        self._slot_seq = self._header[len(_SHARED_FIELDS):]
+        offset = self._header_bytes()
+        self._buffers = [np.ndarray(self._shape, self._dtype, buffer=buf,
+                                    offset=offset + i * self._frame_bytes())
+                         for i in range(self._num_slots)]
+        views = []
+        for buffer in self._buffers:
+            view = buffer.view()
+            view.flags.writeable = False
+            views.append(view)
+        self._views = views
+
+    def _allocate(self, shape, dtype):
+        raise ValueError(f"공유 링 해상도 {self._shape}와 프레임 {shape}가 다릅니다")
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def __getstate__(self):
+        return self._shm.name, self._shape, self._dtype.str, self._num_slots, self._lock
+
+    def __setstate__(self, state):
+        from multiprocessing import shared_memory
+
+        name, self._shape, dtype, self._num_slots, self._lock = state
+        self._dtype = np.dtype(dtype)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self._map()
+
+    def close(self, unlink=False):
+        """매핑 해제 (unlink=True면 공유 메모리 삭제, 만든 프로세스만)"""
+        self._header = self._slot_seq = None
+        self._buffers = self._views = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # 아직 view를 잡고 있는 곳이 있으면 프로세스 종료 시 해제
+        if unlink and self._owner:
+            self._shm.unlink()
+
+
+for _index, _field in enumerate(_SHARED_FIELDS):
+    setattr(SharedFrameRing, _field, _shared_field(_index))
@@ -0,0 +1,100 @@
+"""
+frame_gate.py
+-------------
+장면 변화 게이트 (변화 없는 프레임은 YOLO 추론 생략)
+
+감지 ROI를 작은 흑백 썸네일로 줄여 마지막으로 추론한 프레임과 비교한다.
+* 픽셀 차이(SAD)가 PIXEL_THRESHOLD를 넘는 썸네일 픽셀 비율이
+  CHANGED_FRACTION 이상이면 "변화"로 보고 추론
+* 변화가 없어도 MAX_STALE초가 지나면 강제로 추론 (오래된 결과 재사용 방지)
+
+교차로 대기처럼 차량이 정지해 있을 때 대부분의 프레임이 생략된다.
+"""
+
+import cv2
+import numpy as np
+
+# ======================================
+# 게이트 파라미터
+# ======================================
+THUMB_SCALE = 0.1        # ROI 축소 비율 (320x480 → 32x48)
+PIXEL_THRESHOLD = 12     # 썸네일 픽셀이 바뀌었다고 볼 밝기 차이 (0~255)
+CHANGED_FRACTION = 0.01  # 바뀐 픽셀 비율 임계값 (MIN_AREA 표지판 ≈ ROI의 3%)
+MAX_STALE = 1.0          # 이전 탐지 결과를 재사용할 수 있는 최대 시간 (초)
+
+
+class FrameGate:
+    """ROI 썸네일 비교로 추론 필요 여부 판단"""
+
+    def __init__(self, scale=THUMB_SCALE, pixel_threshold=PIXEL_THRESHOLD,
+                 changed_fraction=CHANGED_FRACTION, max_stale=MAX_STALE):
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_stale = max_stale
+
+        self._reference = None   # 마지막으로 추론한 프레임의 썸네일
+        self._reference_ts = 0.0
+        self._small = None       # 축소 버퍼 (컬러)
+        self._thumb = None       # 흑백 썸네일 버퍼
+        self._diff = None        # 차이 버퍼
+
+        self.checked = 0         # 판단 횟수
+        self.skipped = 0         # 추론 생략 (이전 결과 재사용)
+        self.changed = 0         # 장면 변화로 추론
+        self.stale = 0           # MAX_STALE 초과로 강제 추론
+        self.last_change = 0.0   # 마지막 비교의 바뀐 픽셀 비율
+
+    def _thumbnail(self, roi, bgr):
+        h, w = roi.shape[:2]
+        size = (max(1, int(w * self.scale)), max(1, int(h * self.scale)))
+        if self._small is None or self._small.shape[1::-1] != size:
+            self._small = np.empty((size[1], size[0], 3), np.uint8)
+            self._thumb = np.empty((size[1], size[0]), np.uint8)
+            self._diff = np.empty_like(self._thumb)
+            self._reference = None
+        cv2.resize(roi, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        code = cv2.COLOR_BGR2GRAY if bgr else cv2.COLOR_RGB2GRAY
+        return cv2.cvtColor(self._small, code, dst=self._thumb)
+
+    def should_infer(self, roi, now, bgr=True):
+        """True면 추론 실행 (이때 비교 기준 썸네일 갱신), False면 이전 결과 재사용"""
+        self.checked += 1
+        thumb = self._thumbnail(roi, bgr)
+
+        if self._reference is None:
+            self.changed += 1
+            return self._accept(thumb, now)
+
+        cv2.absdiff(thumb, self._reference, dst=self._diff)
+        self.last_change = float(np.count_nonzero(self._diff > self.pixel_threshold)) / self._diff.size
+        if self.last_change >= self.changed_fraction:
+            self.changed += 1
+            return self._accept(thumb, now)
+        if now - self._reference_ts >= self.max_stale:
+            self.stale += 1
+            return self._accept(thumb, now)
+
+        self.skipped += 1
+        return False
+
+    def _accept(self, thumb, now):
+        if self._reference is None or self._reference.shape != thumb.shape:
+            self._reference = np.empty_like(thumb)
+        self._reference[:] = thumb
+        self._reference_ts = now
+        return True
+
+    def reset(self):
+        """다음 프레임은 무조건 추론"""
+        self._reference = None
+
+    def stats(self):
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "changed": self.changed,
+            "stale": self.stale,
+            "hit_rate": self.skipped / self.checked if self.checked else 0.0,
+            "last_change": self.last_change,
+        }
@@ -0,0 +1,312 @@
+"""
+inference_backend.py
+--------------------
+표지판 탐지 / 분류 모델 추론 백엔드
+
+* OnnxBackend  : ONNX Runtime (CPU) - .pt 옆에 캐시된 .onnx가 없으면 자동 export
+* TorchBackend : 기존 ultralytics YOLO (PyTorch)
+* load_model() : backend="auto"면 ONNX 시도 후 실패 시 PyTorch로 대체
+
+모델 캐시 (.pt와 같은 폴더)
+* <이름>.<키>.onnx           : export 결과 (ultralytics export가 Conv+BN fuse 포함)
+* <이름>.<키>_int8.onnx      : quantize.py INT8 결과
+* <이름>.<키>.ort<버전>.onnx : ONNX Runtime 그래프 최적화 결과 (다음 실행은 최적화 생략)
+키는 가중치 파일 SHA-256 + export 옵션 해시이므로 가중치가 바뀌면 자동으로 다시 export하고
+이전 키의 캐시 파일은 지운다 (파일 시각과 무관).
+
+두 백엔드 모두 같은 인터페이스를 제공한다.
+    names                  : {클래스 id: 이름}
+    detect(image)          → (xyxy int32 Nx4, conf float32 N, cls int64 N)
+    classify(images)       → (top1 id int64 B, top1 conf float32 B)
+"""
+
+import ast
+import glob
+import hashlib
+import os
+import time
+
+import cv2
+import numpy as np
+
+# ======================================
+# 백엔드 설정
+# ======================================
+BACKEND = "auto"          # "auto" | "onnx" | "torch"
+ONNX_THREADS = 3          # intra-op 스레드 수 (라즈베리파이 4코어 중 1코어는 차선 루프용)
+PRECISION = "int8"        # "int8"이면 quantize.py가 만든 *_int8.onnx가 있을 때 우선 사용
+DETECT_IMGSZ = 640        # 탐지 모델 입력 크기
+CLASSIFY_IMGSZ = 224      # 분류 모델 입력 크기
+DETECT_CONF = 0.25        # 후보 박스 최소 신뢰도 (ultralytics 기본값과 동일)
+DETECT_IOU = 0.7          # NMS IoU 임계값 (ultralytics 기본값과 동일)
+CACHE_KEY_LENGTH = 12     # 캐시 파일명에 넣을 해시 길이 (hex)
+ORT_OPTIMIZED_CACHE = True  # ONNX Runtime 그래프 최적화 결과를 저장해 다음 실행에서 재사용
+
+
+def _extract(result):
+    """ultralytics 결과 → (xyxy, conf, cls) 배열"""
+    boxes = getattr(result, "boxes", None)
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, 4), np.int32), np.zeros(0, np.float32), np.zeros(0, np.int64)
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.int32)  # int() 절삭과 동일
+    conf = boxes.conf.cpu().numpy().astype(np.float32)
+    cls = boxes.cls.cpu().numpy().astype(np.int64)
+    return xyxy, conf, cls
+
+
+def detect_tensor(image, size, canvas, out):
+    """letterbox → (1,3,size,size) float32 입력 텐서를 out에 기록, (scale, pad_x, pad_y) 반환
+
+    ultralytics와 동일하게 numpy 입력의 채널 순서를 뒤집어 넣는다.
+    """
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    canvas[:] = 114
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+        image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    np.multiply(canvas[..., ::-1].transpose(2, 0, 1), 1 / 255.0, out=out[0])
+    return scale, pad_x, pad_y
+
+
+def classify_tensor(images, size):
+    """letterbox된 이미지 목록 → (B,3,size,size) float32 입력 텐서"""
+    batch = np.stack([img if img.shape[0] == size
+                      else cv2.resize(img, (size, size)) for img in images])
+    return np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), np.float32) / 255.0
+
+
+# ============================================================
+# PyTorch (ultralytics) 백엔드
+# ============================================================
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, path, task):
+        from ultralytics import YOLO
+
+        self.path = path
+        self.task = task
+        self.model = YOLO(path)
+        self.names = self.model.names
+
+    def detect(self, image):
+        results = self.model(image, verbose=False)
+        if not results:
+            return _extract(None)
+        return _extract(results[0])
+
+    def classify(self, images):
+        results = self.model.predict(list(images), imgsz=CLASSIFY_IMGSZ, verbose=False)
+        ids = np.array([int(r.probs.top1) for r in results], np.int64)
+        confs = np.array([float(r.probs.top1conf) for r in results], np.float32)
+        return ids, confs
+
+
+# ============================================================
+# ONNX Runtime 백엔드
+# ============================================================
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, onnx_path, task, threads=ONNX_THREADS, cache=False):
+        import onnxruntime as ort
+
+        self.path = onnx_path
+        self.task = task
+        self.cached = False  # 저장된 최적화 그래프를 불러왔는지
+        optimized = optimized_path_for(onnx_path, ort.__version__) if cache else None
+        if optimized and os.path.exists(optimized) and \
+                os.path.getmtime(optimized) >= os.path.getmtime(onnx_path):
+            try:
+                self._open(ort, optimized, threads, optimize=False)
+                self.cached = bool(self.names)  # names 메타데이터가 빠졌으면 원본으로
+            except Exception as e:
+                print(f"  [⚠️] 최적화 캐시 로드 실패 ({e}) - 원본에서 다시 최적화")
+        if not self.cached:
+            self._open(ort, onnx_path, threads, optimize=True, save_to=optimized)
+
+        # 입력 크기 (고정 shape면 모델 값 사용)
+        shape = self.session.get_inputs()[0].shape
+        default = DETECT_IMGSZ if task == "detect" else CLASSIFY_IMGSZ
+        self.imgsz = shape[2] if isinstance(shape[2], int) else default
+        self.dynamic_batch = not isinstance(shape[0], int)
+
+        self._input = np.zeros((1, 3, self.imgsz, self.imgsz), np.float32)
+        self._canvas = np.full((self.imgsz, self.imgsz, 3), 114, np.uint8)
+
+    def _open(self, ort, path, threads, optimize, save_to=None):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL if optimize \
+            else ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        if save_to:
+            options.optimized_model_filepath = save_to
+            options.log_severity_level = 3  # 같은 기기에서만 쓰는 캐시 → 하드웨어 전용 최적화 경고 생략
+
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {}
+
+    # ------------------------------------------------------------
+    # 탐지
+    # ------------------------------------------------------------
+    def detect(self, image):
+        h, w = image.shape[:2]
+        scale, pad_x, pad_y = detect_tensor(image, self.imgsz, self._canvas, self._input)
+
+        pred = self.session.run(None, {self.input_name: self._input})[0][0]  # (4+nc, N)
+        scores = pred[4:]
+        cls = scores.argmax(axis=0)
+        conf = scores[cls, np.arange(scores.shape[1])]
+        keep = conf > DETECT_CONF
+        if not keep.any():
+            return np.zeros((0, 4), np.int32), np.zeros(0, np.float32), np.zeros(0, np.int64)
+
+        cx, cy, bw, bh = pred[:4, keep]
+        cls, conf = cls[keep], conf[keep]
+        x1 = cx - bw / 2
+        y1 = cy - bh / 2
+
+        # 클래스별 NMS (클래스마다 좌표를 떨어뜨려 한 번에 처리)
+        offset = cls * 4096.0
+        rects = np.stack([x1 + offset, y1, bw, bh], axis=1)
+        idx = cv2.dnn.NMSBoxes(rects.tolist(), conf.tolist(), DETECT_CONF, DETECT_IOU)
+        idx = np.asarray(idx, np.int64).reshape(-1)
+
+        xyxy = np.stack([x1[idx], y1[idx], x1[idx] + bw[idx], y1[idx] + bh[idx]], axis=1)
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / scale).clip(0, w)
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / scale).clip(0, h)
+        order = np.argsort(-conf[idx])
+        return (xyxy[order].astype(np.int32), conf[idx][order].astype(np.float32),
+                cls[idx][order].astype(np.int64))
+
+    # ------------------------------------------------------------
+    # 분류 (입력은 imgsz x imgsz로 letterbox된 이미지 목록)
+    # ------------------------------------------------------------
+    def classify(self, images):
+        tensor = classify_tensor(images, self.imgsz)
+        if self.dynamic_batch:
+            probs = self.session.run(None, {self.input_name: tensor})[0]
+        else:
+            probs = np.concatenate([self.session.run(None, {self.input_name: t[None]})[0]
+                                    for t in tensor])
+        ids = probs.argmax(axis=1).astype(np.int64)
+        return ids, probs[np.arange(len(ids)), ids].astype(np.float32)
+
+
+# ============================================================
+# 모델 캐시
+# ============================================================
+_cache_keys = {}  # (경로, 크기, 수정 시각, task) → 키 (같은 실행에서 가중치를 다시 읽지 않도록)
+
+
+def export_options(task):
+    """ultralytics export 인자 (캐시 키에 포함)"""
+    # 분류 모델은 박스 배치 입력을 받도록 batch 차원을 동적으로
+    return {"format": "onnx", "imgsz": DETECT_IMGSZ if task == "detect" else CLASSIFY_IMGSZ,
+            "dynamic": task == "classify", "simplify": True}
+
+
+def cache_key(pt_path, task):
+    """가중치 파일 SHA-256 + export 옵션 → CACHE_KEY_LENGTH자리 hex"""
+    stat = os.stat(pt_path)
+    memo = (os.path.abspath(pt_path), stat.st_size, stat.st_mtime_ns, task)
+    key = _cache_keys.get(memo)
+    if key is None:
+        digest = hashlib.sha256()
+        with open(pt_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(repr(sorted(export_options(task).items())).encode())
+        key = _cache_keys[memo] = digest.hexdigest()[:CACHE_KEY_LENGTH]
+    return key
+
+
+def onnx_path_for(pt_path, task, precision="fp32"):
+    """가중치 해시로 키를 붙인 캐시 경로 (.pt와 같은 폴더)"""
+    stem = os.path.splitext(pt_path)[0]
+    suffix = "_int8" if precision == "int8" else ""
+    return f"{stem}.{cache_key(pt_path, task)}{suffix}.onnx"
+
+
+def optimized_path_for(onnx_path, ort_version):
+    """ONNX Runtime 최적화 그래프 경로 (최적화 결과는 런타임 버전별로 다를 수 있음)"""
+    return f"{os.path.splitext(onnx_path)[0]}.ort{ort_version}.onnx"
+
+
+def prune_cache(pt_path, key):
+    """같은 모델의 다른 키(이전 가중치) 캐시 파일 삭제"""
+    stem = os.path.splitext(pt_path)[0]
+    for path in glob.glob(glob.escape(stem) + ".*.onnx"):
+        old = os.path.basename(path)[len(os.path.basename(stem)) + 1:][:CACHE_KEY_LENGTH]
+        if old != key and len(old) == CACHE_KEY_LENGTH and \
+                all(c in "0123456789abcdef" for c in old):
+            os.remove(path)
+            print(f"  [INFO] 이전 모델 캐시 삭제: {os.path.basename(path)}")
+
+
+def export_onnx(pt_path, task):
+    """train_yolo_rps.export_model과 같은 방식으로 .pt → .onnx (같은 폴더, 키 없는 이름)"""
+    from ultralytics import YOLO
+
+    print(f"  [INFO] ONNX 형식으로 변환 중: {os.path.basename(pt_path)}")
+    return YOLO(pt_path).export(verbose=False, **export_options(task))
+
+
+def cached_onnx(pt_path, task):
+    """캐시된 .onnx 경로 - 없으면 export 후 키 붙은 이름으로 옮기고 이전 캐시 정리"""
+    path = onnx_path_for(pt_path, task)
+    if not os.path.exists(path):
+        start = time.time()
+        os.replace(export_onnx(pt_path, task), path)
+        print(f"  [✓] 모델 캐시 저장: {os.path.basename(path)} ({time.time() - start:.1f}s)")
+        prune_cache(pt_path, cache_key(pt_path, task))
+    return path
+
+
+# ============================================================
+# 로더
+# ============================================================
+def import_runtime(backend=BACKEND):
+    """추론 런타임 모듈을 미리 import → 사용할 런타임 이름 ("onnx" | "torch")
+
+    onnxruntime / ultralytics import는 라즈베리파이에서 수 초가 걸리므로
+    감지 스레드가 카메라 안정화와 겹치도록 먼저 호출한다 (모델 로드 시에는 캐시된 모듈 사용).
+    """
+    if backend in ("auto", "onnx"):
+        try:
+            import onnxruntime
+            return "onnx"
+        except ImportError:
+            if backend == "onnx":
+                raise
+    import ultralytics
+    return "torch"
+
+
+def load_model(pt_path, task, backend=BACKEND, threads=ONNX_THREADS, precision=PRECISION,
+               cache=ORT_OPTIMIZED_CACHE):
+    """모델 로드 (task: "detect" | "classify")"""
+    if backend in ("auto", "onnx"):
+        try:
+            onnx_path = onnx_path_for(pt_path, task, "int8")
+            if precision != "int8" or not os.path.exists(onnx_path):
+                onnx_path = cached_onnx(pt_path, task)
+            start = time.time()
+            model = OnnxBackend(onnx_path, task, threads, cache=cache)
+            print(f"  [✓] ONNX Runtime 로드 완료 ({os.path.basename(onnx_path)}, "
+                  f"스레드 {threads}, {time.time() - start:.1f}s"
+                  f"{', 최적화 캐시' if model.cached else ''})")
+            return model
+        except Exception as e:
+            if backend == "onnx":
+                raise
+            print(f"  [⚠️] ONNX 백엔드 사용 불가 ({e}) - PyTorch로 대체")
+    return TorchBackend(pt_path, task)
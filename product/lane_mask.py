@@ -0,0 +1,157 @@
+"""
+lane_mask.py
+------------
+차선 마스크 엔진 (좌/우/중앙 박스 픽셀 수를 한 번에 계산)
+
+기존 방식은 전체 프레임을 HSV로 변환한 뒤 박스마다
+inRange → erode(2회) → dilate(3회)를 따로 수행했다.
+여기서는 세 박스만 하나의 캔버스에 세로로 붙여 넣고
+(박스 사이에는 GAP 줄의 간격) 변환 / 임계값 / 모폴로지를 캔버스 전체에 한 번씩만 수행한다.
+
+* 버퍼는 박스 배치가 바뀔 때만 새로 할당 (dst= 재사용)
+* 간격 / 여백 영역은 erode 전에는 255, dilate 전에는 0으로 채워
+  이미지 경계와 같은 효과를 내므로 박스별 처리 결과와 픽셀 단위로 동일하다
+
+segmentation="lut"이면 HSV 변환 + inRange 대신 HsvLut으로
+카메라 프레임 픽셀 값에서 바로 마스크를 만든다 (HSV 범위가 바뀌면 표 재생성).
+"""
+
+import cv2
+import numpy as np
+
+KERNEL = np.ones((3, 3), np.uint8)  # 노이즈 제거 커널 (매 프레임 생성하지 않음)
+ERODE_ITERATIONS = 2
+DILATE_ITERATIONS = 3
+GAP = 4  # 박스 사이 간격 줄 수 (모폴로지 반경 3보다 커야 함)
+LUT_BITS = 8  # 8: 24비트 전체 표 (16MB, 결과 동일) / 5: 32x32x32 표 (32KB, 근사)
+
+
+class HsvLut:
+    """픽셀 값 → 차선 여부 조회표 (HSV 범위 1개당 1회 생성)
+
+    픽셀을 4바이트(RGBA)로 펼친 뒤 uint32로 읽어 그대로 인덱스로 사용한다.
+    (리틀 엔디언 기준: 인덱스 = c0 | c1 << 8 | c2 << 16, 라즈베리파이 / x86 모두 해당)
+    """
+
+    def __init__(self, lower, upper, code=cv2.COLOR_RGB2HSV, bits=LUT_BITS):
+        self.key = (tuple(int(v) for v in lower), tuple(int(v) for v in upper), code, bits)
+        self.bits = bits
+        levels = 1 << bits
+        # 각 칸의 대표값 (8비트면 0~255 전체, 5비트면 구간 중앙)
+        values = (np.arange(levels) << (8 - bits)) + ((1 << (8 - bits)) >> 1)
+        grid = np.empty((levels, levels, 3), np.uint8)
+        grid[..., 0] = values[None, :]
+        grid[..., 1] = values[:, None]
+        self.table = np.empty((levels, levels, levels), np.uint8)  # [c2][c1][c0]
+        lower = np.asarray(lower, np.uint8)
+        upper = np.asarray(upper, np.uint8)
+        for c2, value in enumerate(values):
+            grid[..., 2] = value
+            cv2.inRange(cv2.cvtColor(grid, code), lower, upper, dst=self.table[c2])
+        self.flat = self.table.reshape(-1)
+        self._index = None
+        self._tmp = None
+
+    def apply(self, packed, dst):
+        """packed: (H, W, 4) uint8 (c0, c1, c2, 알파) → dst (H, W) uint8 마스크"""
+        words = packed.view(np.uint32)[..., 0]
+        if self._index is None or self._index.shape != words.shape:
+            self._index = np.empty(words.shape, np.uint32)
+            self._tmp = np.empty(words.shape, np.uint32)
+        index = self._index
+        if self.bits == 8:
+            np.bitwise_and(words, 0xFFFFFF, out=index)
+        else:
+            # 채널마다 상위 bits 비트만 남겨 c0 | c1 << bits | c2 << 2*bits로 재배치
+            drop = 8 - self.bits
+            mask = (1 << self.bits) - 1
+            np.right_shift(words, drop, out=index)
+            np.bitwise_and(index, mask, out=index)
+            for channel in (1, 2):
+                np.right_shift(words, 8 * channel + drop - self.bits * channel, out=self._tmp)
+                np.bitwise_and(self._tmp, mask << (self.bits * channel), out=self._tmp)
+                np.bitwise_or(index, self._tmp, out=index)
+        np.take(self.flat, index, out=dst)
+        return dst
+
+
+class LaneMaskEngine:
+    """박스 목록 [(x1, y1, x2, y2), ...] → 박스별 차선 픽셀 수"""
+
+    def __init__(self, lower, upper, code=cv2.COLOR_RGB2HSV, segmentation="hsv", lut_bits=LUT_BITS,
+                 erode=ERODE_ITERATIONS, dilate=DILATE_ITERATIONS):
+        if max(erode, dilate) >= GAP:
+            raise ValueError(f"모폴로지 반복 횟수는 GAP({GAP})보다 작아야 합니다")
+        self.code = code
+        self.erode_iterations = erode    # 해상도가 낮은 입력(지면 격자 등)은 줄여서 사용
+        self.dilate_iterations = dilate
+        self.segmentation = segmentation
+        self.lut_bits = lut_bits
+        self.lut = None
+        self._boxes = None
+        self.set_range(lower, upper)
+
+    def set_range(self, lower, upper):
+        """HSV 범위 변경 (LUT 모드면 범위가 실제로 바뀐 경우에만 표 재생성)"""
+        self.lower = np.asarray(lower, np.uint8)
+        self.upper = np.asarray(upper, np.uint8)
+        if self.segmentation == "lut":
+            key = (tuple(int(v) for v in self.lower), tuple(int(v) for v in self.upper),
+                   self.code, self.lut_bits)
+            if self.lut is None or self.lut.key != key:
+                self.lut = HsvLut(self.lower, self.upper, self.code, self.lut_bits)
+
+    def _layout(self, boxes):
+        """박스를 캔버스에 세로로 배치하고 버퍼 할당"""
+        self._boxes = boxes
+        width = max(x2 - x1 for x1, _, x2, _ in boxes)
+        self._regions = []  # 캔버스 안의 (행 slice, 열 slice)
+        self._fill = []     # 경계 역할을 하는 간격 / 여백 영역
+        row = 0
+        for x1, y1, x2, y2 in boxes:
+            h, w = y2 - y1, x2 - x1
+            self._regions.append((slice(row, row + h), slice(0, w)))
+            if w < width:
+                self._fill.append((slice(row, row + h), slice(w, width)))
+            row += h
+            self._fill.append((slice(row, row + GAP), slice(0, width)))
+            row += GAP
+
+        # HSV 모드: 변환 결과 / LUT 모드: 원본 픽셀을 4바이트로 펼친 값
+        channels = 4 if self.segmentation == "lut" else 3
+        self.hsv = np.zeros((row, width, channels), np.uint8)
+        self.mask = np.zeros((row, width), np.uint8)
+        self._work = np.zeros_like(self.mask)
+
+    def _set_fill(self, image, value):
+        for rows, cols in self._fill:
+            image[rows, cols] = value
+
+    def count(self, frame, boxes):
+        """박스별 마스크 픽셀 수 튜플 (self.mask에 박스별 결과가 남음)"""
+        boxes = tuple(boxes)
+        if boxes != self._boxes:
+            self._layout(boxes)
+
+        if self.lut is not None:
+            # 박스 영역 픽셀을 채널 순서 그대로 4바이트로 펼쳐 조회표 적용 (HSV 변환 생략)
+            for (x1, y1, x2, y2), (rows, cols) in zip(boxes, self._regions):
+                cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_RGB2RGBA, dst=self.hsv[rows, cols])
+            self.lut.apply(self.hsv, self.mask)
+        else:
+            # 박스 영역만 HSV 변환 (캔버스에 직접 기록)
+            for (x1, y1, x2, y2), (rows, cols) in zip(boxes, self._regions):
+                cv2.cvtColor(frame[y1:y2, x1:x2], self.code, dst=self.hsv[rows, cols])
+            cv2.inRange(self.hsv, self.lower, self.upper, dst=self.mask)
+
+        self._set_fill(self.mask, 255)
+        cv2.erode(self.mask, KERNEL, dst=self._work, iterations=self.erode_iterations)
+        self._set_fill(self._work, 0)
+        cv2.dilate(self._work, KERNEL, dst=self.mask, iterations=self.dilate_iterations)
+
+        return tuple(cv2.countNonZero(self.mask[rows, cols]) for rows, cols in self._regions)
+
+    def region(self, index):
+        """index번째 박스의 마스크 view"""
+        rows, cols = self._regions[index]
+        return self.mask[rows, cols]
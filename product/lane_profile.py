@@ -0,0 +1,124 @@
+"""
+lane_profile.py
+---------------
+스캔라인 열 히스토그램 기반 차선 프로파일
+
+박스 픽셀 수(countNonZero)는 라인이 박스 안 어디에 있는지 버린다.
+여기서는 화면 높이별 얇은 가로 띠(스캔라인) 몇 개의 마스크를 받아
+띠마다 np.sum(axis=0) 한 번으로 열 히스토그램을 만들고
+* 좌/우 라인 위치 (좌/우 절반의 라인 열 가중 평균)
+* 차선 중심 (한쪽만 보이면 띠별로 기억해 둔 반폭 사용)
+* 곡률 (띠 높이에 대한 차선 중심 2차 근사)
+* 교차로 (먼 띠에서 라인 열이 화면 너비의 INTERSECTION_SPAN 이상 이어짐 = 가로 라인)
+을 구한다. 위치는 모두 px, 오차는 화면 중심 대비 -1.0~1.0.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# ======================================
+# 스캔라인 파라미터
+# ======================================
+SCAN_ROWS = (0.86, 0.74, 0.62, 0.50, 0.38)  # 스캔 띠 중심 (화면 높이 비율, 가까운 것부터)
+SCAN_HEIGHT = 0.04       # 스캔 띠 높이 (화면 높이 비율)
+MIN_COLUMN_FILL = 0.5    # 띠 높이의 이 비율 이상이 마스크면 라인 열
+INTERSECTION_ROW = 0.5   # 이 높이보다 먼(위쪽) 띠에서만 교차로 판단
+INTERSECTION_SPAN = 0.6  # 가장 긴 라인 열 구간이 화면 너비의 이 비율 이상이면 가로 라인
+HALF_WIDTH_SMOOTHING = 0.2
+
+LaneProfileResult = namedtuple("LaneProfileResult", [
+    "lefts",         # 띠별 왼쪽 라인 x (없으면 None)
+    "rights",        # 띠별 오른쪽 라인 x
+    "centers",       # 띠별 차선 중심 x
+    "error",         # 가장 가까운 유효 띠의 차선 중심 오차 (-1.0~1.0), 없으면 None
+    "curvature",     # 차선 중심 2차 근사 계수 (화면 너비 / 화면 높이² 정규화, 오른쪽으로 휘면 +)
+    "intersection",  # 가로 라인 감지 여부
+    "span",          # 먼 띠 중 가장 긴 라인 열 구간 / 화면 너비
+])
+
+
+def _longest_run(on):
+    """bool 배열에서 가장 긴 True 연속 구간 길이"""
+    if not on.any():
+        return 0
+    edges = np.diff(np.concatenate(([0], on.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max())
+
+
+class LaneProfile:
+    """스캔 띠 마스크 목록 → LaneProfileResult"""
+
+    def __init__(self, rows=SCAN_ROWS, band=SCAN_HEIGHT):
+        self.rows = rows
+        self.band = band
+        self._half = [None] * len(rows)  # 띠별 차선 반폭 (px)
+        self._cols = None                # 열 인덱스 (가중 평균용)
+        self._sums = None                # 열 합 버퍼
+        self._weights = None             # 라인 열만 남긴 열 합 버퍼
+        self._y = np.array([1.0 - r for r in rows])  # 화면 아래에서 띠까지 높이 (0~1)
+        self._fits = {}                  # 유효 띠 조합 → 2차 근사 최소제곱 행렬 (pinv)
+
+    def boxes(self, width, height):
+        """LaneMaskEngine.count()에 넘길 스캔 띠 박스 (화면 전체 너비)"""
+        half = max(1, int(height * self.band / 2))
+        return tuple((0, max(0, int(height * r) - half), width, min(height, int(height * r) + half))
+                     for r in self.rows)
+
+    def _line_x(self, lo, hi):
+        """[lo, hi) 열 구간의 라인 열 가중 평균 x"""
+        weights = self._weights[lo:hi]
+        total = weights.sum()
+        if total == 0:
+            return None
+        return float(np.dot(weights, self._cols[lo:hi])) / total
+
+    def _curvature(self, valid, centers, width):
+        """유효 띠 차선 중심의 2차 근사 계수 (조합별 최소제곱 행렬은 한 번만 계산)"""
+        key = tuple(valid)
+        fit = self._fits.get(key)
+        if fit is None:
+            y = self._y[valid]
+            fit = self._fits[key] = np.linalg.pinv(np.stack([y * y, y, np.ones_like(y)], axis=1))[0]
+        return float(np.dot(fit, [centers[i] for i in valid])) / width
+
+    def measure(self, masks, width):
+        if self._cols is None or len(self._cols) != width:
+            self._cols = np.arange(width, dtype=np.float64)
+            self._sums = np.empty(width, np.uint32)
+            self._weights = np.empty(width, np.float64)
+        mid = width // 2
+        lefts, rights, centers = [], [], []
+        span = 0.0
+
+        for i, mask in enumerate(masks):
+            sums = np.sum(mask, axis=0, dtype=np.uint32, out=self._sums)
+            on = sums >= MIN_COLUMN_FILL * 255 * mask.shape[0]
+
+            if self.rows[i] <= INTERSECTION_ROW:
+                span = max(span, _longest_run(on) / float(width))
+
+            np.multiply(sums, on, out=self._weights)
+            left = self._line_x(0, mid)
+            right = self._line_x(mid, width)
+            if left is not None and right is not None:
+                prev = self._half[i]
+                half = (right - left) / 2.0
+                self._half[i] = half if prev is None else prev + HALF_WIDTH_SMOOTHING * (half - prev)
+                center = (left + right) / 2.0
+            elif self._half[i] is not None and (left is not None or right is not None):
+                center = left + self._half[i] if left is not None else right - self._half[i]
+            else:
+                center = None
+            lefts.append(left)
+            rights.append(right)
+            centers.append(center)
+
+        valid = [i for i, c in enumerate(centers) if c is not None]
+        error = (centers[valid[0]] - mid) / mid if valid else None
+        curvature = self._curvature(valid, centers, width) if len(valid) >= 3 else 0.0
+
+        return LaneProfileResult(lefts, rights, centers, error, curvature,
+                                 span >= INTERSECTION_SPAN, span)
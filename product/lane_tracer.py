@@ -8,13 +8,22 @@ Line Tracer Integrated - 통합 라인 트레이서
 - 픽셀 임계값 고정값 사용: 1200
 - 라인 트레이싱 로직 단순화
 """
-import cv2
 import numpy as np
 import time
 import sys
 import select
-from gpiozero import DigitalOutputDevice, PWMOutputDevice
 from collections import deque
+from lane_mask import LaneMaskEngine
+from lane_profile import LaneProfile
+from birdseye import BirdsEyeView, GROUND_DILATE_ITERATIONS, GROUND_ERODE_ITERATIONS
+from camera import LANE_PROFILE, open_camera, pixel_scale
+from capture_thread import CaptureThread
+from control_loop import RateLoop
+from motor_driver import BUZZER_PIN, PWM_SLEW_RATE, MotorController
+from maneuver import Maneuver, ManeuverEngine, PRIORITY_SAFETY, PRIORITY_TURN
+from steering import MISSING_PIXELS, BalanceSteering, CentroidSteering, turn_wheels
+from perf_stats import LatencyStats
+from startup import timeline
 
 # shared_state import 시도
 try:
@@ -34,7 +43,47 @@ SIGN_COOLDOWN = 3.0  # 동일 표지판 재인식 방지 시간 (초)
 # ============================================================
 # 객체 감지 안정성 설정
 # ============================================================
-DETECTION_FRAME_THRESHOLD = 10  # 연속 N 프레임 이상 감지되어야 동작 실행 (약 0.66초)
+DETECTION_FRAME_THRESHOLD = 3  # 트랙 누적 N 프레임 이상 감지되어야 동작 실행 (연속 불필요, object_tracker.CONFIRM_HITS)
+
+# ============================================================
+# 차선 인식 설정
+# ============================================================
+# "hsv": 박스 영역 HSV 변환 + inRange / "lut": HSV 범위로 만든 조회표를 픽셀 값에 바로 적용
+LANE_SEGMENTATION = "hsv"
+
+# 조향 방식
+# "balance": 좌/우 박스 픽셀 비율 차이로 전진 / 좌회전 / 우회전 (기존)
+# "pid"    : ROI 띠별 라인 중심(cv2.moments) → PID → 좌/우 바퀴 연속 PWM
+#            (python benchmark.py steering 으로 가상 트랙 랩 타임 / 횡방향 오차 비교)
+STEERING_MODE = "balance"
+
+# 교차로 감지 방식
+# "profile": 스캔 띠 열 히스토그램에서 먼 띠의 라인 열이 화면 너비의 60% 이상 이어지면 가로 라인 (기하 판단)
+# "pixels" : 전방 중앙 박스 픽셀 수 > CENTER_THRESHOLD 이고 좌우 픽셀이 적을 때 (기존)
+INTERSECTION_DETECTION = "profile"
+
+# 차선 프로파일 / PID 조향 입력 화면
+# "camera"  : 카메라 원근 화면 그대로 (기존)
+# "birdseye": 역원근 지면 격자 (birdseye.py, 1cm/px) - 띠 위치 / 오차 / 가로 라인 폭이 거리와 무관
+#             (python benchmark.py birdseye 로 변환 지연 / 주행 비교, 실차는 CAMERA_* 장착값 보정 필요)
+LANE_VIEW = "camera"
+
+# 제어 루프 주기 (Hz) - 처리 시간을 빼고 남은 시간만 대기, 마감 초과는 missed로 집계
+CONTROL_HZ = 50.0
+
+# 모터 핀 백엔드 ("gpiozero" | "lgpio" | "mock") - 바뀐 핀만 쓰고 PWM 변화량은 초당 PWM_SLEW_RATE로 제한
+# mock은 하드웨어 없이 핀 쓰기 횟수만 집계 (python benchmark.py motors 로 쓰기 횟수 비교)
+MOTOR_BACKEND = "gpiozero"
+
+# 카메라 백엔드 ("picamera2" | "v4l2" | "replay" | "synthetic" | "fake")
+# replay / synthetic / fake는 하드웨어 없이 녹화 영상 / 가상 트랙으로 주행 루프 실행
+CAMERA_BACKEND = "picamera2"
+CAMERA_RETRIES = 3          # 카메라 열기 시도 횟수
+CAMERA_RETRY_DELAY = 0.5    # 재시도 전 대기 (초, "Pipeline handler in use"면 libcamera 프로세스 종료 후)
+
+# 시작 순서: 카메라 노출 안정화 / 감지 모델 로드+워밍업을 동시에 진행하고 둘 다 끝나면 즉시 주행
+# (main.py가 감지 스레드를 등록한 경우에만 대기, 시간 초과 시 감지 없이 주행 시작)
+DETECTOR_READY_TIMEOUT = 60.0
 
 # ============================================================
 # 로그 최적화를 위한 상태 추적 변수
@@ -43,57 +92,32 @@ last_detected_objects = set()  # 이전 프레임에서 감지된 객체
 last_cooldown_warnings = {}  # 쿨다운 경고 마지막 출력 시간
 
 # ============================================================
-# 모터 / 부저 설정 (Lazy Initialization)
+# lane_tracer 전용 상태 (shared_state에 두지 않음)
 # ============================================================
-# GPIO 객체들을 None으로 초기화 (실제 초기화는 init_gpio에서)
-PWMA = None
-AIN1 = None
-AIN2 = None
+slow_mode_active = False   # 감속 모드 진행 중
+slow_mode_until = None     # 감속 모드 해제 시각
+last_actuation = 0.0       # 마지막 모터 명령 시각 (perf_counter, 캡처→구동 지연 측정용)
+maneuvers = ManeuverEngine()  # 시간 단계 동작 (회전 / 정지 표지판), 안전 동작이 회전을 선점
+buzzer_until = None        # 부저 끄는 시각 (beep 비블로킹)
 
-PWMB = None
-BIN1 = None
-BIN2 = None
-
-BUZZER = None
+# ============================================================
+# 모터 / 부저 설정 (Lazy Initialization)
+# ============================================================
+# 모터 / 부저 핀은 MotorController가 첫 명령 때 연다 (init_gpio에서 명시적으로 초기화)
+motors = MotorController(MOTOR_BACKEND, slew_rate=PWM_SLEW_RATE, buzzer_pin=BUZZER_PIN)
 
 def init_gpio():
     """GPIO 초기화 - 프로그램 시작 시 한 번 호출"""
-    global PWMA, AIN1, AIN2, PWMB, BIN1, BIN2, BUZZER
+    global motors
 
     try:
         # 기존 GPIO 정리 (있다면)
-        if PWMA is not None:
-            PWMA.close()
-        if AIN1 is not None:
-            AIN1.close()
-        if AIN2 is not None:
-            AIN2.close()
-        if PWMB is not None:
-            PWMB.close()
-        if BIN1 is not None:
-            BIN1.close()
-        if BIN2 is not None:
-            BIN2.close()
-        if BUZZER is not None:
-            BUZZER.close()
+        motors.cleanup()
     except:
         pass
 
-    # 새로 초기화
-    PWMA = PWMOutputDevice(18)
-    AIN1 = DigitalOutputDevice(22)
-    AIN2 = DigitalOutputDevice(27)
-
-    PWMB = PWMOutputDevice(23)
-    BIN1 = DigitalOutputDevice(25)
-    BIN2 = DigitalOutputDevice(24)
-
-    # 부저 설정
-    try:
-        BUZZER = DigitalOutputDevice(12)
-    except Exception:
-        BUZZER = None
-        pass
+    # 새로 초기화 (MOTOR_BACKEND를 바꾼 경우 반영)
+    motors = MotorController(MOTOR_BACKEND, slew_rate=PWM_SLEW_RATE, buzzer_pin=BUZZER_PIN).open()
 
 # 속도 프로파일 (단순화 버전과 동일)
 SPEED_FORWARD_DEFAULT = 0.75  # 기본 직진 속도
@@ -108,76 +132,40 @@ SPEED_TURN = SPEED_TURN_DEFAULT
 # ============================================================
 # 모터 제어 함수
 # ============================================================
+def _mark_actuation():
+    """모터 명령 시각 기록"""
+    global last_actuation
+    last_actuation = time.perf_counter()
+
 def motor_forward():
     """전진"""
-    AIN1.value = 0
-    AIN2.value = 1
-    PWMA.value = SPEED_FORWARD
-    BIN1.value = 0
-    BIN2.value = 1
-    PWMB.value = SPEED_FORWARD
+    motor_drive(SPEED_FORWARD, SPEED_FORWARD)
+
+def motor_drive(left, right):
+    """좌/우 바퀴 출력 (-1.0~1.0, 음수는 후진) - 연속 차동 조향 (바뀐 핀만 씀)"""
+    _mark_actuation()
+    motors.wheels(left, right)
 
 def motor_left(intensity=1.0):
-    """좌회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    # 급격한 회전: 안쪽 바퀴를 후진시킴 (intensity > 0.5일 때)
-    if intensity > 0.5:
-        # 제자리 회전에 가까운 동작
-        AIN1.value = 1  # 왼쪽 후진
-        AIN2.value = 0
-        PWMA.value = SPEED_TURN * 0.3 * intensity
-        BIN1.value = 0  # 오른쪽 전진
-        BIN2.value = 1
-        PWMB.value = SPEED_TURN * 1.2 * intensity
-    else:
-        # 일반 회전: 안쪽 바퀴 느리게
-        left_ratio = 0.0  # 안쪽 바퀴 정지
-        right_ratio = 1.2 * intensity  # 바깥쪽 바퀴 더 빠르게
-        AIN1.value = 0
-        AIN2.value = 1
-        PWMA.value = SPEED_TURN * left_ratio
-        BIN1.value = 0
-        BIN2.value = 1
-        PWMB.value = SPEED_TURN * right_ratio
+    """좌회전 - intensity로 회전 강도 조절 (0.0~1.0)
+
+    intensity > 0.5면 안쪽(왼쪽) 바퀴를 후진시켜 제자리 회전에 가깝게,
+    아니면 안쪽 바퀴 정지 + 바깥쪽 바퀴 더 빠르게 (steering.turn_wheels)
+    """
+    motor_drive(*turn_wheels("LEFT", intensity, SPEED_TURN))
 
 def motor_right(intensity=1.0):
     """우회전 - intensity로 회전 강도 조절 (0.0~1.0)"""
-    # 급격한 회전: 안쪽 바퀴를 후진시킴 (intensity > 0.5일 때)
-    if intensity > 0.5:
-        # 제자리 회전에 가까운 동작
-        AIN1.value = 0  # 왼쪽 전진
-        AIN2.value = 1
-        PWMA.value = SPEED_TURN * 1.2 * intensity
-        BIN1.value = 1  # 오른쪽 후진
-        BIN2.value = 0
-        PWMB.value = SPEED_TURN * 0.3 * intensity
-    else:
-        # 일반 회전: 안쪽 바퀴 느리게
-        left_ratio = 1.2 * intensity  # 바깥쪽 바퀴 더 빠르게
-        right_ratio = 0.0  # 안쪽 바퀴 정지
-        AIN1.value = 0
-        AIN2.value = 1
-        PWMA.value = SPEED_TURN * left_ratio
-        BIN1.value = 0
-        BIN2.value = 1
-        PWMB.value = SPEED_TURN * right_ratio
+    motor_drive(*turn_wheels("RIGHT", intensity, SPEED_TURN))
 
 def motor_stop():
     """정지 - 완전한 브레이크 모드"""
-    AIN1.value = 0
-    AIN2.value = 0  # 왼쪽 모터 브레이크
-    PWMA.value = 0.0
-    BIN1.value = 0
-    BIN2.value = 0  # 오른쪽 모터 브레이크
-    PWMB.value = 0.0
+    _mark_actuation()
+    motors.stop()  # 방향 핀 모두 0 + PWM 0 (slew 제한 없이 즉시)
 
 def motor_backward():
     """후진 - 비정상 픽셀 값 감지 시"""
-    AIN1.value = 1
-    AIN2.value = 0
-    PWMA.value = SPEED_FORWARD * 0.5  # 느리게 후진
-    BIN1.value = 1
-    BIN2.value = 0
-    PWMB.value = SPEED_FORWARD * 0.5
+    motor_drive(-SPEED_FORWARD * 0.5, -SPEED_FORWARD * 0.5)  # 느리게 후진
 
 def set_slow_mode():
     """감속 모드 설정"""
@@ -194,14 +182,51 @@ def restore_speed():
     pass
 
 def beep(sec=1.0):
-    """부저 울리기"""
-    if BUZZER:
-        BUZZER.value = 1
-        time.sleep(sec)
-        BUZZER.value = 0
-    else:
-        pass
-        time.sleep(sec)
+    """부저 울리기 (비블로킹: update_buzzer()가 sec초 뒤에 끔)"""
+    global buzzer_until
+    motors.set_buzzer(True)
+    buzzer_until = time.time() + sec
+
+def update_buzzer(now):
+    """beep 시간이 끝났으면 부저 끄기 (매 틱 호출)"""
+    global buzzer_until
+    if buzzer_until is not None and now >= buzzer_until:
+        motors.set_buzzer(False)
+        buzzer_until = None
+
+# ============================================================
+# 시간 단계 동작 (maneuvers 엔진이 매 틱 진행, time.sleep 없음)
+# ============================================================
+def start_maneuver(maneuver):
+    """동작 시작 (진행 중인 동작보다 우선순위가 낮으면 거절되어 False)"""
+    started = maneuvers.start(maneuver, time.time())
+    if not started:
+        print(f"  [동작] {maneuver.name} 거절 - {maneuvers.active.name} 진행 중")
+    return started
+
+def turn_maneuver(direction):
+    """교차로 / 수동 회전: 직진 접근 0.5초 → 회전 1.2초 → 라인 복귀 직진 0.5초"""
+    turn = (lambda: motor_left(1.0)) if direction == "LEFT" else (lambda: motor_right(1.0))
+    return Maneuver(direction, [
+        (motor_forward, 0.5),  # 직진으로 접근
+        (turn, 1.2),           # 회전 시간 (충분히 회전)
+        (motor_forward, 0.5),  # 라인 복귀 직진
+    ], priority=PRIORITY_TURN)
+
+def slow_forward():
+    """감속 속도로 전진 (현재 속도 설정은 유지)"""
+    global SPEED_FORWARD
+    old_speed = SPEED_FORWARD
+    SPEED_FORWARD = SPEED_SLOW_FORWARD
+    motor_forward()
+    SPEED_FORWARD = old_speed  # 원래 속도로 복구
+
+def stop_sign_maneuver():
+    """STOP 표지판: 2초 정지 → 0.5초 천천히 출발 (안전 동작, 회전 중이어도 선점)"""
+    return Maneuver("STOP", [
+        (motor_stop, 2.0),     # 2초 정지
+        (slow_forward, 0.5),   # 정지 후 천천히 출발
+    ], priority=PRIORITY_SAFETY)
 
 # ============================================================
 # 유틸리티 함수
@@ -222,6 +247,7 @@ def get_user_input():
 def handle_runtime_triggers(frame_count=0):
     """주행 중 객체 인식 트리거 처리"""
     global SPEED_FORWARD, last_detected_objects  # 함수 시작 부분에 global 선언
+    global slow_mode_active, slow_mode_until
 
     if not OBJECT_DETECTION_ENABLED:
         return False
@@ -229,12 +255,12 @@ def handle_runtime_triggers(frame_count=0):
     handled = False
     timestamp = time.strftime("%H:%M:%S")
 
-    with shared_state.lock:
-        obj_state = shared_state.object_state.copy()
-        trig = shared_state.last_trigger
-        # 신뢰도 및 프레임 카운트 정보 가져오기
-        confidence = getattr(shared_state, 'confidence', {})
-        detection_frames = getattr(shared_state, 'detection_frames', {})
+    # 최신 감지 스냅샷 (불변 객체이므로 lock 불필요)
+    snapshot = shared_state.detections.get()
+    obj_state = snapshot.object_state
+    # 신뢰도 및 프레임 카운트 정보 가져오기
+    confidence = snapshot.confidence
+    detection_frames = snapshot.detection_frames
 
     # 객체 상태 확인 및 알림 (상태 변경 시에만)
     current_detected = set([k for k, v in obj_state.items() if v])
@@ -267,27 +293,14 @@ def handle_runtime_triggers(frame_count=0):
         # 객체가 사라지면 상태 리셋
         if last_detected_objects:
             last_detected_objects = set()
-            try:
-                with shared_state.lock:
-                    # 저장된 표지판 플래그도 리셋
-                    if hasattr(shared_state, 'stop_sign_stored'):
-                        delattr(shared_state, 'stop_sign_stored')
-                    if hasattr(shared_state, 'traffic_light_stored'):
-                        delattr(shared_state, 'traffic_light_stored')
-                    if hasattr(shared_state, 'slow_mode_active'):
-                        delattr(shared_state, 'slow_mode_active')
-                    # 알림 플래그 리셋
-                    for attr in dir(shared_state):
-                        if attr.endswith('_notified'):
-                            delattr(shared_state, attr)
-            except:
-                pass  # 플래그 리셋 실패는 무시
+            # 감속 표지판 재인식 허용 (해제 타이머는 유지)
+            slow_mode_active = False
 
-    # STOP 표지판 - 즉시 정지 (연속 프레임 체크 + 중복 실행 방지)
+    # STOP 표지판 - 즉시 정지 (트랙 확정 체크 + 중복 실행 방지)
     if obj_state.get("stop"):
         frames = detection_frames.get("stop", 0)
 
-        # 연속 프레임 임계값 체크
+        # 누적 프레임 임계값 체크 (트래커 확정)
         if frames < DETECTION_FRAME_THRESHOLD:
             return handled  # 임계값 미달 시 처리 안 함
 
@@ -296,66 +309,47 @@ def handle_runtime_triggers(frame_count=0):
 
         # 중복 실행 체크
         can_execute = True
-        with shared_state.lock:
-            if "stop" in shared_state.action_last_time:
-                time_since = current_time - shared_state.action_last_time["stop"]
-                if time_since < shared_state.ACTION_COOLDOWN:
-                    can_execute = False
-                    # 쿨다운 경고는 첫 1회만 출력
-                    if "stop" not in last_cooldown_warnings or (current_time - last_cooldown_warnings["stop"]) > 5:
-                        pass
-                        last_cooldown_warnings["stop"] = current_time
-
-        if can_execute:
-            print(f"🛑 [stop 객체] 동작 실행! (연속 {frames}프레임 감지)")
-            pass
-
-            # 즉시 정지
-            motor_stop()
-            pass
-            time.sleep(2.0)  # 2초 정지
+        action_last_time = shared_state.actions.get()
+        if "stop" in action_last_time:
+            time_since = current_time - action_last_time["stop"]
+            if time_since < shared_state.ACTION_COOLDOWN:
+                can_execute = False
+                # 쿨다운 경고는 첫 1회만 출력
+                if "stop" not in last_cooldown_warnings or (current_time - last_cooldown_warnings["stop"]) > 5:
+                    pass
+                    last_cooldown_warnings["stop"] = current_time
 
-            # 정지 후 천천히 출발
+        # 즉시 정지 후 천천히 출발 (비블로킹, 진행 중인 회전은 선점)
+        if can_execute and start_maneuver(stop_sign_maneuver()):
+            print(f"🛑 [stop 객체] 동작 실행! (누적 {frames}프레임 감지)")
             pass
-            # 속도를 낮춰서 천천히 출발
-            old_speed = SPEED_FORWARD
-            SPEED_FORWARD = SPEED_SLOW_FORWARD
-            motor_forward()
-            time.sleep(0.5)
-            SPEED_FORWARD = old_speed  # 원래 속도로 복구
 
             # 마지막 실행 시간 기록
-            with shared_state.lock:
-                shared_state.action_last_time["stop"] = current_time
+            shared_state.record_action("stop", current_time)
 
         handled = True
 
-    # SLOW 표지판 - 즉시 감속하지만 블로킹하지 않음 (연속 프레임 체크)
+    # SLOW 표지판 - 즉시 감속하지만 블로킹하지 않음 (트랙 확정 체크)
     elif obj_state.get("slow"):
         frames = detection_frames.get("slow", 0)
 
-        # 연속 프레임 임계값 체크
+        # 누적 프레임 임계값 체크 (트래커 확정)
         if frames >= DETECTION_FRAME_THRESHOLD:
             conf = confidence.get("slow", 0) if confidence else 0
 
-            try:
-                with shared_state.lock:
-                    if not getattr(shared_state, 'slow_mode_active', False):
-                        print(f"⚠️ [SLOW 표지판 감지] 감속 모드 전환 (연속 {frames}프레임)")
-                        pass
-                        set_slow_mode()
-                        # 3초 후 속도 복구를 위한 타이머 설정 (블로킹하지 않음)
-                        shared_state.slow_mode_until = time.time() + 3.0
-                        shared_state.slow_mode_active = True
-            except:
-                pass
+            if not slow_mode_active:
+                print(f"⚠️ [SLOW 표지판 감지] 감속 모드 전환 (누적 {frames}프레임)")
+                set_slow_mode()
+                # 3초 후 속도 복구를 위한 타이머 설정 (블로킹하지 않음)
+                slow_mode_until = time.time() + 3.0
+                slow_mode_active = True
         handled = True
 
-    # HORN 표지판 (연속 프레임 체크 + 중복 실행 방지)
+    # HORN 표지판 (트랙 확정 체크 + 중복 실행 방지)
     elif obj_state.get("horn"):
         frames = detection_frames.get("horn", 0)
 
-        # 연속 프레임 임계값 체크
+        # 누적 프레임 임계값 체크 (트래커 확정)
         if frames < DETECTION_FRAME_THRESHOLD:
             return handled
 
@@ -364,25 +358,24 @@ def handle_runtime_triggers(frame_count=0):
 
         # 중복 실행 체크
         can_execute = True
-        with shared_state.lock:
-            if "horn" in shared_state.action_last_time:
-                time_since = current_time - shared_state.action_last_time["horn"]
-                if time_since < shared_state.ACTION_COOLDOWN:
-                    can_execute = False
-                    # 쿨다운 경고는 5초마다만 출력
-                    if "horn" not in last_cooldown_warnings or (current_time - last_cooldown_warnings["horn"]) > 5:
-                        pass
-                        last_cooldown_warnings["horn"] = current_time
+        action_last_time = shared_state.actions.get()
+        if "horn" in action_last_time:
+            time_since = current_time - action_last_time["horn"]
+            if time_since < shared_state.ACTION_COOLDOWN:
+                can_execute = False
+                # 쿨다운 경고는 5초마다만 출력
+                if "horn" not in last_cooldown_warnings or (current_time - last_cooldown_warnings["horn"]) > 5:
+                    pass
+                    last_cooldown_warnings["horn"] = current_time
 
         if can_execute:
-            print(f"📢 [horn 객체] 동작 실행! (연속 {frames}프레임 감지)")
+            print(f"📢 [horn 객체] 동작 실행! (누적 {frames}프레임 감지)")
             pass
             beep(1.0)
             pass
 
             # 마지막 실행 시간 기록
-            with shared_state.lock:
-                shared_state.action_last_time["horn"] = current_time
+            shared_state.record_action("horn", current_time)
 
         handled = True
 
@@ -390,21 +383,10 @@ def handle_runtime_triggers(frame_count=0):
     # store_direction_signs에서 처리됨
 
     # SLOW 모드 자동 해제 체크 (비블로킹 처리)
-    try:
-        with shared_state.lock:
-            if hasattr(shared_state, 'slow_mode_until'):
-                if time.time() > shared_state.slow_mode_until:
-                    restore_speed()
-                    delattr(shared_state, 'slow_mode_until')
-                    shared_state.slow_mode_active = False
-                    pass
-    except:
-        pass
-
-    if handled:
-        with shared_state.lock:
-            shared_state.last_trigger = None
-        pass
+    if slow_mode_until is not None and time.time() > slow_mode_until:
+        restore_speed()
+        slow_mode_until = None
+        slow_mode_active = False
 
     return handled
 
@@ -412,60 +394,26 @@ def handle_runtime_triggers(frame_count=0):
 # 카메라 초기화
 # ============================================================
 def init_camera():
-    """카메라 초기화 - 640x480 해상도"""
-    max_retries = 3
-    retry_delay = 2
+    """카메라 초기화 - lane 저해상도 + 감지용 main 스트림 (camera.LANE_PROFILE)
 
-    for attempt in range(max_retries):
+    노출 안정화는 기다리지 않고 반환한다 (lane_follow_loop에서 camera.wait_settled()).
+    """
+    for attempt in range(CAMERA_RETRIES):
         try:
-            from picamera2 import Picamera2
-            pass
-
-            # 카메라가 사용 중일 수 있으므로 잠시 대기
-            if attempt > 0:
-                pass
-                time.sleep(retry_delay)
-
-                # 카메라 관련 프로세스 종료 시도
-                import subprocess
-                subprocess.run(['pkill', '-f', 'libcamera'], capture_output=True)
-                time.sleep(0.5)
-
-            picam2 = Picamera2()
-            config = picam2.create_preview_configuration(
-                main={"format": "RGB888", "size": (640, 480)}
-            )
-            picam2.configure(config)
-            picam2.start()
-            time.sleep(2)
-
-            pass
-
-            class CameraWrapper:
-                def read(self):
-                    frame = picam2.capture_array()
-                    # RGB 그대로 사용 (BGR 변환 제거)
-                    return True, frame
-
-                def release(self):
-                    picam2.stop()
-
-            return CameraWrapper()
+            camera = open_camera(CAMERA_BACKEND, LANE_PROFILE, wait_settle=False)
+            print(f"  [카메라] {camera.name} | lane {LANE_PROFILE.lane_size} / "
+                  f"감지 {LANE_PROFILE.main_size} | 180° 회전: 센서")
+            return camera
 
         except Exception as e:
-            pass
-
+            print(f"  [카메라 오류] {attempt + 1}/{CAMERA_RETRIES}: {e}")
+            if attempt == CAMERA_RETRIES - 1:
+                break
             if "Pipeline handler in use" in str(e):
-                pass
-                if attempt < max_retries - 1:
-                    pass
-                else:
-                    pass
-                    pass
-                    pass
-                    pass
-                    pass
-                    pass
+                # 이전 실행이 카메라를 잡고 있으면 libcamera 프로세스 종료 후 재시도
+                import subprocess
+                subprocess.run(['pkill', '-f', 'libcamera'], capture_output=True)
+            time.sleep(CAMERA_RETRY_DELAY)
 
     return None
 
@@ -484,10 +432,10 @@ def store_direction_signs(frame_count=0):
     if current_time - last_sign_time < SIGN_COOLDOWN:
         return
 
-    with shared_state.lock:
-        obj_state = shared_state.object_state.copy()
-        confidence = getattr(shared_state, 'confidence', {})
-        detection_frames = getattr(shared_state, 'detection_frames', {})
+    snapshot = shared_state.detections.get()
+    obj_state = snapshot.object_state
+    confidence = snapshot.confidence
+    detection_frames = snapshot.detection_frames
 
     timestamp = time.strftime("%H:%M:%S")
     direction_signs = ["go_straight", "turn_left", "turn_right", "traffic"]  # 신호등 추가
@@ -496,7 +444,7 @@ def store_direction_signs(frame_count=0):
         if obj_state.get(sign):
             frames = detection_frames.get(sign, 0)
 
-            # 연속 프레임 임계값 체크
+            # 누적 프레임 임계값 체크 (트래커 확정)
             if frames < DETECTION_FRAME_THRESHOLD:
                 continue  # 임계값 미달 시 다음 표지판 체크
 
@@ -561,7 +509,8 @@ def lane_follow_loop():
 
     # GPIO 초기화 (중요: 프로그램 시작 시 GPIO 설정)
     pass
-    init_gpio()
+    with timeline.phase("모터 초기화"):
+        init_gpio()
     pass
 
     pass
@@ -585,8 +534,7 @@ def lane_follow_loop():
 
         # shared_state 초기 상태 확인
         try:
-            with shared_state.lock:
-                _ = shared_state.object_state.copy()  # 연결 테스트
+            _ = shared_state.detections.get()  # 연결 테스트
             print(f"  [객체탐지 시스템] 초기화 완료 - shared_state 연결 성공")
         except Exception as e:
             print(f"  [객체탐지 시스템] 경고: shared_state 접근 오류: {e}")
@@ -597,13 +545,51 @@ def lane_follow_loop():
     pass
     pass
 
-    camera = init_camera()
+    with timeline.phase("카메라 열기"):
+        camera = init_camera()
     if not camera:
+        timeline.ready("camera", ok=False)
         return
+    with timeline.phase("노출 안정화"):
+        camera.wait_settled()
+
+    # 전용 캡처 스레드: 제어 루프는 최신 프레임만 받아 처리 (camera.read() 대기 없음)
+    # 감지 스레드가 요청한 시각(frame_due)이 지나면 main 스트림도 받아 링에 바로 기록
+    capture = CaptureThread(
+        camera,
+        want_main=lambda: OBJECT_DETECTION_ENABLED and time.time() >= shared_state.frame_due.get(),
+        on_main=shared_state.frame_ring.write if OBJECT_DETECTION_ENABLED else None,
+    ).start()
+    actuation_latency = LatencyStats("캡처→구동")
+
+    # 첫 프레임까지만 대기 (이후 루프는 최신 프레임을 기다리지 않고 가져감)
+    with timeline.phase("첫 프레임"):
+        last_seq, frame_ts, frame = capture.read(timeout=5.0)  # frame_ts: 처리 중인 프레임의 캡처 시각
+    if frame is None:
+        print(f"  [카메라 오류] 첫 프레임 없음: {capture.error}")
+        timeline.ready("camera", ok=False)
+        capture.release()
+        return
+    timeline.ready("camera")
+
+    # 감지 모델 로드 / 워밍업이 끝날 때까지 정지 상태로 대기 (카메라 안정화와 겹쳐 진행됨)
+    with timeline.phase("감지기 대기"):
+        detector_ready = timeline.wait("detector", timeout=DETECTOR_READY_TIMEOUT)
+    if OBJECT_DETECTION_ENABLED and not detector_ready and not shared_state.detector_active:
+        print("  [⚠️] 감지기 비활성 또는 준비 시간 초과 - 객체 인식 없이 주행 시작")
+    timeline.mark("주행 시작")
+    timeline.report()
+    # 대기하는 동안 지나간 첫 프레임 대신 최신 프레임부터 처리
+    _, frame_ts, frame = capture.read(wait=False)
+    last_seq = 0  # 마지막으로 처리한 프레임 (아직 없음 → 첫 틱에서 최신 프레임 처리)
+
+    # 고정 주기 스케줄러 (time.sleep(0.02) 대신 마감 시각까지만 대기)
+    loop = RateLoop(CONTROL_HZ)
 
     # HSV 범위 - 청록색(Cyan) 라인용 (확장된 범위)
     lower_cyan = np.array([65, 20, 20])
     upper_cyan = np.array([115, 255, 255])
+    mask_engine = LaneMaskEngine(lower_cyan, upper_cyan, segmentation=LANE_SEGMENTATION)
 
     start_time = time.time()
     frame_count = 0
@@ -612,9 +598,29 @@ def lane_follow_loop():
     # 현재 동작 상태 초기화 (오류 수정)
     action = "STOP"
 
-    # 동적 균형 임계값 (속도 기반 - 개선된 버전)
-    BASE_BALANCE_THRESHOLD = 0.35  # 기본 균형 임계값 (저속/중속)
-    HIGH_SPEED_BALANCE_THRESHOLD = 0.25  # 고속 시 균형 임계값 (더 민감)
+    # 조향 컨트롤러 (STEERING_MODE)
+    centroid = CentroidSteering()   # 띠별 중심선 PID
+    steer_engine = LaneMaskEngine(lower_cyan, upper_cyan, segmentation=LANE_SEGMENTATION)
+
+    # 역원근 지면 격자 (LANE_VIEW="birdseye"): remap 맵은 여기서 한 번만 생성
+    birdseye = None
+    view_morph = {}
+    if LANE_VIEW == "birdseye":
+        # 가상 트랙은 렌더링과 같은 투영을 그대로 사용, 실제 카메라는 장착값(pinhole) 보정
+        project = getattr(camera, "ground_to_image", None)
+        birdseye = BirdsEyeView(project, LANE_PROFILE.lane_size) if project \
+            else BirdsEyeView.pinhole(LANE_PROFILE.lane_size)
+        view_morph = {"erode": GROUND_ERODE_ITERATIONS, "dilate": GROUND_DILATE_ITERATIONS}
+        print(f"  [지면 격자] {birdseye.size[0]}x{birdseye.size[1]} "
+              f"({birdseye.resolution * 100:.0f}cm/px, 화면 포함 {birdseye.coverage:.0%})")
+    if view_morph:
+        steer_engine = LaneMaskEngine(lower_cyan, upper_cyan, segmentation=LANE_SEGMENTATION, **view_morph)
+
+    # 스캔 띠 차선 프로파일 (좌/우 라인 위치, 차선 중심, 곡률, 가로 라인)
+    lane_profile = LaneProfile()
+    profile_engine = LaneMaskEngine(lower_cyan, upper_cyan, segmentation=LANE_SEGMENTATION, **view_morph)
+    profile_time = LatencyStats("차선 프로파일")
+    profile = None
 
     # 박스 크기 설정 (해상도에 맞춰)
     BOX_WIDTH_RATIO = 0.25   # 화면 너비의 25%
@@ -627,16 +633,14 @@ def lane_follow_loop():
     BOX_HEIGHT = int(height * BOX_HEIGHT_RATIO)
 
     # 픽셀 임계값 (고정값)
-    PIXEL_THRESHOLD = 800  # 라인 감지 임계값 (더 민감하게 조정)
-    CENTER_THRESHOLD = 5000  # 교차로 감지 임계값 (고정)
-
-    # 한쪽 라인 없을 때 직진 타이머 (개선된 버전)
-    one_side_missing_time = None
-    one_side_missing_direction = None
-    STRAIGHT_DURATION = 0.5  # 한쪽 없을 때 직진 시간
+    # 640x480 기준값을 lane 스트림 해상도에 맞춰 환산
+    scale = pixel_scale(LANE_PROFILE)
+    PIXEL_THRESHOLD = int(800 * scale)  # 라인 감지 임계값 (더 민감하게 조정)
+    CENTER_THRESHOLD = int(5000 * scale)  # 교차로 감지 임계값 (고정)
+    MISSING_THRESHOLD = int(MISSING_PIXELS * scale)  # 한쪽 라인 없음 판단 임계값
 
-    # 라인 탐색 방향 (마지막으로 본 방향)
-    last_seen_side = None  # 'LEFT' or 'RIGHT'
+    # 좌우 비율 균형 (속도별 임계값 / 한쪽 라인 없을 때 직진 타이머 포함, STEERING_MODE="balance")
+    balance = BalanceSteering(missing_pixels=MISSING_THRESHOLD)
 
     # 교차로 모드 관련 변수
     intersection_mode = False
@@ -650,25 +654,45 @@ def lane_follow_loop():
 
     # 차량 상태 관련
     vehicle_stopped = False  # 차량 정지 상태
+    lane_status = None       # 마지막으로 발행한 LaneStatus
     stop_reason = None  # 정지 이유
 
     # 높은 픽셀 값 감지 및 후진 모드
-    HIGH_PIXEL_THRESHOLD = 12000  # 비정상 픽셀 값 임계값
+    HIGH_PIXEL_THRESHOLD = int(12000 * scale)  # 비정상 픽셀 값 임계값
     HIGH_PIXEL_DURATION = 0.5     # 0.5초 이상 지속 시 후진
     high_pixel_start_time = None  # 높은 픽셀 값 감지 시작 시간
     reverse_mode = False          # 후진 모드 플래그
 
     try:
         while True:
-            ret, frame = camera.read()
-            if not ret:
-                pass
+            loop.wait()
+
+            # 직전 프레임의 캡처 → 모터 명령 지연 기록 (새 프레임을 처리한 틱만)
+            if frame_ts is not None and last_actuation >= frame_ts:
+                actuation_latency.add((last_actuation - frame_ts) * 1000.0)
+                frame_ts = None
+
+            # 캡처 스레드의 최신 프레임 (대기 없음)
+            seq, ts, frame = capture.read(wait=False)
+            if frame is None or capture.ended and seq == last_seq:
+                if capture.error is not None:
+                    print(f"  [카메라 오류] {capture.error}")
                 break
 
+            # 시간 단계 동작 / 부저 진행, 모터 PWM을 목표까지 slew 제한으로 진행
+            update_buzzer(time.time())
+            motors.update()
+
+            # 새 프레임이 없으면 (제어 50Hz > 카메라 30fps) 직전 조향 명령 유지, 동작만 진행
+            if seq == last_seq:
+                if maneuvers.busy:
+                    maneuvers.tick(time.time())
+                continue
+            last_seq, frame_ts = seq, ts
+
             frame_count += 1
 
-            # 이미지 뒤집기
-            frame = cv2.flip(frame, -1)
+            # 180° 회전은 카메라 센서 transform에서 처리됨 (cv2.flip 불필요)
 
             # 전체 프레임 크기
             height, width = frame.shape[:2]
@@ -684,19 +708,46 @@ def lane_follow_loop():
                     vehicle_stopped = False
                     stop_reason = None
 
-            # shared_state에 프레임 전달 (객체 인식용) - 정지 중에도 객체 인식은 계속
-            if OBJECT_DETECTION_ENABLED and frame_count % 3 == 0:
-                try:
-                    with shared_state.lock:
-                        shared_state.latest_frame = frame.copy()
-                        # 차량 주행 중일 때만 로깅 (90프레임마다)
-                        if not vehicle_stopped and frame_count % 90 == 0:
-                            obj_module_active = getattr(shared_state, 'detector_active', False)
-                            status = "활성" if obj_module_active else "대기"
-                            print(f"  [객체탐지] F#{frame_count} 전송 ({status})")
-                except Exception as e:
-                    if not vehicle_stopped and frame_count % 90 == 0:
-                        print(f"  [객체탐지 오류] F#{frame_count}: {e}")
+            # 탐지 스케줄러용 주행 상태 발행 (바뀐 경우만)
+            status_now = shared_state.LaneStatus(SPEED_FORWARD, intersection_mode, vehicle_stopped)
+            if status_now != lane_status:
+                lane_status = status_now
+                shared_state.lane.publish(lane_status)
+
+            # 객체 인식용 main 프레임은 캡처 스레드가 링에 기록 (정지 중에도 계속)
+
+            # 차량 주행 중일 때만 로깅 (90프레임마다)
+            if OBJECT_DETECTION_ENABLED and not vehicle_stopped and frame_count % 90 == 0:
+                obj_module_active = getattr(shared_state, 'detector_active', False)
+                status = "활성" if obj_module_active else "대기"
+                ring = shared_state.frame_ring.stats()
+                sched = shared_state.scheduler.get()
+                sched_str = f" | 탐지 {sched['mode']} {sched['rate_hz']:.1f}Hz" if sched else ""
+                print(f"  [객체탐지] F#{frame_count} 전송 {ring['written']} ({status}) | "
+                      f"드롭 {ring['dropped']} 지연 {ring['lag']}{sched_str}")
+
+            # 캡처 / 지연 / 제어 주기 로깅 (90프레임마다)
+            if frame_count % 90 == 0:
+                cap = capture.stats()
+                ctl = loop.stats()
+                print(f"  [캡처] {cap['fps']:.1f}fps | 건너뜀 {cap['dropped']} | "
+                      f"대기 {cap['age_ms']:.1f}ms | {actuation_latency.summary()}")
+                man = maneuvers.stats()
+                print(f"  [제어] {ctl['hz']:.0f}Hz | 처리 {ctl['work_ms']:.1f}ms "
+                      f"(부하 {ctl['load']:.0%}) | 마감 초과 {ctl['missed']}/{ctl['ticks']} | "
+                      f"동작 {man['active'] or '-'} 완료 {man['completed']} 선점 {man['preempted']}")
+                mot = motors.stats()
+                print(f"  [모터] 핀 쓰기 {mot['writes_per_s']:.0f}/s | 명령 {mot['commands']} | "
+                      f"건너뜀 {mot['skipped']} | 출력 L{mot['output'][0]:+.2f} R{mot['output'][1]:+.2f}")
+                if profile is not None:
+                    if profile.error is None:
+                        error_str = "-"
+                    elif birdseye is not None:
+                        error_str = f"{profile.error * birdseye.half_width * 100:+.1f}cm"
+                    else:
+                        error_str = f"{profile.error:+.2f}"
+                    print(f"  [차선] 중심 오차 {error_str} | 곡률 {profile.curvature:+.2f} | "
+                          f"가로 라인 {profile.span:.0%} | 프로파일 {profile_time.mean_ms * 1000:.0f}µs")
 
             # ====== 방향 표지판을 큐에 저장 (주행 중에도 계속 인식) ======
             if OBJECT_DETECTION_ENABLED and frame_count % 5 == 0:
@@ -704,12 +755,12 @@ def lane_follow_loop():
 
                 # 객체 인식 상태 디버그 (60프레임마다, 간결하게)
                 if frame_count % 60 == 0:
-                    with shared_state.lock:
-                        active_objects = [k for k, v in shared_state.object_state.items() if v]
-                        if active_objects or recognized_signs:
-                            obj_str = f"활성: {', '.join(active_objects)}" if active_objects else "없음"
-                            queue_str = f"큐: {len(recognized_signs)}개" if recognized_signs else ""
-                            print(f"  [객체상태] {obj_str} {queue_str}".strip())
+                    snapshot = shared_state.detections.get()
+                    active_objects = [k for k, v in snapshot.object_state.items() if v]
+                    if active_objects or recognized_signs:
+                        obj_str = f"활성: {', '.join(active_objects)}" if active_objects else "없음"
+                        queue_str = f"큐: {len(recognized_signs)}개" if recognized_signs else ""
+                        print(f"  [객체상태] {obj_str} {queue_str}".strip())
 
             # ====== 교차로에서만 특별 처리 ======
             if vehicle_stopped and stop_reason == "교차로 대기":
@@ -718,6 +769,7 @@ def lane_follow_loop():
                 right_pixels = 0
                 center_pixels = 0
                 total_pixels = 0
+                profile = None
                 left_ratio = 0.0
                 right_ratio = 0.0
                 diff = 0.0
@@ -739,14 +791,12 @@ def lane_follow_loop():
                 left_box_y1 = height - BOX_HEIGHT
                 left_box_x2 = BOX_WIDTH
                 left_box_y2 = height
-                left_box = frame[left_box_y1:left_box_y2, left_box_x1:left_box_x2]
 
                 # 우하단 박스
                 right_box_x1 = width - BOX_WIDTH
                 right_box_y1 = height - BOX_HEIGHT
                 right_box_x2 = width
                 right_box_y2 = height
-                right_box = frame[right_box_y1:right_box_y2, right_box_x1:right_box_x2]
 
                 # 전방 중앙 박스 (교차로 감지용)
                 center_box_width = int(width * 0.6)  # 화면 너비의 60%
@@ -756,36 +806,23 @@ def lane_follow_loop():
                 center_box_x2 = center_box_x1 + center_box_width
                 center_box_y2 = center_box_y1 + center_box_height
 
-                # ====== HSV 변환 최적화: 전체 프레임 1회 변환 ======
-                hsv_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
-
-                # 좌측 박스 처리 (HSV 프레임에서 슬라이싱)
-                hsv_left = hsv_frame[left_box_y1:left_box_y2, left_box_x1:left_box_x2]
-                mask_left = cv2.inRange(hsv_left, lower_cyan, upper_cyan)
-
-                # 노이즈 제거
-                kernel = np.ones((3, 3), np.uint8)
-                mask_left = cv2.erode(mask_left, kernel, iterations=2)
-                mask_left = cv2.dilate(mask_left, kernel, iterations=3)
-
-                # 우측 박스 처리 (HSV 프레임에서 슬라이싱)
-                hsv_right = hsv_frame[right_box_y1:right_box_y2, right_box_x1:right_box_x2]
-                mask_right = cv2.inRange(hsv_right, lower_cyan, upper_cyan)
-                mask_right = cv2.erode(mask_right, kernel, iterations=2)
-                mask_right = cv2.dilate(mask_right, kernel, iterations=3)
-
-                # 전방 중앙 박스 처리 (HSV 프레임에서 슬라이싱)
-                hsv_center = hsv_frame[center_box_y1:center_box_y2, center_box_x1:center_box_x2]
-                mask_center = cv2.inRange(hsv_center, lower_cyan, upper_cyan)
-                mask_center = cv2.erode(mask_center, kernel, iterations=2)
-                mask_center = cv2.dilate(mask_center, kernel, iterations=3)
-
-                # 픽셀 수 계산
-                left_pixels = cv2.countNonZero(mask_left)
-                right_pixels = cv2.countNonZero(mask_right)
-                center_pixels = cv2.countNonZero(mask_center)
+                # ====== 세 박스만 한 캔버스에서 변환 / 임계값 / 노이즈 제거 ======
+                left_pixels, right_pixels, center_pixels = mask_engine.count(frame, (
+                    (left_box_x1, left_box_y1, left_box_x2, left_box_y2),
+                    (right_box_x1, right_box_y1, right_box_x2, right_box_y2),
+                    (center_box_x1, center_box_y1, center_box_x2, center_box_y2),
+                ))
                 total_pixels = left_pixels + right_pixels
 
+                # 스캔 띠 열 히스토그램 → 라인 위치 / 차선 중심 / 곡률 / 가로 라인
+                # (LANE_VIEW="birdseye"면 지면 격자에서 측정, PID 조향도 같은 격자 사용)
+                with profile_time.time():
+                    lane_view = birdseye.warp(frame) if birdseye is not None else frame
+                    view_height, view_width = lane_view.shape[:2]
+                    profile_engine.count(lane_view, lane_profile.boxes(view_width, view_height))
+                    profile = lane_profile.measure(
+                        [profile_engine.region(i) for i in range(len(lane_profile.rows))], view_width)
+
                 # CENTER_THRESHOLD는 이미 고정값으로 설정됨 (5000)
 
                 # 좌우 비율 계산
@@ -822,16 +859,27 @@ def lane_follow_loop():
                     # 타이머만 리셋 (0.5초 전에 정상 복귀)
                     high_pixel_start_time = None
 
-            # ====== 후진 모드 실행 ======
+            # ====== 후진 모드 실행 (안전 처리: 진행 중인 동작 선점) ======
             if reverse_mode:
+                aborted = maneuvers.preempt("REVERSE", time.time())
+                if aborted is not None:
+                    print(f"  [동작] {aborted.name} 중단 - 후진 모드")
                 motor_backward()
                 action = "BACKWARD"
                 pass
                 # 후진 모드일 때는 다른 조향 결정 건너뛰기
                 action_stats[action] += 1
-                time.sleep(0.02)
                 continue
 
+            # ====== 회전 / 정지 표지판 동작 진행 중 (인식은 계속, 조향 결정은 건너뜀) ======
+            if maneuvers.busy:
+                # 안전 이벤트(STOP 표지판)는 진행 중인 회전을 선점
+                handle_runtime_triggers(frame_count)
+                if maneuvers.tick(time.time()):
+                    action = maneuvers.active.name
+                    action_stats[action] += 1
+                    continue
+
             # 조향 결정
             action = "STOP"
 
@@ -840,6 +888,7 @@ def lane_follow_loop():
             if intersection_mode:
                 # 먼저 저장된 표지판 확인하여 자동 키 입력으로 변환
                 user_input = None
+                sign_used = None  # 큐에서 꺼낸 표지판 (회전이 거절되면 되돌림)
                 if OBJECT_DETECTION_ENABLED and recognized_signs:
                     sign_info = recognized_signs[0]  # 가장 먼저 저장된 표지판 확인
                     sign_type = sign_info['type']
@@ -854,7 +903,7 @@ def lane_follow_loop():
 
                     if sign_type in sign_to_key:
                         user_input = sign_to_key[sign_type]
-                        recognized_signs.popleft()  # 큐에서 제거
+                        sign_used = recognized_signs.popleft()  # 큐에서 제거
                         print(f"\n📋 [저장된 표지판] {sign_type} → '{user_input}' 키 자동 입력")
 
                 # 타임아웃 체크 (5초 경과 시 자동 직진)
@@ -885,32 +934,20 @@ def lane_follow_loop():
                         intersection_exit_time = time.time()
                         intersection_wait_start = None
                         vehicle_stopped = False
-                    elif user_input == 'a':
-                        pass
-                        motor_forward()
-                        time.sleep(0.5)  # 직진으로 접근
-                        motor_left(1.0)  # 좌회전
-                        time.sleep(1.2)  # 회전 시간 (충분히 회전)
-                        motor_forward()
-                        time.sleep(0.5)  # 라인 복귀 직진
-                        action = "LEFT"
-                        intersection_mode = False
-                        intersection_exit_time = time.time()
-                        intersection_wait_start = None
-                        vehicle_stopped = False
-                    elif user_input == 'd':
-                        pass
-                        motor_forward()
-                        time.sleep(0.5)  # 직진으로 접근
-                        motor_right(1.0)  # 우회전
-                        time.sleep(1.2)  # 회전 시간 (충분히 회전)
-                        motor_forward()
-                        time.sleep(0.5)  # 라인 복귀 직진
-                        action = "RIGHT"
-                        intersection_mode = False
-                        intersection_exit_time = time.time()
-                        intersection_wait_start = None
-                        vehicle_stopped = False
+                    elif user_input in ('a', 'd'):
+                        direction = "LEFT" if user_input == 'a' else "RIGHT"
+                        turn = turn_maneuver(direction)
+                        if start_maneuver(turn):  # 직진 접근 → 회전 → 복귀 (비블로킹)
+                            action = direction
+                            intersection_mode = False
+                            intersection_exit_time = time.time() + turn.duration  # 회전 후부터 탈출 시간
+                            intersection_wait_start = None
+                            vehicle_stopped = False
+                        else:
+                            # 우선순위가 더 높은 동작(STOP 표지판 등) 진행 중 → 교차로 대기 유지
+                            action = "INTERSECTION"
+                            if sign_used is not None:
+                                recognized_signs.appendleft(sign_used)
                     elif user_input == 's':
                         motor_stop()
                         action = "STOP"
@@ -932,13 +969,16 @@ def lane_follow_loop():
                     intersection_exit_time = None
 
             # ====== 교차로 감지 (전방에 수평선이 있고 좌우 픽셀이 적을 때) ======
-            elif not intersection_exit_time and center_pixels > CENTER_THRESHOLD and total_pixels < PIXEL_THRESHOLD * 2:
+            elif not intersection_exit_time and (
+                    profile is not None and profile.intersection if INTERSECTION_DETECTION == "profile"
+                    else center_pixels > CENTER_THRESHOLD and total_pixels < PIXEL_THRESHOLD * 2):
                 if not intersection_mode:
                     motor_stop()
                     action = "INTERSECTION"
                     intersection_mode = True
                     intersection_wait_start = time.time()  # 타이머 시작
-                    print(f"\n🛑 교차로 감지! 전방:{center_pixels} 좌우:{total_pixels}")
+                    span_str = f" 가로 라인:{profile.span:.0%}" if profile is not None else ""
+                    print(f"\n🛑 교차로 감지! 전방:{center_pixels} 좌우:{total_pixels}{span_str}")
 
                     # 저장된 표지판 확인
                     if OBJECT_DETECTION_ENABLED:
@@ -976,24 +1016,11 @@ def lane_follow_loop():
                         motor_forward()
                         action = "FORWARD"
                         pass
-                    elif user_input == 'a':
-                        pass
-                        motor_forward()
-                        time.sleep(0.5)  # 직진으로 접근
-                        motor_left(1.0)  # 좌회전
-                        time.sleep(1.2)  # 회전 시간 (충분히 회전)
-                        motor_forward()
-                        time.sleep(0.5)  # 라인 복귀 직진
-                        action = "LEFT"
-                    elif user_input == 'd':
-                        pass
-                        motor_forward()
-                        time.sleep(0.5)  # 직진으로 접근
-                        motor_right(1.0)  # 우회전
-                        time.sleep(1.2)  # 회전 시간 (충분히 회전)
-                        motor_forward()
-                        time.sleep(0.5)  # 라인 복귀 직진
-                        action = "RIGHT"
+                    elif user_input in ('a', 'd'):
+                        direction = "LEFT" if user_input == 'a' else "RIGHT"
+                        if start_maneuver(turn_maneuver(direction)):  # 직진 접근 → 회전 → 복귀 (비블로킹)
+                            action = direction
+                        # 거절되면 현재 동작 유지
                     elif user_input == 's':
                         motor_stop()
                         action = "STOP"
@@ -1009,74 +1036,28 @@ def lane_follow_loop():
 
                 vehicle_stopped = False  # 라인 찾으면 정지 상태 해제
 
-                # 동적 임계값 계산 (속도 기반)
-                is_high_speed = SPEED_FORWARD > 0.6
-                current_balance_threshold = HIGH_SPEED_BALANCE_THRESHOLD if is_high_speed else BASE_BALANCE_THRESHOLD
-
-                if diff < current_balance_threshold:
-                    # 좌우 균형 잡힘 → 전진
-                    motor_forward()
-                    action = "FORWARD"
-                    one_side_missing_time = None
-                    one_side_missing_direction = None
-
-                elif left_pixels > right_pixels:
-                    # 왼쪽에 청록색이 많음 → 우회전 필요
-                    last_seen_side = 'LEFT'  # 라인이 왼쪽에 있음
-
-                    # 편차에 비례한 회전 강도 계산 (최대 편차 50%로 정규화)
-                    turn_intensity = min(1.0, diff / 0.5)
-
-                    if right_pixels < 50:
-                        # 오른쪽 라인이 거의 없음
-                        if one_side_missing_time is None or one_side_missing_direction != 'RIGHT':
-                            one_side_missing_time = time.time()
-                            one_side_missing_direction = 'RIGHT'
-
-                        elapsed = time.time() - one_side_missing_time
-                        if elapsed < STRAIGHT_DURATION:
-                            # 직진 유지 (0.5초)
-                            motor_forward()
-                            action = "FORWARD"
-                        else:
-                            # 강한 우회전 (intensity * 1.5)
-                            motor_right(min(1.0, turn_intensity * 1.5))
-                            action = "RIGHT"
+                if STEERING_MODE == "pid":
+                    # 띠별 라인 중심 → PID → 좌/우 바퀴 연속 출력
+                    # (PID 시간축은 프레임 캡처 시각)
+                    steer_engine.count(lane_view, centroid.boxes(view_width, view_height))
+                    masks = [steer_engine.region(i) for i in range(len(centroid.bands))]
+                    wheel_left, wheel_right, found = centroid.update(masks, view_width, SPEED_FORWARD, ts)
+                    if found:
+                        motor_drive(wheel_left, wheel_right)
+                        turn_intensity = abs(centroid.steer)
+                        action = "FORWARD" if turn_intensity < 0.1 else ("RIGHT" if centroid.steer > 0 else "LEFT")
                     else:
-                        # 일반 우회전 (비례 제어)
-                        motor_right(turn_intensity)
-                        action = "RIGHT"
-                        one_side_missing_time = None
-                        one_side_missing_direction = None
-
+                        motor_stop()
+                        action = "STOP"
                 else:
-                    # 오른쪽에 청록색이 많음 → 좌회전 필요
-                    last_seen_side = 'RIGHT'  # 라인이 오른쪽에 있음
-
-                    # 편차에 비례한 회전 강도 계산 (최대 편차 50%로 정규화)
-                    turn_intensity = min(1.0, diff / 0.5)
-
-                    if left_pixels < 50:
-                        # 왼쪽 라인이 거의 없음
-                        if one_side_missing_time is None or one_side_missing_direction != 'LEFT':
-                            one_side_missing_time = time.time()
-                            one_side_missing_direction = 'LEFT'
-
-                        elapsed = time.time() - one_side_missing_time
-                        if elapsed < STRAIGHT_DURATION:
-                            # 직진 유지 (0.5초)
-                            motor_forward()
-                            action = "FORWARD"
-                        else:
-                            # 강한 좌회전 (intensity * 1.5)
-                            motor_left(min(1.0, turn_intensity * 1.5))
-                            action = "LEFT"
-                    else:
-                        # 일반 좌회전 (비례 제어)
+                    # 좌우 픽셀 비율 균형 (왼쪽에 라인이 많으면 우회전, 한쪽이 없으면 잠시 직진)
+                    action, turn_intensity = balance.update(left_pixels, right_pixels, SPEED_FORWARD, time.time())
+                    if action == "LEFT":
                         motor_left(turn_intensity)
-                        action = "LEFT"
-                        one_side_missing_time = None
-                        one_side_missing_direction = None
+                    elif action == "RIGHT":
+                        motor_right(turn_intensity)
+                    else:
+                        motor_forward()
 
                 # 주행 중 객체 인식 트리거 처리
                 handle_runtime_triggers(frame_count)
@@ -1108,8 +1089,6 @@ def lane_follow_loop():
                 # 간결한 로그 출력
                 pass
 
-            time.sleep(0.02)  # 더 빠른 반응
-
     except KeyboardInterrupt:
         pass
 
@@ -1162,8 +1141,7 @@ def lane_follow_loop():
             pass
             print("객체 인식 통계:")
             try:
-                with shared_state.lock:
-                    obj_counts = getattr(shared_state, 'detection_counts', {})
+                obj_counts = shared_state.detections.get().detection_counts
 
                 if obj_counts:
                     for obj_type, count in obj_counts.items():
@@ -1178,9 +1156,14 @@ def lane_follow_loop():
 
         # 모터 완전 정지
         motor_stop()
-        PWMA.value = 0.0
-        PWMB.value = 0.0
-        camera.release()
+        capture.release()
+
+        # 캡처 → 모터 명령 지연 분포 / 제어 주기 마감 초과
+        print(actuation_latency.summary())
+        print(f"제어 주기 마감 초과: {loop.missed}/{loop.ticks} ({loop.hz:.0f}Hz)")
+        mot = motors.stats()
+        print(f"모터 핀 쓰기: {mot['writes']}회 ({mot['writes_per_s']:.0f}/s), 같은 값 건너뜀 {mot['skipped']}회")
+        actuation_latency.print_histogram()
         pass
 
 if __name__ == '__main__':
@@ -5,15 +5,34 @@ main.py
 
 * lane_tracer.py  : 차선 주행 스레드
 * object_detector.py : 객체 탐지 스레드 (YOLOv8)
+* detector_process.py : DETECTOR_MODE="process"면 객체 탐지를 워커 프로세스에서 (공유 메모리 프레임)
 * shared_state.py : 전역 상태 공유
+* startup.py : 시작 단계 타임라인 (카메라 안정화와 모델 로드를 동시에, 둘 다 끝나면 주행)
 """
 
+from startup import timeline  # 가장 먼저 import (타임라인 기준 시각)
 import threading
 import time
 import shared_state
+import lane_tracer
 from lane_tracer import lane_follow_loop
-from object_detector import object_detect_loop
-from gpiozero import PWMOutputDevice
+
+# 객체 탐지 실행 방식
+# "thread" : 같은 프로세스의 스레드 (기존)
+# "process": 워커 프로세스 - 차선 루프와 GIL을 나누지 않음, 비정상 종료 시 자동 재시작
+#            (python benchmark.py detector 로 두 방식의 제어 루프 지터 비교)
+DETECTOR_MODE = "thread"
+
+
+def detector_main():
+    """감지 스레드 진입점 - 감지 모듈 import도 차선 스레드 시작 후 이 스레드에서"""
+    try:
+        with timeline.phase("감지 모듈 import"):
+            from object_detector import object_detect_loop
+    except Exception:
+        timeline.ready("detector", ok=False)  # 차선 스레드가 기다리지 않도록
+        raise
+    object_detect_loop()
 
 # ============================================================
 # 메인 실행 함수
@@ -24,25 +43,32 @@ def main():
     print(" Autonomous Car System: Line + Object Integration")
     print("=" * 70)
 
-    # --- 두 스레드 실행 ---
-    lane_thread = threading.Thread(target=lane_follow_loop, daemon=True)
-    detect_thread = threading.Thread(target=object_detect_loop, daemon=True)
+    # --- 두 스레드 실행 (차선 스레드는 감지기 준비까지 정지 상태로 대기) ---
+    timeline.expect("detector")
+    detector = None
+    if DETECTOR_MODE == "process":
+        from detector_process import DetectorProcess
+        # 공유 메모리 프레임 링으로 교체되므로 차선 스레드(캡처 스레드)보다 먼저 시작
+        detector = DetectorProcess(lane_tracer.LANE_PROFILE.main_size).start()
+    lane_thread = threading.Thread(target=lane_follow_loop, name="lane", daemon=True)
     lane_thread.start()
-    detect_thread.start()
+    if detector is None:
+        detect_thread = threading.Thread(target=detector_main, name="detector", daemon=True)
+        detect_thread.start()
 
     print("[✓] Threads started (Lane Follower + Object Detector)")
     print("[INFO] Press Ctrl+C to terminate\n")
 
-    last_trigger_displayed = None
+    last_trigger_seq = 0  # 마지막으로 출력한 트리거 seq
 
     try:
         while True:
             # 공유 상태 확인
-            with shared_state.lock:
-                obj_name = shared_state.object_detected
-                obj_dist = shared_state.object_distance
-                trig = shared_state.last_trigger
-                obj_state = shared_state.object_state.copy()
+            snapshot = shared_state.detections.get()
+            obj_name = snapshot.object_detected
+            obj_dist = snapshot.object_distance
+            trig_seq, trig = shared_state.triggers.read()
+            obj_state = snapshot.object_state
 
             # --- 모니터링 출력 ---
             if obj_name:
@@ -53,10 +79,16 @@ def main():
             if active_objects:
                 print(f"[ACTIVE] {', '.join(active_objects)}")
 
-            # 새로운 트리거 발생 시 출력
-            if trig and trig != last_trigger_displayed:
+            # 탐지 스케줄러 상태
+            sched = shared_state.scheduler.get()
+            if sched:
+                print(f"[SCHED] {sched['mode']:12s} | {sched['rate_hz']:.1f}Hz | "
+                      f"infer={sched['inference_ms']:.0f}ms")
+
+            # 새로운 트리거 발생 시 출력 (같은 이름이 다시 발행돼도 seq로 구분)
+            if trig and trig_seq != last_trigger_seq:
                 print(f"\n Action Triggered: {trig}\n")
-                last_trigger_displayed = trig
+            last_trigger_seq = trig_seq
 
             time.sleep(1.0)
 
@@ -66,14 +98,15 @@ def main():
     finally:
         # 안전 정지
         try:
-            PWMA = PWMOutputDevice(18)
-            PWMB = PWMOutputDevice(23)
-            PWMA.value = 0.0
-            PWMB.value = 0.0
+            lane_tracer.motors.stop()  # 차선 스레드가 쓰던 같은 핀 (새로 열지 않음)
             print("[✓] Motors stopped safely.")
         except Exception:
             pass
 
+        if detector is not None:
+            detector.stop()
+            print(f"[✓] Detector process stopped (재시작 {detector.restarts}회).")
+
         print("[✓] All threads stopped. Cleanup complete.")
 
 
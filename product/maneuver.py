@@ -0,0 +1,99 @@
+"""
+maneuver.py
+-----------
+비블로킹 동작 엔진 (교차로 회전 / 표지판 동작)
+
+* 각 동작은 (모터 명령, 유지 시간) 단계 시퀀스이고 제어 루프가 매 틱 tick()으로 진행
+  (동작 중에도 카메라 프레임 / 감지 결과 처리는 계속됨)
+* 우선순위: 안전(SAFETY) > 회전(TURN) > 일반(NORMAL)
+* 진행 중인 동작보다 우선순위가 높은 요청은 즉시 선점 (기존 동작의 on_abort 호출),
+  같거나 낮은 요청은 거절
+"""
+
+from collections import deque
+
+from control_loop import TimedSequence
+
+PRIORITY_NORMAL = 0
+PRIORITY_TURN = 1
+PRIORITY_SAFETY = 2
+
+
+class Maneuver(TimedSequence):
+    """우선순위 / 완료 콜백이 붙은 시간 단계 시퀀스"""
+
+    def __init__(self, name, steps, priority=PRIORITY_NORMAL, on_done=None, on_abort=None):
+        super().__init__(name, steps)
+        self.priority = priority
+        self.on_done = on_done
+        self.on_abort = on_abort
+        self.started_at = None
+
+
+class ManeuverEngine:
+    """동작 1개만 실행, 안전 이벤트가 오면 진행 중인 동작을 선점"""
+
+    def __init__(self, history=20):
+        self.active = None
+        self.history = deque(maxlen=history)  # (이름, 결과, 소요 시간)
+
+        # 통계
+        self.started = 0
+        self.completed = 0
+        self.preempted = 0
+        self.rejected = 0
+
+    @property
+    def busy(self):
+        return self.active is not None
+
+    def start(self, maneuver, now):
+        """동작 시작 (진행 중인 동작보다 우선순위가 높아야 함), 시작했으면 True"""
+        if self.active is not None:
+            if maneuver.priority <= self.active.priority:
+                self.rejected += 1
+                return False
+            self._finish(now, "preempted:" + maneuver.name)
+        self.active = maneuver
+        maneuver.started_at = now
+        self.started += 1
+        if not maneuver.start(now):
+            self._finish(now, "done")
+        return True
+
+    def preempt(self, reason, now):
+        """진행 중인 동작 중단 (후진 등 동작 밖 안전 처리), 중단한 동작 반환"""
+        aborted = self.active
+        if aborted is not None:
+            self._finish(now, "preempted:" + reason)
+        return aborted
+
+    def tick(self, now):
+        """진행 중인 동작을 한 틱 진행, 아직 진행 중이면 True"""
+        if self.active is None:
+            return False
+        if self.active.tick(now):
+            return True
+        self._finish(now, "done")
+        return False
+
+    def _finish(self, now, result):
+        maneuver, self.active = self.active, None
+        self.history.append((maneuver.name, result, now - maneuver.started_at))
+        if result == "done":
+            self.completed += 1
+            callback = maneuver.on_done
+        else:
+            self.preempted += 1
+            callback = maneuver.on_abort
+        if callback is not None:
+            callback()
+
+    def stats(self):
+        return {
+            "active": self.active.name if self.active else None,
+            "started": self.started,
+            "completed": self.completed,
+            "preempted": self.preempted,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,428 @@
+"""
+motor_driver.py
+---------------
+모터 드라이버 계층 (TB6612: 바퀴마다 방향 핀 2개 + PWM 핀 1개)
+
+* MotorController: 차동 구동 API (forward / left / right / stop / wheels / set(v, omega))
+                   product/lane_tracer.py와 루트 트레이서 / keyboard_control.py가 공용으로 사용
+* MotorDriver    : 핀 쓰기 계층 (바뀐 핀만 쓰기 + PWM 변화량 제한)
+
+기존 motor_* 함수는 명령이 같아도 20ms 틱마다 6개 핀(AIN1/AIN2/PWMA/BIN1/BIN2/PWMB)을
+모두 다시 썼다. MotorDriver는 마지막으로 쓴 핀 값을 기억해 바뀐 핀만 쓰고,
+PWM 변화량은 초당 PWM_SLEW_RATE로 제한한다 (목표까지는 매 틱 update()가 이어서 진행).
+정지(stop)는 안전 동작이라 제한 없이 즉시 반영한다.
+
+핀 백엔드 (open_backend 이름)
+* "gpiozero": PWMOutputDevice / DigitalOutputDevice (기존)
+* "lgpio"   : lgpio 직접 호출 (gpiozero 계층 없이 gpio_write / tx_pwm)
+* "mock"    : 하드웨어 없이 쓰기 횟수 / 기록만 남김 (벤치마크 / 개발 PC / CI)
+백엔드 모듈은 생성할 때 import하고, MotorController는 첫 명령 때 백엔드를 연다.
+그래서 라즈베리파이가 아닌 곳에서도 이 모듈 / 이 모듈을 쓰는 스크립트는 바로 import된다.
+(루트 스크립트에서도 import되도록 product 내부 모듈은 import하지 않는다)
+
+    motors = MotorController("gpiozero")     # "mock", record=True ...
+    motors.set(0.3, 0.5)                     # 0.3m/s 전진하면서 0.5rad/s 좌회전
+"""
+
+import time
+
+# ======================================
+# 핀 배치 (BCM)
+# ======================================
+LEFT_PINS = (22, 27, 18)    # (IN1, IN2, PWM) = AIN1, AIN2, PWMA
+RIGHT_PINS = (25, 24, 23)   # BIN1, BIN2, PWMB
+BUZZER_PIN = 12
+
+PWM_SLEW_RATE = 10.0   # PWM 최대 변화량 (초당, 10 → 0에서 1.0까지 0.1초), None이면 제한 없음
+PWM_QUANTUM = 0.005    # 이보다 작은 PWM 변화는 쓰지 않음 (연속 조향 출력의 미세 떨림)
+LGPIO_PWM_FREQUENCY = 100  # Hz (gpiozero PWMOutputDevice 기본값과 동일)
+
+# ======================================
+# 차동 구동 기구학 (set(v, omega))
+# ======================================
+WHEEL_BASE = 0.15        # 좌우 바퀴 간격 (m)
+MAX_WHEEL_SPEED = 0.5    # 바퀴 출력 1.0일 때 속도 (m/s)
+TURN_INNER_RATIO = 0.25  # left() / right()의 안쪽 바퀴 비율 (루트 트레이서 motor_left / motor_right)
+
+
+# ============================================================
+# 핀 백엔드
+# ============================================================
+class GpiozeroBackend:
+    name = "gpiozero"
+
+    def __init__(self):
+        from gpiozero import DigitalOutputDevice, PWMOutputDevice
+        self._digital = DigitalOutputDevice
+        self._pwm = PWMOutputDevice
+
+    def digital(self, pin):
+        return self._digital(pin)
+
+    def pwm(self, pin):
+        return self._pwm(pin)
+
+    def close(self):
+        pass
+
+
+class _LgpioPin:
+    """gpiozero 장치와 같은 .value / close() 인터페이스"""
+
+    def __init__(self, lgpio, handle, pin, pwm):
+        self._lgpio = lgpio
+        self._handle = handle
+        self.pin = pin
+        self._pwm = pwm
+        self._value = 0
+        lgpio.gpio_claim_output(handle, pin, 0)
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        if self._pwm:
+            self._lgpio.tx_pwm(self._handle, self.pin, LGPIO_PWM_FREQUENCY, value * 100.0)
+        else:
+            self._lgpio.gpio_write(self._handle, self.pin, 1 if value else 0)
+
+    def close(self):
+        self._lgpio.gpio_free(self._handle, self.pin)
+
+
+class LgpioBackend:
+    name = "lgpio"
+
+    def __init__(self, chip=0):
+        import lgpio
+        self._lgpio = lgpio
+        self._handle = lgpio.gpiochip_open(chip)
+
+    def digital(self, pin):
+        return _LgpioPin(self._lgpio, self._handle, pin, pwm=False)
+
+    def pwm(self, pin):
+        return _LgpioPin(self._lgpio, self._handle, pin, pwm=True)
+
+    def close(self):
+        self._lgpio.gpiochip_close(self._handle)
+
+
+class MockPin:
+    def __init__(self, backend, pin):
+        self._backend = backend
+        self.pin = pin
+        self._value = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._backend.writes += 1
+        if self._backend.log is not None:
+            self._backend.log.append((time.perf_counter(), self.pin, value))
+
+    def close(self):
+        pass
+
+
+class MockBackend:
+    """핀 쓰기 횟수 (record=True면 (시각, 핀, 값) 기록까지) 만 남기는 가짜 백엔드"""
+
+    name = "mock"
+
+    def __init__(self, record=False):
+        self.writes = 0
+        self.log = [] if record else None
+
+    def digital(self, pin):
+        return MockPin(self, pin)
+
+    def pwm(self, pin):
+        return MockPin(self, pin)
+
+    def close(self):
+        pass
+
+
+BACKENDS = {
+    "gpiozero": GpiozeroBackend,
+    "lgpio": LgpioBackend,
+    "mock": MockBackend,
+}
+
+
+def open_backend(name="gpiozero", **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 모터 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
+
+
+# ============================================================
+# 모터 드라이버
+# ============================================================
+class MotorDriver:
+    """좌/우 바퀴 출력(-1.0~1.0, 음수는 후진) → 바뀐 핀만 쓰기 + PWM 변화량 제한"""
+
+    def __init__(self, backend, left_pins=LEFT_PINS, right_pins=RIGHT_PINS,
+                 slew_rate=PWM_SLEW_RATE, quantum=PWM_QUANTUM):
+        self.backend = backend
+        self.slew_rate = slew_rate
+        self.quantum = quantum
+        self._pins = []
+        for in1, in2, pwm in (left_pins, right_pins):
+            self._pins.append((backend.digital(in1), backend.digital(in2), backend.pwm(pwm)))
+        self._written = [[None, None, None], [None, None, None]]  # 바퀴별 마지막으로 쓴 (IN1, IN2, PWM)
+        self.target = [0.0, 0.0]   # 명령 (부호 포함)
+        self.output = [0.0, 0.0]   # 현재 출력 (slew 적용 후)
+        self.braked = True         # stop() 이후 drive() 전까지 (update()가 방향 핀을 되돌리지 않음)
+        self._last_update = None
+
+        # 통계
+        self.commands = 0
+        self.writes = 0
+        self.skipped = 0           # 값이 같아 건너뛴 핀 쓰기
+        self._started = time.perf_counter()
+
+    def _write(self, wheel, index, value):
+        if self._written[wheel][index] == value:
+            self.skipped += 1
+            return
+        self._pins[wheel][index].value = value
+        self._written[wheel][index] = value
+        self.writes += 1
+
+    def _apply(self, wheel, value, brake=False):
+        """방향 핀 + PWM (PWM은 quantum 단위로 반올림해 미세 변화는 건너뜀)"""
+        if brake:
+            in1, in2 = 0, 0
+        elif value < 0:
+            in1, in2 = 1, 0
+        else:
+            in1, in2 = 0, 1
+        duty = min(1.0, abs(value))
+        if self.quantum:
+            duty = round(round(duty / self.quantum) * self.quantum, 6)
+        # 방향을 바꿀 때는 PWM을 먼저 낮춘 뒤 방향 핀을 바꿈
+        if self._written[wheel][2] is not None and duty < self._written[wheel][2]:
+            self._write(wheel, 2, duty)
+        self._write(wheel, 0, in1)
+        self._write(wheel, 1, in2)
+        self._write(wheel, 2, duty)
+
+    def drive(self, left, right, now=None):
+        """좌/우 바퀴 목표 출력 설정 후 즉시 한 단계 반영"""
+        self.commands += 1
+        self.braked = False
+        self.target[0] = max(-1.0, min(1.0, left))
+        self.target[1] = max(-1.0, min(1.0, right))
+        self.update(now)
+
+    def update(self, now=None):
+        """목표까지 slew 제한으로 진행 (명령이 없는 틱에도 매 틱 호출)"""
+        now = time.perf_counter() if now is None else now
+        dt = now - self._last_update if self._last_update is not None else 0.0
+        self._last_update = now
+        if self.braked:
+            return
+        for wheel in (0, 1):
+            target, current = self.target[wheel], self.output[wheel]
+            if self.slew_rate is not None and target != current:
+                step = self.slew_rate * dt
+                target = min(current + step, max(current - step, target))
+            self.output[wheel] = target
+            self._apply(wheel, target)
+
+    def stop(self):
+        """즉시 정지 (slew 제한 없음, 방향 핀 모두 0)"""
+        self.commands += 1
+        self.braked = True
+        self.target[:] = [0.0, 0.0]
+        self.output[:] = [0.0, 0.0]
+        for wheel in (0, 1):
+            self._apply(wheel, 0.0, brake=True)
+
+    def close(self):
+        self.stop()
+        for pins in self._pins:
+            for pin in pins:
+                try:
+                    pin.close()
+                except Exception:
+                    pass
+        self.backend.close()
+
+    def stats(self):
+        elapsed = max(1e-9, time.perf_counter() - self._started)
+        return {
+            "commands": self.commands,
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "writes_per_s": self.writes / elapsed,
+            "output": tuple(self.output),
+        }
+
+
+# ============================================================
+# 차동 구동 컨트롤러
+# ============================================================
+class MotorController:
+    """차동 구동 명령 API (archive/old_versions/line_tracer_optimized.py의 MotorController 확장)
+
+    바퀴 출력은 모두 (left, right) -1.0~1.0 (음수는 후진). current_command에 마지막 명령 이름이 남는다.
+    slew_rate=None(기본)이면 명령이 바로 반영되고, 값을 주면 매 틱 update()를 호출해야 목표까지 진행한다.
+    record=True면 (시각, 명령, left, right)를 log에 남긴다 (mock 백엔드는 핀 쓰기까지 기록).
+    """
+
+    def __init__(self, backend="gpiozero", speed_forward=0.75, speed_turn=0.55, slew_rate=None,
+                 buzzer_pin=None, record=False, **backend_options):
+        self._backend = backend
+        self._backend_options = dict(backend_options)
+        if record and backend == "mock":
+            self._backend_options["record"] = True
+        self.slew_rate = slew_rate
+        self.buzzer_pin = buzzer_pin
+        self.speed_forward = speed_forward
+        self.speed_turn = speed_turn
+        self.current_command = "STOP"
+        self.log = [] if record else None
+        self._driver = None
+        self._buzzer = None
+
+        # 통계
+        self.commands = 0
+        self._started = time.perf_counter()
+
+    # ------------------------------------------------------------
+    # 백엔드 (첫 명령 때 열기)
+    # ------------------------------------------------------------
+    @property
+    def driver(self):
+        if self._driver is None:
+            self.open()
+        return self._driver
+
+    def open(self):
+        """백엔드 / 핀 초기화 (이미 열려 있으면 그대로)"""
+        if self._driver is not None:
+            return self
+        backend = self._backend
+        if isinstance(backend, str):
+            backend = open_backend(backend, **self._backend_options)
+        self._driver = MotorDriver(backend, slew_rate=self.slew_rate)
+        if self.buzzer_pin is not None:
+            try:
+                self._buzzer = backend.digital(self.buzzer_pin)
+            except Exception:
+                self._buzzer = None
+        return self
+
+    @property
+    def backend(self):
+        return self.driver.backend
+
+    # ------------------------------------------------------------
+    # 명령
+    # ------------------------------------------------------------
+    def wheels(self, left, right, command="DRIVE"):
+        """좌/우 바퀴 출력 직접 지정"""
+        self.commands += 1
+        self.current_command = command
+        if self.log is not None:
+            self.log.append((time.perf_counter(), command, left, right))
+        self.driver.drive(left, right)
+
+    def set(self, v, omega):
+        """선속도 v(m/s) / 각속도 omega(rad/s, 좌회전 +) → 바퀴 출력 (left, right)
+
+        바퀴 한계를 넘으면 회전(좌우 차이)을 우선 유지하고 선속도를 줄인다.
+        """
+        turn = omega * WHEEL_BASE / 2.0 / MAX_WHEEL_SPEED
+        forward = v / MAX_WHEEL_SPEED
+        turn = max(-1.0, min(1.0, turn))
+        limit = 1.0 - abs(turn)
+        forward = max(-limit, min(limit, forward))
+        left, right = forward - turn, forward + turn
+        self.wheels(left, right, "SET")
+        return left, right
+
+    def forward(self, speed=None):
+        speed = self.speed_forward if speed is None else speed
+        self.wheels(speed, speed, "FORWARD")
+
+    def backward(self, speed=None):
+        speed = self.speed_forward if speed is None else speed
+        self.wheels(-speed, -speed, "BACKWARD")
+
+    def left(self, intensity=1.0, speed=None, inner=TURN_INNER_RATIO):
+        """좌회전 - 오른쪽(바깥) 바퀴 speed * intensity, 왼쪽(안쪽)은 그 inner 배"""
+        speed = (self.speed_turn if speed is None else speed) * intensity
+        self.wheels(speed * inner, speed, "LEFT")
+
+    def right(self, intensity=1.0, speed=None, inner=TURN_INNER_RATIO):
+        speed = (self.speed_turn if speed is None else speed) * intensity
+        self.wheels(speed, speed * inner, "RIGHT")
+
+    def stop(self):
+        """즉시 정지 (방향 핀 모두 0 + PWM 0)"""
+        self.commands += 1
+        self.current_command = "STOP"
+        if self.log is not None:
+            self.log.append((time.perf_counter(), "STOP", 0.0, 0.0))
+        if self._driver is not None:
+            self._driver.stop()
+
+    def update(self, now=None):
+        """slew 제한 진행 (slew_rate를 준 경우 매 틱 호출)"""
+        if self._driver is not None:
+            self._driver.update(now)
+
+    @property
+    def has_buzzer(self):
+        """부저 핀 사용 가능 여부 (백엔드를 연다)"""
+        if self.buzzer_pin is None:
+            return False
+        self.open()
+        return self._buzzer is not None
+
+    def set_buzzer(self, on):
+        """부저 켜기 / 끄기 (buzzer_pin이 없거나 초기화에 실패했으면 무시)"""
+        if self.buzzer_pin is None:
+            return
+        self.open()
+        if self._buzzer is not None:
+            self._buzzer.value = 1 if on else 0
+
+    def cleanup(self):
+        """정지 후 핀 / 백엔드 해제"""
+        if self._driver is None:
+            return
+        if self._buzzer is not None:
+            try:
+                self._buzzer.value = 0
+                self._buzzer.close()
+            except Exception:
+                pass
+            self._buzzer = None
+        self._driver.close()
+        self._driver = None
+
+    def stats(self):
+        elapsed = max(1e-9, time.perf_counter() - self._started)
+        driver = self._driver.stats() if self._driver is not None else \
+            {"writes": 0, "skipped": 0, "writes_per_s": 0.0, "output": (0.0, 0.0)}
+        return {
+            "command": self.current_command,
+            "commands": self.commands,
+            "commands_per_s": self.commands / elapsed,
+            "writes": driver["writes"],
+            "skipped": driver["skipped"],
+            "writes_per_s": driver["writes_per_s"],
+            "output": driver["output"],
+        }
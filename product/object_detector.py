@@ -7,11 +7,15 @@ YOLOv8 탐지 + 분류 + 거리 기반 근접 이벤트
 import time
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import shared_state
 import os
-from datetime import datetime
-from PIL import Image
+from capture_writer import CaptureWriter
+from perf_stats import LatencyStats
+from inference_backend import import_runtime, load_model
+from detect_scheduler import DetectionScheduler
+from frame_gate import FrameGate
+from object_tracker import ObjectTracker
+from startup import timeline
 
 # ======================================
 # 모델 및 파라미터 설정
@@ -29,9 +33,244 @@ CONF_THRESHOLD = 0.8   # 탐지 모델 신뢰도 임계값 (80%로 상향)
 CLASSIFIER_CONF_THRESHOLD = 0.8  # 분류 모델 신뢰도 임계값 (80%)
 COOLDOWN = 3.0         # 근접 이벤트 쿨다운
 
+# 장면 변화 게이트 (변화 없는 프레임은 이전 탐지 결과 재사용)
+FRAME_GATE_ENABLED = True
+
+# 탐지 스케줄러 기준 속도 (lane_tracer.SPEED_FORWARD_DEFAULT와 같은 값)
+REFERENCE_SPEED = 0.75
+
+# 2단계 분류 설정
+CLASSIFIER_IMGSZ = 224        # 분류 모델 입력 크기 (letterbox 후 정사각형)
+CLASSIFIER_BATCH_MODE = True  # True: 한 프레임의 모든 박스를 한 번에 분류 / False: 박스별 호출
+
+# 시작 시 워밍업 (detector_active 전에 실제 입력 크기로 추론해 첫 프레임의 초기화 / 할당 비용 제거)
+WARMUP_ROI_SIZE = (320, 480)     # (w, h) 감지 ROI = main 640x480의 오른쪽 절반
+WARMUP_BATCH_SIZES = (1, 2, 4)   # 분류 배치 크기 (프레임당 박스 수, 크기마다 버퍼가 따로 할당됨)
+WARMUP_RUNS = 2                  # 입력 크기별 반복 (마지막 값 = 정상 상태 지연)
+
 # 이미지 캡처 설정
 CAPTURE_FOLDER = "/home/keonha/AI_CAR/captured_images"
-MAX_CAPTURES_PER_OBJECT = 1  # 각 객체당 최대 캡처 횟수 (처음 인식 시 1장만)
+# 객체별 최대 캡처 횟수 ("default"는 목록에 없는 객체, 0이면 저장 안 함)
+CAPTURE_POLICY = {
+    "default": 1,      # 처음 인식 시 1장만
+    "traffic": 3,      # 신호등은 색 판별 검증용으로 여러 장
+}
+CAPTURE_QUEUE_SIZE = 8  # 저장 대기 큐 크기 (초과 시 오래된 것부터 버림)
+
+
+# 클래스명 매핑 (모델의 클래스명을 shared_state의 KNOWN_OBJECTS에 맞게 변환)
+# 예: "left" -> "turn_left", "right" -> "turn_right", "straight" -> "go_straight"
+NAME_MAPPING = {
+    "left": "turn_left",
+    "right": "turn_right",
+    "straight": "go_straight",
+    "stop": "stop",
+    "slow": "slow",
+    "horn": "horn",
+    "traffic": "traffic",
+    "turn_left": "turn_left",
+    "turn_right": "turn_right",
+    "go_straight": "go_straight",
+    # "sign" 클래스는 매핑하지 않음 (분류 모델이 필요)
+}
+
+# 객체별 구체적 설명 (방향 표지판 강조)
+ACTION_DESCRIPTIONS = {
+    "stop": "🛑 2초 정지",
+    "traffic": "🚦 3초 대기 → 우회전",
+    "horn": "📢 경적 1초",
+    "slow": "⚠️ 속도 25%로 감소",
+    "go_straight": "⬆️⬆️⬆️ 직진 표지판 → 교차로에서 직진",
+    "straight": "⬆️⬆️⬆️ 직진 표지판 → 교차로에서 직진",
+    "turn_left": "⬅️⬅️⬅️ 좌회전 표지판 → 교차로에서 좌회전",
+    "left": "⬅️⬅️⬅️ 좌회전 표지판 → 교차로에서 좌회전",
+    "turn_right": "➡️➡️➡️ 우회전 표지판 → 교차로에서 우회전",
+    "right": "➡️➡️➡️ 우회전 표지판 → 교차로에서 우회전"
+}
+
+TRAFFIC_INDEX = shared_state.KNOWN_OBJECTS.index("traffic")
+
+# 후처리 결과 (한 프레임의 유효 객체 목록)
+# cls: 탐지 모델 클래스 id / sub: 분류 모델 클래스 id (-1: 미적용) / label: KNOWN_OBJECTS 인덱스 (-1: 매핑 없음)
+DETECTION_DTYPE = np.dtype([
+    ("x1", np.int32), ("y1", np.int32), ("x2", np.int32), ("y2", np.int32),
+    ("area", np.int32), ("conf", np.float32),
+    ("cls", np.int16), ("sub", np.int16), ("label", np.int16),
+])
+EMPTY_DETECTIONS = np.zeros(0, DETECTION_DTYPE)
+
+_label_tables = {}  # names 항목 → 클래스 id별 KNOWN_OBJECTS 인덱스 배열
+
+
+def label_table(names):
+    """모델 names(dict)를 KNOWN_OBJECTS 인덱스 배열로 변환 (모델당 1회 생성)"""
+    # id(names)는 백엔드가 해제된 뒤 다른 모델의 names에 재사용될 수 있으므로 내용으로 키
+    key = tuple(sorted(names.items()))
+    table = _label_tables.get(key)
+    if table is None:
+        size = max(names) + 1 if names else 0
+        table = np.full(size, -1, np.int16)
+        for idx, name in names.items():
+            mapped = NAME_MAPPING.get(name.lower())
+            if mapped in shared_state.KNOWN_OBJECTS:
+                table[idx] = shared_state.KNOWN_OBJECTS.index(mapped)
+        _label_tables[key] = table
+    return table
+
+
+def postprocess(xyxy, conf, cls, det_names, sub_ids=None, sub_confs=None, cls_names=None):
+    """박스 배열 → 임계값을 통과한 객체의 구조화 배열 (DETECTION_DTYPE)
+
+    분류 결과가 CLASSIFIER_CONF_THRESHOLD 이상이면 분류 클래스로 교체하고
+    신뢰도는 두 모델의 평균을 사용한다.
+    """
+    n = len(conf)
+    if n == 0:
+        return EMPTY_DETECTIONS
+
+    label = label_table(det_names)[cls]
+    conf = conf.astype(np.float32)
+    sub = np.full(n, -1, np.int16)
+    if sub_ids is not None:
+        use_sub = (sub_ids >= 0) & (sub_confs >= CLASSIFIER_CONF_THRESHOLD)
+        sub = np.where(use_sub, sub_ids, -1).astype(np.int16)
+        label = np.where(use_sub, label_table(cls_names)[np.maximum(sub_ids, 0)], label)
+        conf = np.where(use_sub, (conf + sub_confs) / 2, conf)
+
+    area = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+    valid = (conf >= CONF_THRESHOLD) & (area >= MIN_AREA)
+
+    dets = np.empty(int(valid.sum()), DETECTION_DTYPE)
+    dets["x1"], dets["y1"], dets["x2"], dets["y2"] = xyxy[valid].T
+    dets["area"] = area[valid]
+    dets["conf"] = conf[valid]
+    dets["cls"] = cls[valid]
+    dets["sub"] = sub[valid]
+    dets["label"] = label[valid]
+    return dets
+
+
+def select_targets(dets):
+    """(가장 큰 일반 객체 인덱스, 마지막 신호등 인덱스) - 없으면 -1"""
+    if len(dets) == 0:
+        return -1, -1
+    label = dets["label"]
+    signs = (label >= 0) & (label != TRAFFIC_INDEX)
+    nearest = int(np.argmax(np.where(signs, dets["area"], -1))) if signs.any() else -1
+    traffic = np.flatnonzero(label == TRAFFIC_INDEX)
+    return nearest, (int(traffic[-1]) if len(traffic) else -1)
+
+
+# ======================================
+# 2단계 분류 (박스 crop → 분류 모델)
+# ======================================
+def letterbox(image, size, dst):
+    """비율을 유지해 size x size로 축소하고 남는 영역은 회색(114)으로 채움"""
+    h, w = image.shape[:2]
+    scale = size / max(h, w)
+    new_w = max(1, int(round(w * scale)))
+    new_h = max(1, int(round(h * scale)))
+    top = (size - new_h) // 2
+    left = (size - new_w) // 2
+    dst[:] = 114
+    dst[top:top + new_h, left:left + new_w] = cv2.resize(
+        image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    return dst
+
+
+_batch_buffer = None  # (N, 224, 224, 3) letterbox 버퍼 (필요할 때만 확장)
+
+
+def classify_boxes(classifier, roi, boxes_xyxy, batch=True):
+    """박스별 (분류 클래스 id 배열, 신뢰도 배열) 반환 (crop이 비어 있으면 id=-1)
+
+    batch=True 이면 모든 crop을 letterbox 후 한 번의 classify 호출로 처리하고,
+    False 이면 기존처럼 박스마다 classify를 호출한다.
+    """
+    global _batch_buffer
+
+    sub_ids = np.full(len(boxes_xyxy), -1, np.int64)
+    sub_confs = np.zeros(len(boxes_xyxy), np.float32)
+    crops = []
+    indices = []
+    for i, (x1, y1, x2, y2) in enumerate(boxes_xyxy):
+        crop = roi[max(y1, 0):y2, max(x1, 0):x2]
+        if crop.size > 0:
+            crops.append(crop)
+            indices.append(i)
+    if not crops:
+        return sub_ids, sub_confs
+
+    n = len(crops)
+    if _batch_buffer is None or _batch_buffer.shape[0] < n:
+        _batch_buffer = np.empty((max(n, 4), CLASSIFIER_IMGSZ, CLASSIFIER_IMGSZ, 3), np.uint8)
+    for k, crop in enumerate(crops):
+        letterbox(crop, CLASSIFIER_IMGSZ, _batch_buffer[k])
+
+    if not batch:
+        for k, i in enumerate(indices):
+            ids, confs = classifier.classify(_batch_buffer[k:k + 1])
+            sub_ids[i], sub_confs[i] = ids[0], confs[0]
+        return sub_ids, sub_confs
+
+    ids, confs = classifier.classify(_batch_buffer[:n])
+    sub_ids[indices] = ids
+    sub_confs[indices] = confs
+    return sub_ids, sub_confs
+
+
+def warmup(detector, classifier):
+    """실제 ROI 크기 / 분류 배치 크기로 WARMUP_RUNS회씩 추론 → [(이름, 첫 ms, 마지막 ms)]
+
+    분류는 classify_boxes 경로 그대로 호출해 letterbox 배치 버퍼도 미리 만든다.
+    """
+    w, h = WARMUP_ROI_SIZE
+    roi = np.full((h, w, 3), 114, np.uint8)
+    calls = [("탐지", lambda: detector.detect(roi))]
+    if classifier is not None:
+        sizes = WARMUP_BATCH_SIZES if CLASSIFIER_BATCH_MODE else (1,)
+        for n in sizes:
+            boxes = np.tile(np.array([[0, 0, 64, 64]], np.int32), (n, 1))
+            calls.append((f"분류 x{n}", lambda boxes=boxes: classify_boxes(
+                classifier, roi, boxes, batch=CLASSIFIER_BATCH_MODE)))
+
+    results = []
+    for name, call in calls:
+        times = []
+        for _ in range(WARMUP_RUNS):
+            start = time.perf_counter()
+            call()
+            times.append((time.perf_counter() - start) * 1000.0)
+        results.append((name, times[0], times[-1]))
+    return results
+
+
+def load_models():
+    """(탐지 모델, 분류 모델 또는 None) - 시작 타임라인에 단계별로 기록"""
+    with timeline.phase("런타임 import"):
+        runtime = import_runtime()
+    print(f"  [INFO] 추론 런타임: {runtime}")
+
+    print(f"  [INFO] 탐지 모델 로드 중: {DETECTOR_PATH}")
+    with timeline.phase("탐지 모델 로드"):
+        detector = load_model(DETECTOR_PATH, "detect")
+    print(f"  [✓] 탐지 모델 로드 완료 (백엔드: {detector.name})")
+
+    # 분류 모델 로드 (있는 경우)
+    classifier = None
+    if os.path.exists(CLASSIFIER_PATH):
+        print(f"  [INFO] 분류 모델 로드 중: {CLASSIFIER_PATH}")
+        with timeline.phase("분류 모델 로드"):
+            classifier = load_model(CLASSIFIER_PATH, "classify")
+        print(f"  [✓] 분류 모델 로드 완료 (백엔드: {classifier.name}) - 2단계 인식 활성화")
+    else:
+        print(f"  [⚠️] 분류 모델 없음 ({CLASSIFIER_PATH}) - 탐지 모델만 사용")
+
+    with timeline.phase("워밍업"):
+        results = warmup(detector, classifier)
+    print("  [✓] 워밍업 (첫→마지막): " + " | ".join(
+        f"{name} {first:.0f}→{last:.0f}ms" for name, first, last in results))
+    return detector, classifier
 
 
 def object_detect_loop():
@@ -51,28 +290,32 @@ def object_detect_loop():
         print("  [INFO] 객체 인식 비활성화 - 라인 트레이싱만 동작")
 
         # shared_state에 detector 비활성 상태 표시
-        with shared_state.lock:
-            shared_state.detector_active = False
-            # 모든 객체 상태를 False로 유지
-            for obj_name in shared_state.KNOWN_OBJECTS:
-                shared_state.object_state[obj_name] = False
+        shared_state.detector_active = False
+        # 모든 객체 상태를 False로 유지
+        shared_state.detections.publish(shared_state.EMPTY_DETECTIONS)
+        # 프레임 전달도 중단
+        shared_state.frame_due.publish(float("inf"))
+        # 차선 스레드가 감지기를 기다리지 않도록 (비활성으로 준비 완료)
+        timeline.ready("detector", ok=False)
 
         print("  [INFO] Object detector 스레드 종료")
         return
 
-    # 모델 로드 (탐지 + 분류)
-    print(f"  [INFO] 탐지 모델 로드 중: {DETECTOR_PATH}")
-    detector = YOLO(DETECTOR_PATH)
-    print(f"  [✓] 탐지 모델 로드 완료")
+    # 모델 로드 (탐지 + 분류) + 워밍업
+    try:
+        detector, classifier = load_models()
+    except Exception as e:
+        print(f"  [❌] 모델 로드 실패: {e}")
+        print("  [INFO] 객체 인식 비활성화 - 라인 트레이싱만 동작")
+        shared_state.detector_active = False
+        shared_state.detections.publish(shared_state.EMPTY_DETECTIONS)
+        shared_state.frame_due.publish(float("inf"))
+        timeline.ready("detector", ok=False)
+        return
 
-    # 분류 모델 로드 (있는 경우)
-    classifier = None
-    if os.path.exists(CLASSIFIER_PATH):
-        print(f"  [INFO] 분류 모델 로드 중: {CLASSIFIER_PATH}")
-        classifier = YOLO(CLASSIFIER_PATH)
-        print(f"  [✓] 분류 모델 로드 완료 - 2단계 인식 활성화")
-    else:
-        print(f"  [⚠️] 분류 모델 없음 ({CLASSIFIER_PATH}) - 탐지 모델만 사용")
+    # detector 활성 상태 표시 → 차선 스레드 주행 시작 가능
+    shared_state.detector_active = True
+    timeline.ready("detector")
 
     # 모델 클래스 정보 출력
     if hasattr(detector, 'names'):
@@ -101,10 +344,6 @@ def object_detect_loop():
                 icon = "⚠️"
             print(f"        - {idx}: {icon} {name}")
 
-    # detector 활성 상태 표시
-    with shared_state.lock:
-        shared_state.detector_active = True
-
     # last_action_time은 아래에서 dict로 정의됨
 
     # 디버그용 카운터 및 타이머
@@ -113,24 +352,27 @@ def object_detect_loop():
     last_status_time = time.time()
     last_frame_time = 0
     no_frame_count = 0
+    last_seq = 0
+    rgb_buffer = None  # BGR→RGB 변환 결과를 재사용할 버퍼
+    classify_latency = LatencyStats("2단계 분류 (프레임당)")
+    scheduler = DetectionScheduler(NEAR_AREA, REFERENCE_SPEED)
+    gate = FrameGate() if FRAME_GATE_ENABLED else None
+    last_result = None  # 직전 추론 결과 (xyxy, confs, cls_ids, sub_ids, sub_confs)
+    tracker = ObjectTracker()
 
     # 중복 실행 방지를 위한 딕셔너리
     last_action_time = {}  # 각 객체별 마지막 동작 시간
     # ACTION_COOLDOWN은 shared_state에서 가져옴 (5초)
 
-    # 이미지 캡처용 카운터 및 폴더 생성
-    capture_count = {}  # 각 객체별 캡처 횟수
-    if not os.path.exists(CAPTURE_FOLDER):
-        os.makedirs(CAPTURE_FOLDER)
-        print(f"  [✓] 캡처 폴더 생성: {CAPTURE_FOLDER}")
-    else:
-        print(f"  [INFO] 캡처 폴더 존재: {CAPTURE_FOLDER}")
+    # 이미지 캡처용 비동기 저장기 (폴더 생성 포함)
+    capture_writer = CaptureWriter(CAPTURE_FOLDER, CAPTURE_POLICY, max_queue=CAPTURE_QUEUE_SIZE)
+    print(f"  [INFO] 캡처 폴더: {CAPTURE_FOLDER}")
 
     print("\n" + "="*50)
     print("📸 [객체 인식 시작]")
     print(f"  • 신뢰도 기준: {int(CONF_THRESHOLD*100)}%")
     print(f"  • 최소 크기: {MIN_AREA}")
-    print(f"  • 이미지 캡처: 활성화 (처음 인식 시 1장만)")
+    print(f"  • 이미지 캡처: 비동기 저장 (정책: {CAPTURE_POLICY})")
     print("="*50 + "\n")
 
     try:
@@ -138,32 +380,49 @@ def object_detect_loop():
             # ===============================
             # 1️최신 프레임 획득 (RGB)
             # ===============================
-            with shared_state.lock:
-                frame_rgb = getattr(shared_state, "latest_frame", None)
+            # 링 버퍼에서 최신 슬롯의 읽기 전용 view 획득 (복사 없음)
+            seq, frame_view = shared_state.frame_ring.read_latest()
 
-            if frame_rgb is None:
+            if frame_view is None:
                 no_frame_count += 1
                 if no_frame_count % 20 == 0:  # 1초마다 (0.05 * 20)
                     print(f"⚠️  [프레임 없음] {no_frame_count}번째 시도 중... (카메라 연결 확인)")
                 time.sleep(0.05)
                 continue
 
+            # 이미 처리한 프레임이면 새 프레임 대기
+            if seq == last_seq:
+                time.sleep(0.01)
+                continue
+            last_seq = seq
+            # 추론하는 동안은 새 프레임 불필요 (스케줄 결정 후 다시 요청)
+            shared_state.frame_due.publish(float("inf"))
+
             # 프레임을 받았으면
             frame_count += 1
             no_frame_count = 0  # 리셋
 
-            # ✅ BGR → RGB 변환 (모델 학습 색공간과 일치시키기)
-            frame_rgb = cv2.cvtColor(frame_rgb, cv2.COLOR_BGR2RGB)
+            # ✅ BGR → RGB 변환 (모델 학습 색공간과 일치시키기) - 전용 버퍼에 직접 기록
+            if rgb_buffer is None or rgb_buffer.shape != frame_view.shape:
+                rgb_buffer = np.empty_like(frame_view)
+            frame_rgb = cv2.cvtColor(frame_view, cv2.COLOR_BGR2RGB, dst=rgb_buffer)
 
             # ROI: 오른쪽 절반 (640x480 기준 320~640)
             _, width = frame_rgb.shape[:2]
             roi_rgb = frame_rgb[:, width // 2:]
 
-            # YOLO 탐지 시도
-            detection_count += 1
-
-            results = detector(roi_rgb, verbose=False)
+            # 장면 변화가 없으면 직전 추론 결과 재사용 (MAX_STALE 이내)
+            infer_start = time.perf_counter()
             now = time.time()
+            inferred = last_result is None or gate is None or gate.should_infer(roi_rgb, now, bgr=False)
+
+            if inferred:
+                # YOLO 탐지 시도
+                detection_count += 1
+                xyxy, confs, cls_ids = detector.detect(roi_rgb)
+                now = time.time()
+            else:
+                xyxy, confs, cls_ids, sub_ids, sub_confs = last_result
 
             detected_label = None
             nearest_area = 0
@@ -171,269 +430,203 @@ def object_detect_loop():
             traffic_detected = False
             traffic_area = 0
             traffic_conf = 0.0  # 신호등 신뢰도 변수 추가
-            objects_found = 0
 
             # ===============================
-            #  탐지 결과 처리
+            #  탐지 결과 처리 (배열 단위 후처리)
             # ===============================
-            if results and len(results) > 0 and hasattr(results[0], 'boxes') and results[0].boxes is not None:
-                total_boxes = len(results[0].boxes) if results[0].boxes is not None else 0
-                valid_objects = 0  # 조건을 통과한 객체 수
-
-                for box in results[0].boxes:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    area = (x2 - x1) * (y2 - y1)
-                    conf = float(box.conf[0])
-                    cls_id = int(box.cls[0])
-                    cls_name = results[0].names[cls_id]
-
-                    # ✅ test 버전 방식: 모든 객체를 분류 모델로 재확인
-                    if classifier:
-                        # ROI 추출하여 분류 모델 실행
-                        crop = roi_rgb[y1:y2, x1:x2]
-                        if crop.size > 0:
-                            # test 버전과 동일한 방식: predict() 사용
-                            cls_res = classifier.predict(crop, imgsz=224, verbose=False)
-                            if cls_res and len(cls_res) > 0:
-                                sub_id = int(cls_res[0].probs.top1)
-                                sub_name = cls_res[0].names[sub_id]
-                                sub_conf = float(cls_res[0].probs.top1conf)
-
-                                # 분류 모델 신뢰도 체크 (80% 이상만)
-                                if sub_conf >= CLASSIFIER_CONF_THRESHOLD:
-                                    # 방향 표지판 아이콘
-                                    direction_icon = ""
-                                    if "left" in sub_name.lower() or "turn_left" in sub_name:
-                                        direction_icon = "⬅️"
-                                    elif "right" in sub_name.lower() or "turn_right" in sub_name:
-                                        direction_icon = "➡️"
-                                    elif "straight" in sub_name.lower() or "go_straight" in sub_name:
-                                        direction_icon = "⬆️"
-
-                                    # 분류 성공 로그
-                                    if direction_icon:
-                                        print(f"   🔄 [2단계 분류] {cls_name} → {sub_name} (신뢰도: {sub_conf:.1%})")
-                                        print(f"      ✨ {direction_icon} **방향 표지판 확정!** {direction_icon}")
-
-                                    cls_name = sub_name  # 분류된 이름으로 변경
-                                    conf = (conf + sub_conf) / 2  # 평균 신뢰도
-
-                    # 조건을 통과한 객체만 표시 (80% 이상, 5000 이상)
-                    if conf >= CONF_THRESHOLD and area >= MIN_AREA:
-                        valid_objects += 1
-
-                        # 방향 표지판 아이콘 추가
-                        icon = ""
-                        if "left" in cls_name.lower() or "turn_left" in cls_name:
-                            icon = "⬅️"
-                        elif "right" in cls_name.lower() or "turn_right" in cls_name:
-                            icon = "➡️"
-                        elif "straight" in cls_name.lower() or "go_straight" in cls_name:
-                            icon = "⬆️"
-                        elif "stop" in cls_name.lower():
-                            icon = "🛑"
-                        elif "traffic" in cls_name.lower():
-                            icon = "🚦"
-
-                        objects_found += 1
-
-                    if area < MIN_AREA or conf < CONF_THRESHOLD:
-                        continue
-
-                    # 검출된 클래스명 사용
-                    detected_name = cls_name
-
-                    # 🔍 디버그: 모델이 감지한 원본 클래스명 출력
-                    print(f"\n🔍 [모델 감지] '{detected_name}' - 신뢰도: {conf:.0%} | 크기: {area:,}")
-
-                    # 클래스명 매핑 (모델의 클래스명을 shared_state의 KNOWN_OBJECTS에 맞게 변환)
-                    # 예: "left" -> "turn_left", "right" -> "turn_right", "straight" -> "go_straight"
-                    name_mapping = {
-                        "left": "turn_left",
-                        "right": "turn_right",
-                        "straight": "go_straight",
-                        "stop": "stop",
-                        "slow": "slow",
-                        "horn": "horn",
-                        "traffic": "traffic",
-                        "turn_left": "turn_left",
-                        "turn_right": "turn_right",
-                        "go_straight": "go_straight",
-                        # "sign" 클래스는 매핑하지 않음 (분류 모델이 필요)
-                    }
-
-                    sub_name = name_mapping.get(detected_name.lower(), None)
-
-                    # KNOWN_OBJECTS에 없는 객체는 무시 (예: "sign", "direction", "arrow" 등)
-                    if sub_name is None or sub_name not in shared_state.KNOWN_OBJECTS:
-                        print(f"   ⚠️ [필터링됨] '{detected_name}' → name_mapping에 없음 (분류 모델 필요)")
-                        continue
-                    sub_conf = conf
-
-                    # ✅ KNOWN_OBJECTS에 매핑된 객체만 로그 표시
-                    print(f"\n🎯 [{sub_name}] 감지 - 신뢰도: {conf:.0%} | 크기: {area:,}")
-
-                    # 신호등 처리
-                    if sub_name.startswith("traffic"):
-                        traffic_detected = True
-                        traffic_area = area
-                        traffic_conf = sub_conf  # 신호등 신뢰도 저장
-                        continue
-
-                    # 가장 큰 면적 객체 선택
-                    if area > nearest_area:
-                        nearest_area = area
-                        detected_label = sub_name
-                        detected_conf = sub_conf  # 신뢰도 저장
-
-                    # 디버깅용 표시 (RGB 프레임 사용)
+            det_names = detector.names
+
+            # ✅ test 버전 방식: 모든 객체를 분류 모델로 재확인 (프레임당 1회 배치 호출)
+            if inferred:
+                sub_ids = sub_confs = None
+                if classifier and len(xyxy) > 0:
+                    with classify_latency.time():
+                        sub_ids, sub_confs = classify_boxes(classifier, roi_rgb, xyxy,
+                                                            batch=CLASSIFIER_BATCH_MODE)
+                last_result = (xyxy, confs, cls_ids, sub_ids, sub_confs)
+
+            dets = postprocess(xyxy, confs, cls_ids, det_names, sub_ids, sub_confs,
+                               classifier.names if classifier else None)
+            nearest_idx, traffic_idx = select_targets(dets)
+
+            # 다음 탐지 시점 결정 (추론 시간 + 주행 상태 + 접근 중인 객체 크기)
+            max_area = int(dets["area"].max()) if len(dets) else 0
+            infer_ms = (time.perf_counter() - infer_start) * 1000.0 if inferred else None
+            scheduler.observe(infer_ms, max_area, now)
+            interval = scheduler.next_interval(shared_state.lane.get(), max_area, now)
+            shared_state.frame_due.publish(now + interval)
+            shared_state.scheduler.publish(shared_state.freeze(scheduler.metrics()))
+
+            # 유효 객체 로그 (임계값 통과분만)
+            for det in dets:
+                det_name = det_names[int(det["cls"])]
+                if det["sub"] >= 0:
+                    sub_name = classifier.names[int(det["sub"])]
+                    # 방향 표지판 아이콘
+                    direction_icon = ""
+                    if "left" in sub_name.lower():
+                        direction_icon = "⬅️"
+                    elif "right" in sub_name.lower():
+                        direction_icon = "➡️"
+                    elif "straight" in sub_name.lower():
+                        direction_icon = "⬆️"
+
+                    # 분류 성공 로그
+                    if direction_icon:
+                        print(f"   🔄 [2단계 분류] {det_name} → {sub_name} (신뢰도: {det['conf']:.1%})")
+                        print(f"      ✨ {direction_icon} **방향 표지판 확정!** {direction_icon}")
+                    det_name = sub_name
+
+                # 🔍 디버그: 모델이 감지한 원본 클래스명 출력
+                print(f"\n🔍 [모델 감지] '{det_name}' - 신뢰도: {det['conf']:.0%} | 크기: {det['area']:,}")
+
+                # KNOWN_OBJECTS에 없는 객체는 무시 (예: "sign", "direction", "arrow" 등)
+                if det["label"] < 0:
+                    print(f"   ⚠️ [필터링됨] '{det_name}' → name_mapping에 없음 (분류 모델 필요)")
+                    continue
+
+                # ✅ KNOWN_OBJECTS에 매핑된 객체만 로그 표시
+                label_name = shared_state.KNOWN_OBJECTS[det["label"]]
+                print(f"\n🎯 [{label_name}] 감지 - 신뢰도: {det['conf']:.0%} | 크기: {det['area']:,}")
+
+                # 디버깅용 표시 (RGB 프레임 사용, 신호등 제외)
+                if det["label"] != TRAFFIC_INDEX:
+                    x1, y1, x2, y2 = int(det["x1"]), int(det["y1"]), int(det["x2"]), int(det["y2"])
                     cv2.rectangle(roi_rgb, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(roi_rgb, f"{sub_name} ({conf:.2f})", (x1, y1 - 5),
+                    cv2.putText(roi_rgb, f"{label_name} ({det['conf']:.2f})", (x1, y1 - 5),
                                 cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
 
+            # 신호등 처리
+            if traffic_idx >= 0:
+                traffic_detected = True
+                traffic_area = int(dets["area"][traffic_idx])
+                traffic_conf = float(dets["conf"][traffic_idx])  # 신호등 신뢰도 저장
+
+            # 가장 큰 면적 객체 선택
+            if nearest_idx >= 0:
+                nearest_area = int(dets["area"][nearest_idx])
+                detected_label = shared_state.KNOWN_OBJECTS[dets["label"][nearest_idx]]
+                detected_conf = float(dets["conf"][nearest_idx])  # 신뢰도 저장
+
             # ===============================
-            # shared_state 갱신 및 로깅
+            # shared_state 갱신 (스냅샷 발행)
             # ===============================
-            with shared_state.lock:
-                # 기존 상태 백업 (변경 감지용)
-                prev_detected = shared_state.object_detected
-                prev_state = shared_state.object_state.copy()
-
-                # 감지된 객체 목록 생성
-                detected_objects = []
-                if detected_label and detected_label in shared_state.KNOWN_OBJECTS:
-                    detected_objects.append(detected_label)
-                if traffic_detected:
-                    detected_objects.append("traffic")
-
-                # 모든 객체에 대해 연속 감지 프레임 업데이트
-                for obj_name in shared_state.KNOWN_OBJECTS:
-                    if obj_name in detected_objects:
-                        # 감지된 객체: 프레임 카운터 증가
-                        shared_state.detection_frames[obj_name] += 1
-                        shared_state.object_state[obj_name] = True
-                    else:
-                        # 미감지된 객체: 프레임 카운터 리셋
-                        shared_state.detection_frames[obj_name] = 0
-                        shared_state.object_state[obj_name] = False
-
-                # 감지된 객체의 상세 정보 업데이트
-                if detected_label and detected_label in shared_state.KNOWN_OBJECTS:
-                    shared_state.object_area[detected_label] = nearest_area
-                    shared_state.object_last_seen[detected_label] = now
-                    shared_state.confidence[detected_label] = detected_conf
-
-                # traffic 신호등 상세 정보 업데이트
-                if traffic_detected:
-                    shared_state.object_area["traffic"] = traffic_area
-                    shared_state.object_last_seen["traffic"] = now
-                    shared_state.confidence["traffic"] = traffic_conf
-
-                # 새로운 상태 업데이트
-                shared_state.object_detected = detected_label
-                shared_state.object_distance = nearest_area
-
-                # 새로운 객체 감지 시 로그 (더 강조된 버전)
-                if detected_label and detected_label != prev_detected:
-                    timestamp = time.strftime("%H:%M:%S")
+            # 기존 상태 (변경 감지용)
+            prev = shared_state.detections.get()
+            prev_detected = prev.object_detected
+            prev_state = prev.object_state
+
+            # 트랙 갱신 (재사용 프레임은 같은 결과를 중복 반영하지 않음)
+            if inferred:
+                tracker.update(dets, now)
+            best_tracks = tracker.best_by_label()
+
+            # 모든 객체에 대해 트랙 기준 상태 업데이트 (한두 프레임 놓쳐도 유지)
+            object_state = {}
+            detection_frames = {}
+            detection_counts = dict(prev.detection_counts)
+            object_area = dict(prev.object_area)
+            object_last_seen = dict(prev.object_last_seen)
+            confidence = dict(prev.confidence)
+            for label_idx, obj_name in enumerate(shared_state.KNOWN_OBJECTS):
+                track = best_tracks.get(label_idx)
+                if track is None:
+                    detection_frames[obj_name] = 0
+                    object_state[obj_name] = False
+                    continue
+                object_state[obj_name] = True
+                detection_frames[obj_name] = track.hits
+                if inferred and track.last_seen == now:
+                    # 이번 프레임에 실제로 감지된 객체
+                    detection_counts[obj_name] += 1
+                    object_last_seen[obj_name] = now
+                object_area[obj_name] = int(track.area)
+                confidence[obj_name] = track.confidence
+
+            shared_state.detections.publish(shared_state.DetectionSnapshot(
+                timestamp=now,
+                object_state=shared_state.freeze(object_state),
+                object_area=shared_state.freeze(object_area),
+                object_last_seen=shared_state.freeze(object_last_seen),
+                confidence=shared_state.freeze(confidence),
+                detection_frames=shared_state.freeze(detection_frames),
+                detection_counts=shared_state.freeze(detection_counts),
+                object_detected=detected_label,
+                object_distance=nearest_area,
+                traffic_light_area=traffic_area if traffic_detected else prev.traffic_light_area,
+                traffic_light_last_ts=now if traffic_detected else prev.traffic_light_last_ts,
+                tracks=tuple(t.info() for t in tracker.tracks if t.confirmed),
+            ))
 
-                    # 중복 실행 체크
-                    can_execute = True
-                    if detected_label in shared_state.action_last_time:
-                        time_since_last = now - shared_state.action_last_time[detected_label]
-                        if time_since_last < shared_state.ACTION_COOLDOWN:
-                            can_execute = False
-
-                    print(f"\n{'🔥'*25}")
-                    print(f"🎯🎯🎯 [{detected_label}] 감지! 🎯🎯🎯")
-                    print(f"{'🔥'*25}")
-                    print(f"  ⏰ 시간: {timestamp}")
-                    print(f"  📌 객체 타입: {detected_label}")
-                    print(f"  📏 크기: {nearest_area:,}")
-                    print(f"  🎭 신뢰도: {sub_conf:.2%}")
-
-                    # 동작 가능 여부 표시
-                    if can_execute:
-                        print(f"  ✅ 동작 실행 가능!")
-                    else:
-                        remaining = shared_state.ACTION_COOLDOWN - (now - shared_state.action_last_time[detected_label])
-                        print(f"  ⏳ 쿨다운 중... ({remaining:.1f}초 남음)")
-
-                    # 객체별 구체적 설명 (방향 표지판 강조)
-                    actions = {
-                        "stop": "🛑 2초 정지",
-                        "traffic": "🚦 3초 대기 → 우회전",
-                        "horn": "📢 경적 1초",
-                        "slow": "⚠️ 속도 25%로 감소",
-                        "go_straight": "⬆️⬆️⬆️ 직진 표지판 → 교차로에서 직진",
-                        "straight": "⬆️⬆️⬆️ 직진 표지판 → 교차로에서 직진",
-                        "turn_left": "⬅️⬅️⬅️ 좌회전 표지판 → 교차로에서 좌회전",
-                        "left": "⬅️⬅️⬅️ 좌회전 표지판 → 교차로에서 좌회전",
-                        "turn_right": "➡️➡️➡️ 우회전 표지판 → 교차로에서 우회전",
-                        "right": "➡️➡️➡️ 우회전 표지판 → 교차로에서 우회전"
-                    }
-
-                    # 방향 표지판이면 특별 강조
-                    if detected_label in ["go_straight", "straight", "turn_left", "left", "turn_right", "right"]:
-                        # 방향 표지판 아이콘 결정
-                        dir_icon = ""
-                        if detected_label in ["turn_left", "left"]:
-                            dir_icon = "⬅️⬅️⬅️"
-                            direction = "좌회전"
-                        elif detected_label in ["turn_right", "right"]:
-                            dir_icon = "➡️➡️➡️"
-                            direction = "우회전"
-                        else:  # go_straight, straight
-                            dir_icon = "⬆️⬆️⬆️"
-                            direction = "직진"
-
-                        print(f"\n  🚗💨 [방향 표지판 감지!]")
-                        print(f"  🎯 {dir_icon} {direction.upper()} 표지판 {dir_icon} 🎯")
-                        print(f"  🎬 동작: {actions.get(detected_label, '알 수 없음')}")
-                        print(f"  💾 교차로에서 자동 실행 예정")
-                        print(f"  🔄 분류 모델로 확정된 방향입니다!\n")
-                    elif detected_label in actions:
-                        print(f"  🎬 동작: {actions[detected_label]}")
-
-                    print(f"{'='*50}\n")
-
-                    # 이미지 캡처 (새로운 객체 감지 시)
-                    if detected_label not in capture_count:
-                        capture_count[detected_label] = 0
-
-                    if capture_count[detected_label] < MAX_CAPTURES_PER_OBJECT:
-                        try:
-                            # 캡처할 이미지 준비 (ROI 영역, RGB)
-                            capture_img = roi_rgb.copy()
-
-                            # 타임스탬프 생성
-                            capture_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            capture_num = capture_count[detected_label] + 1
-
-                            # 파일명 생성
-                            filename = f"{detected_label}_{capture_timestamp}_{capture_num}.jpg"
-                            filepath = os.path.join(CAPTURE_FOLDER, filename)
-
-                            # 이미지 저장 (PIL 사용 - RGB 네이티브 저장)
-                            pil_img = Image.fromarray(capture_img)
-                            pil_img.save(filepath, quality=95)
-                            capture_count[detected_label] += 1
-
-                            print(f"  📷 [이미지 캡처] {filename}")
-                            print(f"      └─ 저장 위치: {filepath}")
-                            print(f"      └─ 처음 인식 시 자동 저장 완료")
-                        except Exception as e:
-                            print(f"  ❌ 이미지 캡처 실패: {e}")
-
-                if traffic_detected:
-                    shared_state.traffic_light_area = traffic_area
-                    shared_state.traffic_light_last_ts = now
-                    shared_state.right_turn_done = False
-
-                    # 신호등 감지 로그
-                    if not prev_state.get("traffic", False):  # 새로 감지된 경우만
-                        timestamp = time.strftime("%H:%M:%S")
-                        print(f"🚦 [신호등 감지] {timestamp} | 크기: {traffic_area}")
+            # ===============================
+            # 로깅 및 캡처 (발행 이후, 다른 스레드를 막지 않음)
+            # ===============================
+            action_last_time = shared_state.actions.get()
+
+            # 새로운 객체 감지 시 로그 (더 강조된 버전)
+            if detected_label and detected_label != prev_detected:
+                timestamp = time.strftime("%H:%M:%S")
+
+                # 중복 실행 체크
+                can_execute = True
+                if detected_label in action_last_time:
+                    time_since_last = now - action_last_time[detected_label]
+                    if time_since_last < shared_state.ACTION_COOLDOWN:
+                        can_execute = False
+
+                print(f"\n{'🔥'*25}")
+                print(f"🎯🎯🎯 [{detected_label}] 감지! 🎯🎯🎯")
+                print(f"{'🔥'*25}")
+                print(f"  ⏰ 시간: {timestamp}")
+                print(f"  📌 객체 타입: {detected_label}")
+                print(f"  📏 크기: {nearest_area:,}")
+                print(f"  🎭 신뢰도: {detected_conf:.2%}")
+
+                # 동작 가능 여부 표시
+                if can_execute:
+                    print(f"  ✅ 동작 실행 가능!")
+                else:
+                    remaining = shared_state.ACTION_COOLDOWN - (now - action_last_time[detected_label])
+                    print(f"  ⏳ 쿨다운 중... ({remaining:.1f}초 남음)")
+
+                actions = ACTION_DESCRIPTIONS
+
+                # 방향 표지판이면 특별 강조
+                if detected_label in ["go_straight", "straight", "turn_left", "left", "turn_right", "right"]:
+                    # 방향 표지판 아이콘 결정
+                    dir_icon = ""
+                    if detected_label in ["turn_left", "left"]:
+                        dir_icon = "⬅️⬅️⬅️"
+                        direction = "좌회전"
+                    elif detected_label in ["turn_right", "right"]:
+                        dir_icon = "➡️➡️➡️"
+                        direction = "우회전"
+                    else:  # go_straight, straight
+                        dir_icon = "⬆️⬆️⬆️"
+                        direction = "직진"
+
+                    print(f"\n  🚗💨 [방향 표지판 감지!]")
+                    print(f"  🎯 {dir_icon} {direction.upper()} 표지판 {dir_icon} 🎯")
+                    print(f"  🎬 동작: {actions.get(detected_label, '알 수 없음')}")
+                    print(f"  💾 교차로에서 자동 실행 예정")
+                    print(f"  🔄 분류 모델로 확정된 방향입니다!\n")
+                elif detected_label in actions:
+                    print(f"  🎬 동작: {actions[detected_label]}")
+
+                print(f"{'='*50}\n")
+
+                # 이미지 캡처 (새로운 객체 감지 시) - 인코딩/저장은 백그라운드에서
+                capture_writer.submit(detected_label, roi_rgb, {
+                    "confidence": detected_conf,
+                    "area": nearest_area,
+                    "timestamp": now,
+                })
+
+            if traffic_detected:
+                # 신호등 감지 로그
+                if not prev_state.get("traffic", False):  # 새로 감지된 경우만
+                    timestamp = time.strftime("%H:%M:%S")
+                    print(f"🚦 [신호등 감지] {timestamp} | 크기: {traffic_area}")
 
             # ===============================
             #  이벤트 트리거 처리 (근접 이벤트용)
@@ -441,11 +634,10 @@ def object_detect_loop():
             # 이미 위에서 중복 실행 방지 처리됨
             # 근접 이벤트만 체크
             if detected_label and nearest_area > NEAR_AREA:
-                with shared_state.lock:
-                    # 이미 실행 중이 아닌 경우에만 트리거
-                    if detected_label not in shared_state.action_last_time:
-                        shared_state.last_trigger = detected_label
-                        print(f"[TRIGGER] {detected_label} 근접 이벤트 (area={nearest_area})")
+                # 이미 실행 중이 아닌 경우에만 트리거
+                if detected_label not in action_last_time:
+                    shared_state.triggers.publish(detected_label)
+                    print(f"[TRIGGER] {detected_label} 근접 이벤트 (area={nearest_area})")
 
             # 디버그 출력 제거 (너무 많은 로그 방지)
 
@@ -460,36 +652,54 @@ def object_detect_loop():
                 print(f"  • 프레임 처리율: {frame_count/detection_count:.1%}" if detection_count > 0 else "N/A")
                 print(f"  • 현재 프레임 크기: {frame_rgb.shape if frame_rgb is not None else 'N/A'}")
                 print(f"  • ROI 크기: {roi_rgb.shape}")
+                ring = shared_state.frame_ring.stats()
+                print(f"  • 프레임 링: 전송 {ring['written']} / 처리 {ring['read']} | "
+                      f"드롭 {ring['dropped']} | 재사용 {ring['reused']} | 지연 {ring['lag']}")
                 print(f"  • 마지막 탐지 객체: {detected_label if detected_label else '없음'}")
 
                 # 활성 객체 상태
-                with shared_state.lock:
-                    active_objects = [k for k, v in shared_state.object_state.items() if v]
-                    if active_objects:
-                        print(f"  • 활성 객체: {', '.join(active_objects)}")
-                    else:
-                        print(f"  • 활성 객체: 없음")
-
-                # 캡처 상태
-                if capture_count:
-                    total_captures = sum(capture_count.values())
-                    capture_summary = [f"{k}:{v}" for k, v in capture_count.items() if v > 0]
-                    print(f"  • 📷 캡처된 이미지: 총 {total_captures}장")
-                    if capture_summary:
-                        print(f"      └─ {', '.join(capture_summary)}")
+                snapshot = shared_state.detections.get()
+                active_objects = [k for k, v in snapshot.object_state.items() if v]
+                if active_objects:
+                    print(f"  • 활성 객체: {', '.join(active_objects)}")
                 else:
-                    print(f"  • 📷 캡처된 이미지: 없음")
+                    print(f"  • 활성 객체: 없음")
 
+                # 캡처 상태
+                capture_stats = capture_writer.stats()
+                capture_summary = [f"{k}:{v}" for k, v in capture_writer.counts().items() if v > 0]
+                print(f"  • 📷 캡처된 이미지: 총 {capture_stats['written']}장 | "
+                      f"대기 {capture_stats['queue']} | 드롭 {capture_stats['dropped']} | "
+                      f"저장 평균 {capture_stats['write_ms']:.1f}ms (최대 {capture_stats['write_max_ms']:.1f}ms)")
+                if capture_summary:
+                    print(f"      └─ {', '.join(capture_summary)}")
+
+                sched = scheduler.metrics()
+                decisions = ", ".join(f"{k}:{v}" for k, v in sched["decisions"].items() if v)
+                print(f"  • 탐지 스케줄: {sched['rate_hz']:.1f}Hz | 추론 {sched['inference_ms']:.0f}ms | "
+                      f"현재 {sched['mode']} (간격 {sched['interval_ms']:.0f}ms)")
+                print(f"      └─ {decisions}")
+                t = tracker.stats()
+                print(f"  • 트래커: 활성 {t['active']} (확정 {t['confirmed']}) | "
+                      f"생성 {t['created']} / 삭제 {t['removed']}")
+                if gate is not None:
+                    g = gate.stats()
+                    print(f"  • 장면 게이트: 재사용 {g['skipped']}/{g['checked']} ({g['hit_rate']:.0%}) | "
+                          f"변화 {g['changed']} | 만료 {g['stale']}")
+
+                if classifier:
+                    mode = "배치" if CLASSIFIER_BATCH_MODE else "박스별"
+                    print(f"  • {classify_latency.summary()} ({mode})")
                 print(f"  • YOLO 모델 상태: {'정상' if detector else '오류'}")
                 print("="*60 + "\n")
                 last_status_time = now
 
             # 탐지 실패 로그 제거 (너무 많은 로그 방지)
-
-            time.sleep(0.2)
+            # 다음 프레임은 frame_due 이후 lane_tracer가 기록 → 루프 상단에서 대기
 
     except KeyboardInterrupt:
         print("\n[INFO] Object detector stopped by user.")
     finally:
+        capture_writer.close()
         cv2.destroyAllWindows()
         print(" Detector cleanup complete")
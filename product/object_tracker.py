@@ -0,0 +1,184 @@
+"""
+object_tracker.py
+-----------------
+경량 다중 객체 트래커 (SORT 방식, IoU + 중심 거리 매칭)
+
+프레임마다 리셋되던 detection_frames 대신 객체별 트랙을 유지한다.
+* 같은 라벨끼리 IoU가 높은 순으로 매칭, 남은 것은 중심 거리로 한 번 더 매칭
+* 등속 모델로 다음 위치를 예측 (감지 주기가 길어도 박스가 끊기지 않도록)
+* 신뢰도 / 면적은 지수 이동 평균으로 평활화
+* 누적 hits가 CONFIRM_HITS 이상이면 확정 (연속일 필요 없음)
+* MAX_MISSES 프레임 연속으로 놓치거나 MAX_AGE초 동안 보이지 않으면 삭제
+"""
+
+import numpy as np
+
+import shared_state
+
+# ======================================
+# 트래커 파라미터
+# ======================================
+IOU_MATCH = 0.3       # IoU 매칭 최소값
+CENTROID_GATE = 1.0   # 중심 거리 / sqrt(면적)가 이 값 이하이면 매칭 (IoU 실패 시)
+CONFIRM_HITS = 3      # 확정에 필요한 누적 감지 수
+MAX_MISSES = 3        # 연속 미감지 허용 횟수 (초과 시 트랙 삭제)
+MAX_AGE = 1.5         # 마지막 감지 후 트랙 유지 시간 (초)
+SMOOTHING = 0.5       # 신뢰도 / 면적 EMA 계수
+VELOCITY_SMOOTHING = 0.5
+
+
+class Track:
+    __slots__ = ("track_id", "label", "box", "velocity", "area", "confidence",
+                 "hits", "misses", "first_seen", "last_seen")
+
+    def __init__(self, track_id, label, box, area, conf, now):
+        self.track_id = track_id
+        self.label = label
+        self.box = box                       # float64 [x1, y1, x2, y2]
+        self.velocity = np.zeros(2)          # 중심 이동 속도 (px/s)
+        self.area = float(area)
+        self.confidence = float(conf)
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = now
+        self.last_seen = now
+
+    @property
+    def confirmed(self):
+        return self.hits >= CONFIRM_HITS
+
+    def predict(self, now):
+        """등속 모델로 now 시점의 박스 예측"""
+        shift = self.velocity * (now - self.last_seen)
+        return self.box + np.concatenate([shift, shift])
+
+    def update(self, box, area, conf, now):
+        dt = now - self.last_seen
+        if dt > 0:
+            moved = ((box[:2] + box[2:]) - (self.box[:2] + self.box[2:])) / 2.0 / dt
+            self.velocity += VELOCITY_SMOOTHING * (moved - self.velocity)
+        self.box = box
+        self.area += SMOOTHING * (area - self.area)
+        self.confidence += SMOOTHING * (conf - self.confidence)
+        self.hits += 1
+        self.misses = 0
+        self.last_seen = now
+
+    def info(self):
+        x1, y1, x2, y2 = (int(v) for v in self.box)
+        return shared_state.TrackInfo(
+            track_id=self.track_id,
+            label=shared_state.KNOWN_OBJECTS[self.label],
+            x1=x1, y1=y1, x2=x2, y2=y2,
+            area=int(self.area),
+            confidence=self.confidence,
+            hits=self.hits,
+            misses=self.misses,
+            confirmed=self.confirmed,
+            first_seen=self.first_seen,
+            last_seen=self.last_seen,
+        )
+
+
+def iou_matrix(a, b):
+    """(N,4) x (M,4) 박스 IoU 행렬"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def _greedy(score, valid):
+    """점수가 높은 순으로 1:1 매칭 → [(track_idx, det_idx)]"""
+    pairs = []
+    score = np.where(valid, score, -np.inf)
+    while score.size and np.isfinite(score).any():
+        t, d = np.unravel_index(np.argmax(score), score.shape)
+        pairs.append((int(t), int(d)))
+        score[t, :] = -np.inf
+        score[:, d] = -np.inf
+    return pairs
+
+
+class ObjectTracker:
+    """postprocess() 결과(DETECTION_DTYPE)를 받아 트랙 목록 유지"""
+
+    def __init__(self):
+        self.tracks = []
+        self._next_id = 1
+        self.created = 0
+        self.removed = 0
+
+    def update(self, dets, now):
+        """한 프레임 감지 결과 반영 후 살아 있는 트랙 목록 반환"""
+        dets = dets[dets["label"] >= 0]
+        boxes = np.stack([dets["x1"], dets["y1"], dets["x2"], dets["y2"]], axis=1).astype(np.float64)
+        labels = dets["label"]
+        matched_tracks, matched_dets = set(), set()
+
+        if self.tracks and len(dets):
+            predicted = np.array([t.predict(now) for t in self.tracks])
+            same_label = np.array([t.label for t in self.tracks])[:, None] == labels[None, :]
+
+            # 1차: IoU
+            iou = iou_matrix(predicted, boxes)
+            pairs = _greedy(iou, same_label & (iou >= IOU_MATCH))
+
+            # 2차: 중심 거리 (빠르게 커지는 / 움직이는 객체)
+            free = same_label.copy()
+            for t, d in pairs:
+                free[t, :] = False
+                free[:, d] = False
+            if free.any():
+                centers_t = (predicted[:, :2] + predicted[:, 2:]) / 2.0
+                centers_d = (boxes[:, :2] + boxes[:, 2:]) / 2.0
+                dist = np.linalg.norm(centers_t[:, None] - centers_d[None, :], axis=2)
+                scale = np.sqrt([max(t.area, 1.0) for t in self.tracks])[:, None]
+                norm = dist / scale
+                pairs += _greedy(-norm, free & (norm <= CENTROID_GATE))
+
+            for t, d in pairs:
+                self.tracks[t].update(boxes[d], dets["area"][d], dets["conf"][d], now)
+                matched_tracks.add(t)
+                matched_dets.add(d)
+
+        # 놓친 트랙
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.misses += 1
+
+        # 새 트랙
+        for d in range(len(dets)):
+            if d not in matched_dets:
+                self.tracks.append(Track(self._next_id, int(labels[d]), boxes[d],
+                                         dets["area"][d], dets["conf"][d], now))
+                self._next_id += 1
+                self.created += 1
+
+        alive = [t for t in self.tracks
+                 if t.misses <= MAX_MISSES and now - t.last_seen <= MAX_AGE]
+        self.removed += len(self.tracks) - len(alive)
+        self.tracks = alive
+        return alive
+
+    def best_by_label(self):
+        """라벨별 대표 트랙 (확정 우선, 그다음 평활 면적이 큰 것)"""
+        best = {}
+        for track in self.tracks:
+            cur = best.get(track.label)
+            if cur is None or (track.confirmed, track.area) > (cur.confirmed, cur.area):
+                best[track.label] = track
+        return best
+
+    def stats(self):
+        return {
+            "active": len(self.tracks),
+            "confirmed": sum(t.confirmed for t in self.tracks),
+            "created": self.created,
+            "removed": self.removed,
+        }
@@ -0,0 +1,98 @@
+"""
+perf_stats.py
+-------------
+지연 시간 / 처리량 측정용 경량 통계
+
+* LatencyStats : 전체 샘플 평균 / 최대 + 최근 N개(window) 샘플 백분위수 / 히스토그램
+* 단위는 모두 ms
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class LatencyStats:
+    """지연 시간 통계 (스레드 안전)
+
+    count / mean_ms / max_ms는 전체 누적, percentile() / histogram()은 최근 window개만.
+    """
+
+    def __init__(self, name, window=1000):
+        self.name = name
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def time(self):
+        """with stats.time(): ... 형태로 구간 측정"""
+        return _Timer(self)
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        idx = min(len(samples) - 1, int(round(p / 100.0 * (len(samples) - 1))))
+        return samples[idx]
+
+    def histogram(self, edges=(1, 2, 5, 10, 20, 50, 100, 200, 500)):
+        """구간별 샘플 수 [(라벨, 개수), ...]"""
+        with self._lock:
+            samples = list(self._samples)
+        bins = [0] * (len(edges) + 1)
+        for ms in samples:
+            for i, edge in enumerate(edges):
+                if ms < edge:
+                    bins[i] += 1
+                    break
+            else:
+                bins[-1] += 1
+        labels = [f"<{edge}ms" for edge in edges] + [f">={edges[-1]}ms"]
+        return list(zip(labels, bins))
+
+    def _window_label(self):
+        """샘플이 window를 넘었으면 백분위수 / 히스토그램 범위 표시"""
+        n = len(self._samples)
+        return f" (최근 {n}개)" if n < self.count else ""
+
+    def summary(self):
+        return (f"{self.name}: n={self.count} | 평균 {self.mean_ms:.2f}ms | "
+                f"p50 {self.percentile(50):.2f}ms | p95 {self.percentile(95):.2f}ms"
+                f"{self._window_label()} | 최대 {self.max_ms:.2f}ms")
+
+    def print_histogram(self, width=40):
+        rows = self.histogram()
+        peak = max([n for _, n in rows] + [1])
+        print(f"  [{self.name}]{self._window_label()}")
+        for label, n in rows:
+            bar = "█" * int(n / peak * width)
+            print(f"    {label:>8s} | {bar} {n}")
+
+
+class _Timer:
+    def __init__(self, stats):
+        self._stats = stats
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._stats.add((time.perf_counter() - self._start) * 1000.0)
+        return False
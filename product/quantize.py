@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+quantize.py
+-----------
+표지판 탐지 / 분류 모델 INT8 양자화 도구
+
+* 캘리브레이션: CAPTURE_FOLDER에 쌓인 실제 주행 캡처 이미지
+    - 탐지 모델: 이미지 전체 (letterbox 640)
+    - 분류 모델: FP32 탐지 모델이 찾은 박스 crop (letterbox 224)
+* 출력: <모델>.<가중치 해시 키>_int8.onnx (ONNX Runtime 정적 양자화, QDQ)
+        --tflite 지정 시 ultralytics export(int8=True)로 TFLite도 생성
+* 리포트: FP32 대비 mAP(탐지) / top-1 정확도(분류) / 프레임당 지연
+
+사용법:
+    python quantize.py                                   # 양자화 + 지연 리포트
+    python quantize.py --data signs/data.yaml           # 탐지 mAP 포함
+    python quantize.py --cls-data signs_cls/val          # 분류 top-1 포함
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+import object_detector as od
+from inference_backend import (CLASSIFY_IMGSZ, DETECT_IMGSZ, OnnxBackend, classify_tensor,
+                               cached_onnx, detect_tensor, load_model, onnx_path_for)
+from perf_stats import LatencyStats
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def list_images(folder, limit=None):
+    paths = sorted(p for p in glob.glob(os.path.join(folder, "**", "*"), recursive=True)
+                   if p.lower().endswith(IMAGE_EXTS))
+    return paths[:limit] if limit else paths
+
+
+def read_rgb(path):
+    """캡처 이미지는 PIL로 RGB 저장됨 → 런타임 roi_rgb와 같은 RGB 배열로 읽기"""
+    img = cv2.imread(path)
+    return None if img is None else cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+# ============================================================
+# 캘리브레이션 데이터
+# ============================================================
+def detector_calibration(paths):
+    canvas = np.full((DETECT_IMGSZ, DETECT_IMGSZ, 3), 114, np.uint8)
+    for path in paths:
+        img = read_rgb(path)
+        if img is None:
+            continue
+        tensor = np.zeros((1, 3, DETECT_IMGSZ, DETECT_IMGSZ), np.float32)
+        detect_tensor(img, DETECT_IMGSZ, canvas, tensor)
+        yield tensor
+
+
+def classifier_calibration(paths, detector):
+    """FP32 탐지 결과 crop을 분류 모델 입력으로 사용"""
+    buf = np.empty((1, CLASSIFY_IMGSZ, CLASSIFY_IMGSZ, 3), np.uint8)
+    for path in paths:
+        img = read_rgb(path)
+        if img is None:
+            continue
+        xyxy, _, _ = detector.detect(img)
+        for x1, y1, x2, y2 in xyxy:
+            crop = img[max(y1, 0):y2, max(x1, 0):x2]
+            if crop.size == 0:
+                continue
+            od.letterbox(crop, CLASSIFY_IMGSZ, buf[0])
+            yield classify_tensor(buf, CLASSIFY_IMGSZ)
+
+
+# ============================================================
+# 양자화
+# ============================================================
+def quantize_onnx(pt_path, task, tensors):
+    """FP32 ONNX → INT8 ONNX (정적 양자화, per-channel 가중치)"""
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    fp32_path = cached_onnx(pt_path, task)
+    int8_path = onnx_path_for(pt_path, task, "int8")
+    prep_path = os.path.splitext(fp32_path)[0] + "_prep.onnx"
+
+    print(f"  [INFO] 전처리 (shape 추론): {os.path.basename(fp32_path)}")
+    quant_pre_process(fp32_path, prep_path, skip_symbolic_shape=True)
+
+    input_name = OnnxBackend(fp32_path, task).input_name
+
+    class Reader(CalibrationDataReader):
+        """캘리브레이션 텐서 제너레이터 어댑터"""
+
+        def __init__(self):
+            self._iter = iter(tensors)
+
+        def get_next(self):
+            tensor = next(self._iter, None)
+            return None if tensor is None else {input_name: tensor}
+
+    reader = Reader()
+
+    print(f"  [INFO] INT8 양자화 중 → {os.path.basename(int8_path)}")
+    quantize_static(prep_path, int8_path, reader,
+                    quant_format=QuantFormat.QDQ,
+                    per_channel=True,
+                    weight_type=QuantType.QInt8,
+                    activation_type=QuantType.QUInt8)
+    os.remove(prep_path)
+    print(f"  [✓] 양자화 완료: {int8_path}")
+    return int8_path
+
+
+def export_tflite_int8(pt_path, data):
+    """TFLite INT8 (train_yolo_rps.export_model과 동일하게 실패 시 경고만)"""
+    from ultralytics import YOLO
+
+    print("  [INFO] TFLite INT8 형식으로 변환 중...")
+    try:
+        return YOLO(pt_path).export(format="tflite", int8=True, data=data)
+    except Exception as e:
+        print(f"  [WARNING] TFLite 변환 실패: {e}")
+        return None
+
+
+# ============================================================
+# 평가
+# ============================================================
+def measure_latency(model, paths, task, classifier_crops=None):
+    stats = LatencyStats(f"{model.name} {os.path.basename(getattr(model, 'path', ''))}")
+    buf = np.empty((8, CLASSIFY_IMGSZ, CLASSIFY_IMGSZ, 3), np.uint8)
+    for i, path in enumerate(paths):
+        img = read_rgb(path)
+        if img is None:
+            continue
+        start = time.perf_counter()
+        if task == "detect":
+            model.detect(img)
+        else:
+            crops = classifier_crops.get(path, [])[:len(buf)]
+            if not crops:
+                continue
+            for k, crop in enumerate(crops):
+                od.letterbox(crop, CLASSIFY_IMGSZ, buf[k])
+            model.classify(buf[:len(crops)])
+        if i > 0:  # 첫 호출(메모리 할당) 제외
+            stats.add((time.perf_counter() - start) * 1000.0)
+    return stats
+
+
+def detector_map(weights, data):
+    """ultralytics val로 mAP50 / mAP50-95 (.pt와 .onnx 모두 지원)"""
+    from ultralytics import YOLO
+
+    metrics = YOLO(weights, task="detect").val(data=data, imgsz=DETECT_IMGSZ, batch=1,
+                                               verbose=False, plots=False)
+    return float(metrics.box.map50), float(metrics.box.map)
+
+
+def classifier_top1(model, folder):
+    """폴더 구조 <folder>/<클래스명>/*.jpg 기준 top-1 정확도"""
+    name_to_id = {name: idx for idx, name in model.names.items()}
+    buf = np.empty((1, CLASSIFY_IMGSZ, CLASSIFY_IMGSZ, 3), np.uint8)
+    correct = total = 0
+    for class_dir in sorted(glob.glob(os.path.join(folder, "*"))):
+        label = name_to_id.get(os.path.basename(class_dir))
+        if label is None or not os.path.isdir(class_dir):
+            continue
+        for path in list_images(class_dir):
+            img = read_rgb(path)
+            if img is None:
+                continue
+            od.letterbox(img, CLASSIFY_IMGSZ, buf[0])
+            ids, _ = model.classify(buf)
+            correct += int(ids[0] == label)
+            total += 1
+    return correct / total if total else float("nan"), total
+
+
+def write_report(path, rows):
+    lines = ["# INT8 양자화 리포트", "",
+             f"- 생성: {time.strftime('%Y-%m-%d %H:%M:%S')}", "",
+             "| 모델 | 정밀도 | 지표 | 값 |", "|---|---|---|---|"]
+    lines += [f"| {m} | {p} | {k} | {v} |" for m, p, k, v in rows]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"\n  [✓] 리포트 저장: {path}")
+
+
+# ============================================================
+# 메인
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description='표지판 모델 INT8 양자화 + 정확도/지연 리포트')
+    parser.add_argument('--detector', type=str, default=od.DETECTOR_PATH,
+                        help='탐지 모델 (.pt) 경로')
+    parser.add_argument('--classifier', type=str, default=od.CLASSIFIER_PATH,
+                        help='분류 모델 (.pt) 경로')
+    parser.add_argument('--calib', type=str, default=od.CAPTURE_FOLDER,
+                        help='캘리브레이션 이미지 폴더 (default: CAPTURE_FOLDER)')
+    parser.add_argument('--calib-count', type=int, default=200,
+                        help='캘리브레이션 이미지 수 (default: 200)')
+    parser.add_argument('--data', type=str, default=None,
+                        help='탐지 mAP 평가용 data.yaml (없으면 mAP 생략)')
+    parser.add_argument('--cls-data', type=str, default=None,
+                        help='분류 top-1 평가 폴더 (<클래스명>/*.jpg, 없으면 생략)')
+    parser.add_argument('--tflite', action='store_true',
+                        help='TFLite INT8도 함께 생성 (--data 필요)')
+    parser.add_argument('--report', type=str, default=None,
+                        help='리포트 경로 (default: 모델 폴더/quantization_report.md)')
+    args = parser.parse_args()
+
+    calib = list_images(args.calib, args.calib_count)
+    if not calib:
+        print(f"[❌] 캘리브레이션 이미지가 없습니다: {args.calib}")
+        return
+    print("=" * 60)
+    print(f" INT8 양자화 (캘리브레이션 {len(calib)}장)")
+    print("=" * 60)
+
+    rows = []
+    detector_fp32 = load_model(args.detector, "detect", backend="onnx", precision="fp32")
+    quantize_onnx(args.detector, "detect", detector_calibration(calib))
+    detector_int8 = OnnxBackend(onnx_path_for(args.detector, "detect", "int8"), "detect")
+    if args.tflite and args.data:
+        export_tflite_int8(args.detector, args.data)
+
+    # 탐지: 지연 + mAP
+    for precision, model in (("fp32", detector_fp32), ("int8", detector_int8)):
+        stats = measure_latency(model, calib, "detect")
+        print("  " + stats.summary())
+        rows.append(("detector", precision, "ms/frame (p50)", f"{stats.percentile(50):.1f}"))
+    if args.data:
+        # fp32도 캐시된 ONNX로 평가 (같은 런타임 / 전처리 → 차이는 양자화 손실만)
+        for precision in ("fp32", "int8"):
+            weights = onnx_path_for(args.detector, "detect", precision)
+            map50, map5095 = detector_map(weights, args.data)
+            print(f"  [{precision}] mAP50 {map50:.3f} | mAP50-95 {map5095:.3f}")
+            rows.append(("detector", precision, "mAP50", f"{map50:.3f}"))
+            rows.append(("detector", precision, "mAP50-95", f"{map5095:.3f}"))
+
+    # 분류: 지연 + top-1
+    if os.path.exists(args.classifier):
+        crops = {}
+        for path in calib:
+            img = read_rgb(path)
+            if img is None:
+                continue
+            xyxy, _, _ = detector_fp32.detect(img)
+            crops[path] = [img[max(y1, 0):y2, max(x1, 0):x2] for x1, y1, x2, y2 in xyxy
+                           if (y2 - y1) > 0 and (x2 - x1) > 0]
+
+        classifier_fp32 = load_model(args.classifier, "classify", backend="onnx", precision="fp32")
+        quantize_onnx(args.classifier, "classify", classifier_calibration(calib, detector_fp32))
+        classifier_int8 = OnnxBackend(onnx_path_for(args.classifier, "classify", "int8"), "classify")
+        if args.tflite and args.cls_data:
+            export_tflite_int8(args.classifier, os.path.dirname(args.cls_data.rstrip("/")))
+
+        for precision, model in (("fp32", classifier_fp32), ("int8", classifier_int8)):
+            stats = measure_latency(model, calib, "classify", crops)
+            print("  " + stats.summary())
+            rows.append(("classifier", precision, "ms/frame (p50)", f"{stats.percentile(50):.1f}"))
+            if args.cls_data:
+                acc, total = classifier_top1(model, args.cls_data)
+                print(f"  [{precision}] top-1 {acc:.1%} ({total}장)")
+                rows.append(("classifier", precision, "top-1", f"{acc:.3f}"))
+
+    report = args.report or os.path.join(os.path.dirname(args.detector), "quantization_report.md")
+    write_report(report, rows)
+
+
+if __name__ == "__main__":
+    main()
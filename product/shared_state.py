@@ -2,15 +2,57 @@
 shared_state.py
 ---------------
 lane_tracer와 object_detector 간의 공유 상태
-Lock을 이용해 thread-safe하게 접근 가능
+
+전역 Lock 하나 대신 토픽별로 불변 스냅샷을 발행한다.
+* frames     : frame_ring (고정 슬롯 링 버퍼)
+* detections : DetectionSnapshot (object_detector → lane_tracer / main)
+* triggers   : 근접 이벤트 이름 (object_detector → main)
+* actions    : 객체별 마지막 동작 시각 (lane_tracer → object_detector)
+* lane       : LaneStatus 주행 상태 (lane_tracer → object_detector 스케줄러)
+* frame_due  : 다음 프레임 요청 시각 (object_detector → lane_tracer)
+* scheduler  : 탐지 스케줄러 지표 (object_detector → main)
+
+각 토픽은 writer가 하나뿐이고, 발행은 참조 교체(원자적)만 하므로
+reader는 어떤 경우에도 대기하지 않는다.
 """
 
-from threading import Lock
+from collections import namedtuple
+from types import MappingProxyType
+from frame_buffer import FrameRing
+
+
+class Topic:
+    """단일 writer / 다중 reader 토픽
+
+    값은 발행 후 수정하지 않는 불변 객체여야 한다.
+    (seq, value) 튜플을 통째로 교체하므로 reader는 항상 짝이 맞는 값을 본다.
+    """
+
+    def __init__(self, name, initial=None):
+        self.name = name
+        self._snapshot = (0, initial)
 
-lock = Lock()
+    def publish(self, value):
+        """새 값 발행 후 시퀀스 번호 반환"""
+        seq = self._snapshot[0] + 1
+        self._snapshot = (seq, value)
+        return seq
+
+    def get(self):
+        """최신 값"""
+        return self._snapshot[1]
+
+    def read(self):
+        """(seq, 최신 값) - 새 값인지 판단할 때 사용"""
+        return self._snapshot
+
+
+def freeze(mapping):
+    """dict 복사본을 읽기 전용 매핑으로 감싸기"""
+    return MappingProxyType(dict(mapping))
 
 # ============================================================
-# 객체 관련 상태 
+# 객체 관련 상태
 # ============================================================
 
 # 인식 가능한 객체 목록
@@ -20,45 +62,98 @@ KNOWN_OBJECTS = [
     "traffic"
 ]
 
-# 각 객체별 감지 상태 및 정보
-object_state = {name: False for name in KNOWN_OBJECTS}   # 현재 감지 여부
-object_area = {name: 0 for name in KNOWN_OBJECTS}        # 최근 감지 면적
-object_last_seen = {name: 0.0 for name in KNOWN_OBJECTS} # 마지막 감지 시각
-confidence = {name: 0.0 for name in KNOWN_OBJECTS}       # 신뢰도 (0.0 ~ 1.0)
-detection_frames = {name: 0 for name in KNOWN_OBJECTS}   # 연속 감지 프레임 수
+# 트랙 정보 (object_tracker.Track.info()로 생성)
+TrackInfo = namedtuple("TrackInfo", [
+    "track_id",      # 트랙 고유 번호
+    "label",         # KNOWN_OBJECTS 이름
+    "x1", "y1", "x2", "y2",  # 최근 박스 (감지 ROI 좌표)
+    "area",          # 평활화된 면적
+    "confidence",    # 평활화된 신뢰도
+    "hits",          # 누적 감지 프레임 수
+    "misses",        # 연속 미감지 프레임 수
+    "confirmed",     # 확정 여부 (hits >= CONFIRM_HITS)
+    "first_seen",    # 첫 감지 시각
+    "last_seen",     # 마지막 감지 시각
+])
 
-# 근접 이벤트용 (lane_tracer / detector 간 1회성 트리거)
-last_trigger = None
+# 감지 결과 스냅샷 (object_detector가 프레임마다 새로 만들어 발행)
+DetectionSnapshot = namedtuple("DetectionSnapshot", [
+    "timestamp",              # 발행 시각
+    "object_state",           # 현재 감지 여부
+    "object_area",            # 최근 감지 면적
+    "object_last_seen",       # 마지막 감지 시각
+    "confidence",             # 신뢰도 (0.0 ~ 1.0)
+    "detection_frames",       # 트랙 누적 감지 프레임 수 (몇 프레임 놓쳐도 유지)
+    "detection_counts",       # 각 객체별 총 감지 횟수 (세션 통계용)
+    "object_detected",        # 가장 최근 감지된 객체 이름 (main.py 모니터용)
+    "object_distance",        # 해당 객체의 감지 면적 (근사 거리)
+    "traffic_light_area",     # 신호등 감지 면적
+    "traffic_light_last_ts",  # 신호등 마지막 감지 시각
+    "tracks",                 # 확정된 트랙 목록 (TrackInfo 튜플)
+])
 
-# 간단 로그용 (main.py 모니터 출력용)
-object_detected = None        # 가장 최근 감지된 객체 이름
-object_distance = 0           # 해당 객체의 감지 면적 (근사 거리)
+EMPTY_DETECTIONS = DetectionSnapshot(
+    timestamp=0.0,
+    object_state=freeze({name: False for name in KNOWN_OBJECTS}),
+    object_area=freeze({name: 0 for name in KNOWN_OBJECTS}),
+    object_last_seen=freeze({name: 0.0 for name in KNOWN_OBJECTS}),
+    confidence=freeze({name: 0.0 for name in KNOWN_OBJECTS}),
+    detection_frames=freeze({name: 0 for name in KNOWN_OBJECTS}),
+    detection_counts=freeze({name: 0 for name in KNOWN_OBJECTS}),
+    object_detected=None,
+    object_distance=0,
+    traffic_light_area=0,
+    traffic_light_last_ts=0.0,
+    tracks=(),
+)
 
-# ============================================================
-# 신호등 관련 (traffic 객체와 병행 사용)
-# ============================================================
+detections = Topic("detections", EMPTY_DETECTIONS)
 
-traffic_light_area = 0        # 신호등 감지 면적
-traffic_light_last_ts = 0.0   # 마지막 감지 시각
-right_turn_done = False       # 우회전 완료 여부
+# 근접 이벤트용 (detector → main 모니터 1회성 트리거)
+# 값은 지우지 않으므로 reader는 마지막으로 본 seq와 비교해 새 트리거를 판단한다
+triggers = Topic("triggers", None)
 
 # ============================================================
 # 동작 중복 실행 방지용
 # ============================================================
 
-action_executed = {}          # 각 객체별 동작 실행 여부
-action_last_time = {}         # 각 객체별 마지막 동작 시간
+actions = Topic("actions", freeze({}))  # 각 객체별 마지막 동작 시간
 ACTION_COOLDOWN = 5.0         # 같은 객체에 대해 5초간 재실행 금지
 
+
+def record_action(name, timestamp):
+    """동작 실행 시각 기록 (writer: lane_tracer)"""
+    updated = dict(actions.get())
+    updated[name] = timestamp
+    actions.publish(MappingProxyType(updated))
+
 # ============================================================
 # 프레임 공유용 (object_detector ↔ lane_tracer)
 # ============================================================
 
-latest_frame = None
+# 고정 슬롯 링 버퍼 (lock 없이 접근, 내부에서 슬롯 교환만 동기화)
+frame_ring = FrameRing(slots=3)
+
+# 감지 스레드가 다음 프레임이 필요한 시각을 발행하고,
+# lane_tracer는 그 시각이 지난 뒤의 프레임만 링에 기록한다 (0.0이면 매 프레임)
+frame_due = Topic("frame_due", 0.0)
+
+# ============================================================
+# 탐지 스케줄링용 (lane_tracer → object_detector → main)
+# ============================================================
+
+LaneStatus = namedtuple("LaneStatus", [
+    "speed",              # 현재 직진 속도 (SPEED_FORWARD)
+    "intersection_mode",  # 교차로 모드 여부
+    "vehicle_stopped",    # 정지 상태 여부
+])
+
+lane = Topic("lane", LaneStatus(speed=0.0, intersection_mode=False, vehicle_stopped=True))
+
+scheduler = Topic("scheduler", freeze({}))  # DetectionScheduler.metrics() 스냅샷
 
 # ============================================================
-# 통계 데이터 (세션 통계용)
+# 상태 플래그
 # ============================================================
 
-detection_counts = {name: 0 for name in KNOWN_OBJECTS}  # 각 객체별 총 감지 횟수
-detector_active = False  # object_detector 스레드 활성 상태
+detector_active = False  # object_detector 스레드 활성 상태 (단순 bool 대입)
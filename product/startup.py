@@ -0,0 +1,148 @@
+"""
+startup.py
+----------
+시작 단계 타임라인 / 준비 신호
+
+main.py는 차선 스레드(모터 → 카메라 열기 → 노출 안정화)와
+감지 스레드(런타임 import → 모델 로드 → 워밍업)를 동시에 시작한다.
+* 각 단계는 timeline.phase(이름)으로 감싸 시작/끝 시각을 기록
+* 준비가 끝나면 timeline.ready(이름), 실패해도 ready(이름, ok=False)로 알림 (대기 해제)
+* 차선 루프는 timeline.wait(...)로 필요한 항목이 모두 준비되는 즉시 주행 시작
+  (expect()로 등록되지 않은 항목은 기다리지 않음 → lane_tracer 단독 실행도 그대로 동작)
+* timeline.report()로 스레드별 단계 타임라인 출력
+
+    timeline.expect("detector")             # main.py: 감지 스레드 시작 전
+    with timeline.phase("모델 로드"):         # 감지 스레드
+        ...
+    timeline.ready("detector")
+    timeline.wait("camera", "detector", timeout=60.0)   # 차선 스레드
+"""
+
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from contextlib import contextmanager
+
+# 타임라인 막대 너비 (문자 수)
+REPORT_WIDTH = 40
+
+Phase = namedtuple("Phase", [
+    "name",     # 단계 이름
+    "thread",   # 기록한 스레드 이름
+    "start",    # 시작 (타임라인 기준 초)
+    "end",      # 끝
+])
+
+
+def _cells(text):
+    """터미널 표시 폭 (한글 등 전각 문자는 2칸)"""
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+def _pad(text, width):
+    return text + " " * max(0, width - _cells(text))
+
+
+class StartupTimeline:
+    """스레드별 시작 단계 기록 + 이름별 준비 이벤트"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """기준 시각을 지금으로 (기록 / 준비 상태 초기화)"""
+        with self._lock:
+            self.t0 = time.perf_counter()
+            self.phases = []
+            self.marks = []              # (이름, 시각)
+            self._events = {}            # 이름 → threading.Event
+            self._ok = {}                # 이름 → 준비 성공 여부
+
+    def now(self):
+        return time.perf_counter() - self.t0
+
+    @contextmanager
+    def phase(self, name):
+        start = self.now()
+        try:
+            yield
+        finally:
+            end = self.now()
+            with self._lock:
+                self.phases.append(Phase(name, threading.current_thread().name, start, end))
+
+    def extend(self, phases):
+        """다른 프로세스에서 기록한 단계 추가 (같은 t0 기준)"""
+        with self._lock:
+            self.phases.extend(Phase(*p) for p in phases)
+
+    def mark(self, name):
+        with self._lock:
+            self.marks.append((name, self.now()))
+
+    # ------------------------------------------------------------
+    # 준비 신호
+    # ------------------------------------------------------------
+    def _event(self, name):
+        with self._lock:
+            return self._events.setdefault(name, threading.Event())
+
+    def expect(self, name):
+        """name이 준비될 때까지 wait()가 기다리도록 등록"""
+        self._event(name)
+
+    def ready(self, name, ok=True):
+        with self._lock:
+            self._ok[name] = ok
+        self.mark(f"{name} 준비" if ok else f"{name} 비활성")
+        self._event(name).set()
+
+    def is_ready(self, name):
+        event = self._events.get(name)
+        return event is not None and event.is_set() and self._ok.get(name, False)
+
+    def wait(self, *names, timeout=None):
+        """등록된 항목이 모두 준비(또는 실패)될 때까지 대기 → 모두 성공이면 True
+
+        등록되지 않은 이름은 건너뛴다. timeout(초)이 지나면 False.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        ok = True
+        for name in names:
+            event = self._events.get(name)
+            if event is None:
+                continue
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not event.wait(remaining):
+                ok = False
+            elif not self._ok.get(name, False):
+                ok = False
+        return ok
+
+    # ------------------------------------------------------------
+    # 출력
+    # ------------------------------------------------------------
+    def report(self, width=REPORT_WIDTH):
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: (p.thread, p.start))
+            marks = list(self.marks)
+        total = max([p.end for p in phases] + [t for _, t in marks] + [1e-6])
+        scale = width / total
+
+        print(f"\n[시작 타임라인] 총 {total:.2f}s")
+        name_width = max([_cells(p.name) for p in phases] + [4])
+        thread_width = max([_cells(p.thread) for p in phases] + [4])
+        for p in phases:
+            lo = min(width - 1, int(p.start * scale))
+            hi = min(width, max(lo + 1, int(round(p.end * scale))))
+            bar = " " * lo + "█" * (hi - lo) + " " * (width - hi)
+            print(f"  {_pad(p.thread, thread_width)} {_pad(p.name, name_width)} "
+                  f"{p.start:6.2f} → {p.end:6.2f}s ({p.end - p.start:5.2f}s) |{bar}|")
+        if marks:
+            print("  " + " | ".join(f"{name} {t:.2f}s" for name, t in marks))
+
+
+# 프로세스 전체에서 공유하는 타임라인 (main.py / lane_tracer / object_detector)
+timeline = StartupTimeline()
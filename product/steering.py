@@ -0,0 +1,209 @@
+"""
+steering.py
+-----------
+차선 조향 컨트롤러
+
+* BalanceSteering  : 기존 방식. 좌/우 박스 픽셀 비율 차이로 전진 / 좌회전 / 우회전 결정 (bang-bang)
+* CentroidSteering : ROI 가로 띠마다 cv2.moments로 좌/우 라인 중심을 구해 차선 중심 오차 계산
+                     → 미분 필터가 있는 PID → 연속 좌/우 바퀴 PWM (차동 구동)
+
+바퀴 출력은 모두 (left, right) -1.0~1.0 (음수는 후진)로 표현한다.
+"""
+
+import cv2
+
+# ======================================
+# 기존 비율 균형 컨트롤러 파라미터
+# ======================================
+BASE_BALANCE_THRESHOLD = 0.35        # 기본 균형 임계값 (저속/중속)
+HIGH_SPEED_BALANCE_THRESHOLD = 0.25  # 고속 시 균형 임계값 (더 민감)
+HIGH_SPEED = 0.6                     # 이 속도 초과면 고속 임계값 사용
+STRAIGHT_DURATION = 0.5              # 한쪽 라인이 없을 때 직진 유지 시간 (초)
+MISSING_PIXELS = 50                  # 이 값 미만이면 한쪽 라인이 없다고 판단 (640x480 기준)
+
+# ======================================
+# 중심선 PID 컨트롤러 파라미터
+# ======================================
+# ROI 가로 띠 (화면 높이 비율, 가까운 띠부터) / 띠별 가중치
+STEER_BANDS = ((0.78, 0.92), (0.62, 0.76), (0.46, 0.60))
+BAND_WEIGHTS = (0.5, 0.3, 0.2)
+MIN_BAND_PIXELS = 20     # 띠 절반에서 라인으로 인정할 최소 픽셀 수
+HALF_WIDTH_SMOOTHING = 0.2  # 띠별 차선 반폭 EMA 계수 (한쪽 라인만 보일 때 사용)
+
+PID_KP = 0.9
+PID_KI = 0.05
+PID_KD = 0.12
+D_FILTER_TAU = 0.08      # 미분항 1차 저역 통과 시정수 (초)
+I_LIMIT = 0.5            # 적분항 한계
+CURVE_SLOWDOWN = 0.3     # |조향| = 1일 때 기본 속도 감소 비율
+PID_MAX_GAP = 0.25       # 이 시간(초) 이상 갱신이 끊기면 (회전 / 라인 이탈 후) 상태 초기화
+
+
+def turn_wheels(direction, intensity, speed):
+    """motor_left / motor_right와 같은 바퀴 출력 (intensity > 0.5면 안쪽 바퀴 후진)"""
+    if intensity > 0.5:
+        inner, outer = -speed * 0.3 * intensity, speed * 1.2 * intensity
+    else:
+        inner, outer = 0.0, speed * 1.2 * intensity
+    return (inner, outer) if direction == "LEFT" else (outer, inner)
+
+
+class BalanceSteering:
+    """좌/우 박스 픽셀 수 → ("FORWARD" | "LEFT" | "RIGHT", 회전 강도)
+
+    missing_pixels: 한쪽 라인 없음 판단 임계값 (lane 스트림 해상도에 맞춰 환산한 값)
+    """
+
+    def __init__(self, missing_pixels=MISSING_PIXELS):
+        self.missing_pixels = missing_pixels
+        self.missing_time = None       # 한쪽 라인이 사라진 시각
+        self.missing_direction = None  # 사라진 쪽의 반대 (회전할 방향)
+        self.last_seen_side = None     # 라인이 마지막으로 치우쳐 있던 쪽
+
+    def reset(self):
+        self.missing_time = None
+        self.missing_direction = None
+
+    def update(self, left_pixels, right_pixels, speed, now):
+        total = left_pixels + right_pixels
+        diff = abs(left_pixels - right_pixels) / total if total > 0 else 0.0
+        threshold = HIGH_SPEED_BALANCE_THRESHOLD if speed > HIGH_SPEED else BASE_BALANCE_THRESHOLD
+
+        if diff < threshold:
+            # 좌우 균형 잡힘 → 전진
+            self.reset()
+            return "FORWARD", 0.0
+
+        # 왼쪽에 라인이 많으면 우회전, 오른쪽이 많으면 좌회전
+        if left_pixels > right_pixels:
+            self.last_seen_side, direction, other = "LEFT", "RIGHT", right_pixels
+        else:
+            self.last_seen_side, direction, other = "RIGHT", "LEFT", left_pixels
+
+        # 편차에 비례한 회전 강도 (최대 편차 50%로 정규화)
+        intensity = min(1.0, diff / 0.5)
+        if other >= self.missing_pixels:
+            self.reset()
+            return direction, intensity
+
+        # 반대쪽 라인이 거의 없음: 잠시 직진 후 강한 회전
+        if self.missing_time is None or self.missing_direction != direction:
+            self.missing_time = now
+            self.missing_direction = direction
+        if now - self.missing_time < STRAIGHT_DURATION:
+            return "FORWARD", 0.0
+        return direction, min(1.0, intensity * 1.5)
+
+
+class PID:
+    """미분항에 1차 저역 통과 필터, 적분항 포화 방지가 있는 PID"""
+
+    def __init__(self, kp=PID_KP, ki=PID_KI, kd=PID_KD, d_tau=D_FILTER_TAU,
+                 i_limit=I_LIMIT, out_limit=1.0):
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.d_tau = d_tau
+        self.i_limit = i_limit
+        self.out_limit = out_limit
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.derivative = 0.0
+        self._last_error = None
+        self._last_time = None
+
+    def update(self, error, now):
+        if self._last_time is not None and now - self._last_time > PID_MAX_GAP:
+            self.reset()
+        dt = now - self._last_time if self._last_time is not None else 0.0
+        if dt > 0:
+            raw = (error - self._last_error) / dt
+            self.derivative += dt / (self.d_tau + dt) * (raw - self.derivative)
+            integral = max(-self.i_limit, min(self.i_limit, self.integral + error * dt))
+        else:
+            integral = self.integral
+        self._last_error = error
+        self._last_time = now
+
+        out = self.kp * error + self.ki * integral + self.kd * self.derivative
+        if abs(out) < self.out_limit or out * error < 0:
+            self.integral = integral  # 포화 방향으로는 적분하지 않음
+        return max(-self.out_limit, min(self.out_limit, out))
+
+
+class CentroidSteering:
+    """ROI 띠별 라인 중심 → 차선 중심 오차 → PID → (left, right) 바퀴 출력
+
+    오차는 화면 중심 대비 차선 중심 위치 (-1: 왼쪽 끝, +1: 오른쪽 끝).
+    차선 중심이 오른쪽에 있으면 차량이 왼쪽으로 치우친 것이므로 우회전 (왼쪽 바퀴를 빠르게).
+    """
+
+    def __init__(self, bands=STEER_BANDS, weights=BAND_WEIGHTS, pid=None):
+        self.bands = bands
+        self.weights = weights
+        self.pid = pid or PID()
+        self._half = [None] * len(bands)  # 띠별 차선 반폭 (px)
+        self.error = 0.0
+        self.steer = 0.0
+        self.centers = [None] * len(bands)
+
+    def boxes(self, width, height):
+        """LaneMaskEngine.count()에 넘길 띠 박스 (화면 전체 너비)"""
+        return tuple((0, int(height * top), width, int(height * bottom))
+                     for top, bottom in self.bands)
+
+    @staticmethod
+    def _centroid(mask):
+        m = cv2.moments(mask, binaryImage=True)
+        if m["m00"] < MIN_BAND_PIXELS:
+            return None
+        return m["m10"] / m["m00"]
+
+    def measure(self, masks, width):
+        """띠별 마스크 → (오차, 라인 발견 여부)"""
+        mid = width // 2
+        total = weight_sum = 0.0
+        for i, mask in enumerate(masks):
+            left = self._centroid(mask[:, :mid])
+            right = self._centroid(mask[:, mid:])
+            if right is not None:
+                right += mid
+            if left is not None and right is not None:
+                half = (right - left) / 2.0
+                prev = self._half[i]
+                self._half[i] = half if prev is None else prev + HALF_WIDTH_SMOOTHING * (half - prev)
+                center = (left + right) / 2.0
+            elif self._half[i] is not None and (left is not None or right is not None):
+                # 한쪽 라인만 보이면 기억해 둔 반폭만큼 떨어진 곳을 중심으로
+                center = left + self._half[i] if left is not None else right - self._half[i]
+            else:
+                center = None
+            self.centers[i] = center
+            if center is not None:
+                total += self.weights[i] * (center - mid) / mid
+                weight_sum += self.weights[i]
+
+        if weight_sum == 0:
+            return self.error, False
+        self.error = total / weight_sum
+        return self.error, True
+
+    def update(self, masks, width, speed, now):
+        """(left, right, 라인 발견 여부) - 라인을 못 찾으면 (0, 0, False)"""
+        error, found = self.measure(masks, width)
+        if not found:
+            self.pid.reset()
+            return 0.0, 0.0, False
+        self.steer = self.pid.update(error, now)
+        base = speed * (1.0 - CURVE_SLOWDOWN * abs(self.steer))
+        left = base * (1.0 + self.steer)
+        right = base * (1.0 - self.steer)
+        # 1.0을 넘으면 좌우 차이는 유지한 채 함께 낮춤
+        excess = max(left, right) - 1.0
+        if excess > 0:
+            left -= excess
+            right -= excess
+        return max(-1.0, left), max(-1.0, right), True
+
+    def reset(self):
+        self.pid.reset()
@@ -0,0 +1,6 @@
+"""product 모듈은 최상위 모듈로 서로 import하므로 product 폴더를 경로에 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,87 @@
+"""motor_driver: 기록 mock 백엔드로 기구학 / 핀 쓰기 순서 확인 (하드웨어 없이)"""
+
+import pytest
+
+from motor_driver import LEFT_PINS, RIGHT_PINS, MockBackend, MotorController, MotorDriver
+
+
+def pin_writes(backend, start, pins):
+    """start번째 기록부터 pins에 쓴 (핀, 값) 목록"""
+    return [(pin, value) for _, pin, value in backend.log[start:] if pin in pins]
+
+
+# ============================================================
+# set(v, omega) 기구학
+# ============================================================
+def test_set_straight_and_turn():
+    motors = MotorController("mock", record=True)
+    assert motors.set(0.25, 0.0) == pytest.approx((0.5, 0.5))
+    # omega 2rad/s → 좌우 차이 2 * 0.15 / 0.5 = 0.6 (좌회전은 오른쪽 바퀴가 빠름)
+    left, right = motors.set(0.0, 2.0)
+    assert (left, right) == pytest.approx((-0.3, 0.3))
+    assert motors.driver.output == pytest.approx([left, right])
+    assert motors.log[-1][1:] == ("SET", left, right)
+
+
+def test_set_saturation_keeps_omega():
+    motors = MotorController("mock")
+    # 바퀴 한계(1.0)를 넘으면 선속도를 줄이고 좌우 차이(회전)는 유지
+    left, right = motors.set(0.5, 2.0)
+    assert right == pytest.approx(1.0)
+    assert right - left == pytest.approx(0.6)
+    # 회전만으로 한계를 넘으면 제자리 회전
+    assert motors.set(0.3, 100.0) == pytest.approx((-1.0, 1.0))
+    assert motors.set(0.3, -100.0) == pytest.approx((1.0, -1.0))
+
+
+# ============================================================
+# 핀 쓰기
+# ============================================================
+def test_repeated_command_skips_pin_writes():
+    backend = MockBackend(record=True)
+    driver = MotorDriver(backend, slew_rate=None)
+    driver.drive(0.5, 0.5)
+    assert backend.writes == 6           # 첫 명령은 바퀴마다 IN1 / IN2 / PWM
+
+    driver.drive(0.5, 0.5)
+    assert backend.writes == 6           # 같은 명령은 쓰지 않음
+    assert driver.skipped == 6
+
+    driver.drive(0.5, 0.7)
+    assert pin_writes(backend, 6, LEFT_PINS + RIGHT_PINS) == [(RIGHT_PINS[2], 0.7)]
+
+
+def test_direction_flip_lowers_pwm_first():
+    backend = MockBackend(record=True)
+    driver = MotorDriver(backend, slew_rate=None)
+    driver.drive(0.6, 0.6)
+    start = len(backend.log)
+
+    driver.drive(-0.4, 0.6)
+    in1, in2, pwm = LEFT_PINS
+    assert pin_writes(backend, start, LEFT_PINS) == [(pwm, 0.4), (in1, 1), (in2, 0)]
+    assert pin_writes(backend, start, RIGHT_PINS) == []
+
+
+def test_direction_flip_to_higher_duty_writes_pwm_last():
+    backend = MockBackend(record=True)
+    driver = MotorDriver(backend, slew_rate=None)
+    driver.drive(0.3, 0.3)
+    start = len(backend.log)
+
+    driver.drive(-0.8, 0.3)
+    in1, in2, pwm = LEFT_PINS
+    assert pin_writes(backend, start, LEFT_PINS) == [(in1, 1), (in2, 0), (pwm, 0.8)]
+
+
+def test_stop_skips_slew_and_lowers_pwm_first():
+    motors = MotorController("mock", record=True, slew_rate=10.0)
+    motors.wheels(1.0, 1.0)
+    motors.update(now=motors.driver._last_update + 1.0)
+    assert motors.driver.output == pytest.approx([1.0, 1.0])
+    start = len(motors.backend.log)
+
+    motors.stop()
+    assert motors.driver.output == [0.0, 0.0]
+    in1, in2, pwm = LEFT_PINS
+    assert pin_writes(motors.backend, start, LEFT_PINS) == [(pwm, 0.0), (in2, 0)]